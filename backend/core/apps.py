@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .search.documents import backfill_index
+        from .signals import connect_metrics_signals, connect_search_signals
+
+        connect_search_signals()
+        connect_metrics_signals()
+        post_migrate.connect(backfill_index, sender=self, dispatch_uid="search-index-backfill")
@@ -0,0 +1,323 @@
+# core/dashboard.py
+"""
+DashboardSummary (docs/dashboard_ui_spec.md §6.1) computed in the
+database: a handful of aggregate / top-N queries instead of shipping every
+sale, project, customer and inventory row to the browser.
+
+Sales figures come from the SalesDaily rollup, so the 30-day windows and
+the 12-month charts are days in the shop's timezone:
+
+- current period: the last 30 days including today
+- previous period: the 30 days before that
+
+The payload is cached per shop for CACHE_TIMEOUT seconds; the view sends
+the same max-age plus an ETag so an unchanged summary costs a 304.
+"""
+
+import hashlib
+import heapq
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from inventory.models import Consumable, Material
+from projects.models import Project
+from sales.models import SalesDaily, Sale
+from workflows.models import ProjectStageHistory
+
+from .models import Customer
+
+
+WINDOW_DAYS = 30
+MONTHS = 12
+TOP_PRODUCTS = 8
+LOW_INVENTORY_THRESHOLD = 5
+LOW_INVENTORY_ITEMS = 10
+RECENT_ACTIVITY = 20
+
+CACHE_VERSION = 2
+CACHE_TIMEOUT = 60
+
+
+def _cache():
+    return caches[getattr(settings, "SHOPOPS_DASHBOARD_CACHE", "default")]
+
+
+def cached_dashboard_summary(shop):
+    """
+    (payload, etag) for the shop, from the cache when it is fresh.
+    """
+    cache = _cache()
+    key = f"core:dashboard:v{CACHE_VERSION}:{shop.id}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    payload = json.loads(json.dumps(dashboard_summary(shop), cls=DjangoJSONEncoder))
+    etag = hashlib.md5(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    cache.set(key, (payload, etag), timeout=CACHE_TIMEOUT)
+    return payload, etag
+
+
+def pct_change(current, previous):
+    # no baseline: the UI shows "New" / "—"
+    if not previous:
+        return None
+    return round(float((current - previous) / previous * 100), 1)
+
+
+def _money(value):
+    return round(float(value or 0), 2)
+
+
+def _month_starts(today, months):
+    year, month = today.year, today.month
+    starts = []
+    for _ in range(months):
+        starts.append(today.replace(year=year, month=month, day=1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
+def dashboard_summary(shop, now=None):
+    now = now or timezone.now()
+    zone = shop.zoneinfo
+    today = timezone.localtime(now, zone).date()
+
+    current_start = today - timedelta(days=WINDOW_DAYS - 1)
+    previous_start = current_start - timedelta(days=WINDOW_DAYS)
+    # the same windows as instants, for timestamp columns
+    current_start_at = datetime.combine(current_start, time.min, tzinfo=zone)
+    previous_start_at = current_start_at - timedelta(days=WINDOW_DAYS)
+
+    daily = SalesDaily.objects.filter(shop=shop)
+    in_current = Q(date__gte=current_start)
+    in_previous = Q(date__gte=previous_start, date__lt=current_start)
+
+    # ---- orders / revenue / channels: one scan over 60 days of rollup rows
+    totals = {"orders": 0, "revenue": Decimal("0"), "prev_orders": 0, "prev_revenue": Decimal("0")}
+    channels = []
+    for row in (
+        daily.filter(date__gte=previous_start, date__lte=today)
+        .values("channel")
+        .annotate(
+            orders=Sum("sale_count", filter=in_current, default=0),
+            revenue=Sum("price", filter=in_current, default=Decimal("0")),
+            prev_orders=Sum("sale_count", filter=in_previous, default=0),
+            prev_revenue=Sum("price", filter=in_previous, default=Decimal("0")),
+        )
+        .order_by("-orders", "channel")
+    ):
+        for key in totals:
+            totals[key] += row[key]
+        if row["orders"]:
+            channels.append({"channel": row["channel"], "orders": row["orders"]})
+
+    # ---- customers
+    customers = Customer.objects.filter(shop=shop).aggregate(
+        current=Count("id", filter=Q(created_at__gte=current_start_at)),
+        previous=Count(
+            "id", filter=Q(created_at__gte=previous_start_at, created_at__lt=current_start_at)
+        ),
+    )
+
+    # ---- projects: status counts, cancellations per window and the
+    # active count as of 30 days ago, grouped by status in one query
+    active_then = Q(created_at__lt=current_start_at) & (
+        Q(status="active")
+        | Q(completed_at__gte=current_start_at)
+        | Q(cancelled_at__gte=current_start_at)
+    )
+    project_status = []
+    cancelled = {"current": 0, "previous": 0}
+    active_now = active_previously = 0
+    for row in (
+        Project.objects.filter(shop=shop)
+        .values("status")
+        .annotate(
+            count=Count("id"),
+            cancelled_current=Count(
+                "id", filter=Q(status="cancelled", cancelled_at__gte=current_start_at)
+            ),
+            cancelled_previous=Count(
+                "id",
+                filter=Q(
+                    status="cancelled",
+                    cancelled_at__gte=previous_start_at,
+                    cancelled_at__lt=current_start_at,
+                ),
+            ),
+            active_then=Count("id", filter=active_then),
+        )
+        .order_by("status")
+    ):
+        project_status.append({"status": row["status"], "count": row["count"]})
+        cancelled["current"] += row["cancelled_current"]
+        cancelled["previous"] += row["cancelled_previous"]
+        active_previously += row["active_then"]
+        if row["status"] == "active":
+            active_now = row["count"]
+
+    # ---- last 12 months (dense), revenue and expenses
+    month_starts = _month_starts(today, MONTHS)
+    by_month = {
+        row["month"]: row
+        for row in daily.filter(date__gte=month_starts[0], date__lte=today)
+        .annotate(month=TruncMonth("date"))
+        .values("month")
+        .annotate(
+            revenue=Sum("price"),
+            # per sale sales.models.sale_expenses, summed by the rollup
+            expenses=Sum("expenses"),
+        )
+        .order_by()
+    }
+    sales_by_month = []
+    revenue_vs_expenses = []
+    for start in month_starts:
+        row = by_month.get(start, {})
+        key = start.strftime("%Y-%m")
+        sales_by_month.append({"month": key, "revenue": _money(row.get("revenue"))})
+        revenue_vs_expenses.append(
+            {
+                "month": key,
+                "revenue": _money(row.get("revenue")),
+                "expenses": _money(row.get("expenses")),
+            }
+        )
+
+    # ---- top products (templates) in the current window
+    products = {}
+    for template_id, name, channel, units, revenue in (
+        daily.filter(date__gte=current_start, date__lte=today)
+        .values("template_id", "template__name", "channel")
+        .annotate(units=Sum("sale_count"), revenue=Sum("price"))
+        .values_list("template_id", "template__name", "channel", "units", "revenue")
+        .order_by()
+    ):
+        product = products.setdefault(
+            template_id,
+            {"productName": name or "Other sales", "unitsSold": 0, "revenue": Decimal("0"), "_channels": []},
+        )
+        product["unitsSold"] += units
+        product["revenue"] += revenue
+        product["_channels"].append((revenue, channel))
+    top_products = [
+        {
+            "productName": product["productName"],
+            "unitsSold": product["unitsSold"],
+            "revenue": _money(product["revenue"]),
+            "primaryChannels": [channel for _, channel in sorted(product["_channels"], reverse=True)],
+        }
+        for product in heapq.nlargest(
+            TOP_PRODUCTS, products.values(), key=lambda product: product["revenue"]
+        )
+    ]
+
+    # ---- low inventory: tracked quantities below the threshold, one query
+    low = Q(shop=shop, is_active=True, quantity__lt=LOW_INVENTORY_THRESHOLD)
+    low_inventory = [
+        {
+            "itemName": name,
+            "category": category,
+            "quantity": float(quantity),
+            "threshold": LOW_INVENTORY_THRESHOLD,
+        }
+        for name, category, quantity in (
+            Material.objects.filter(low)
+            .annotate(kind=Value("material"))
+            .values_list("name", "kind", "quantity")
+            .union(
+                Consumable.objects.filter(low)
+                .annotate(kind=Value("consumable"))
+                .values_list("name", "kind", "quantity")
+            )
+            .order_by("quantity", "name")[:LOW_INVENTORY_ITEMS]
+        )
+    ]
+
+    return {
+        "totals": {
+            "totalOrders": totals["orders"],
+            "totalRevenue": _money(totals["revenue"]),
+            "newCustomers": customers["current"],
+            "activeProjects": active_now,
+            "cancelledOrders": cancelled["current"],
+        },
+        "trends": {
+            "totalOrdersPctChange": pct_change(totals["orders"], totals["prev_orders"]),
+            "totalRevenuePctChange": pct_change(totals["revenue"], totals["prev_revenue"]),
+            "newCustomersPctChange": pct_change(customers["current"], customers["previous"]),
+            "activeProjectsPctChange": pct_change(active_now, active_previously),
+            "cancelledOrdersPctChange": pct_change(cancelled["current"], cancelled["previous"]),
+        },
+        "channels": channels,
+        "projectStatus": project_status,
+        "salesByMonth": sales_by_month,
+        "revenueVsExpenses": revenue_vs_expenses,
+        "topProducts": top_products,
+        "lowInventory": low_inventory,
+        "recentActivity": recent_activity(shop, current_start_at),
+    }
+
+
+def recent_activity(shop, since, limit=RECENT_ACTIVITY):
+    """
+    Newest orders, customers, stage moves and cancellations since `since`:
+    the newest `limit` of each (indexed, LIMITed queries), merged.
+    """
+    def newest(qs, field):
+        return qs.filter(**{f"{field}__gte": since}).order_by(f"-{field}")[:limit]
+
+    events = []
+    for sale_id, channel, price, sold_at in newest(Sale.objects.filter(shop=shop), "sold_at").values_list(
+        "id", "channel", "price", "sold_at"
+    ):
+        events.append(
+            {
+                "id": f"sale-{sale_id}",
+                "type": "order",
+                "message": f"Order {sale_id} sold via {channel or 'other'} for {price:.2f} {shop.currency}",
+                "timestamp": sold_at,
+            }
+        )
+    for customer_id, name, created_at in newest(
+        Customer.objects.filter(shop=shop), "created_at"
+    ).values_list("id", "name", "created_at"):
+        events.append(
+            {
+                "id": f"customer-{customer_id}",
+                "type": "customer",
+                "message": f"New customer: {name}",
+                "timestamp": created_at,
+            }
+        )
+    for history_id, project_name, stage_name, entered_at in newest(
+        ProjectStageHistory.objects.filter(project__shop=shop), "entered_at"
+    ).values_list("id", "project__name", "stage__name", "entered_at"):
+        events.append(
+            {
+                "id": f"stage-{history_id}",
+                "type": "project",
+                "message": f"{project_name} moved to {stage_name}",
+                "timestamp": entered_at,
+            }
+        )
+    for project_id, name, cancelled_at in newest(
+        Project.objects.filter(shop=shop, status="cancelled"), "cancelled_at"
+    ).values_list("id", "name", "cancelled_at"):
+        events.append(
+            {
+                "id": f"project-{project_id}",
+                "type": "project",
+                "message": f"Project cancelled: {name}",
+                "timestamp": cancelled_at,
+            }
+        )
+    return heapq.nlargest(limit, events, key=lambda event: event["timestamp"])
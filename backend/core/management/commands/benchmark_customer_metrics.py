@@ -0,0 +1,159 @@
+# core/management/commands/benchmark_customer_metrics.py
+
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from core.metrics import live_metric_annotations, rebuild_customer_metrics
+from core.models import Customer, Shop
+from products.models import ProductTemplate
+from projects.models import Project
+from sales.models import Sale
+from workflows.models import WorkflowDefinition, WorkflowStage
+
+
+METRICS = [
+    "total_projects",
+    "total_products",
+    "total_sales",
+    "lifetime_revenue",
+    "orders_this_year",
+    "completed_projects",
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the customer list metrics (join annotations vs per-metric "
+        "subqueries vs rollup) on seeded data. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=10000)
+        parser.add_argument("--projects", type=int, default=3, help="Projects per customer.")
+        parser.add_argument("--sales", type=int, default=2, help="Sales per customer.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per query; best is reported.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write("Seed data rolled back.")
+
+    # ---------------------------------------------------------------------
+
+    def _run(self, options):
+        shop = self._seed(options["customers"], options["projects"], options["sales"])
+        year = timezone.now().year
+        customers = Customer.objects.filter(shop=shop).order_by("id")
+
+        joined = customers.annotate(
+            total_projects=Count("projects", distinct=True),
+            total_products=Count("projects__template", distinct=True),
+            total_sales=Count("sales", distinct=True),
+            lifetime_revenue=Sum("sales__price"),
+            orders_this_year=Count(
+                "projects", filter=Q(projects__created_at__year=year), distinct=True
+            ),
+            completed_projects=Count(
+                "projects", filter=Q(projects__status="completed"), distinct=True
+            ),
+        )
+        subqueries = customers.annotate(**live_metric_annotations(year))
+
+        rebuild_customer_metrics(shop=shop)
+        rollup = customers.values("id", *(f"metrics__{name}" for name in METRICS))
+
+        results = {}
+        for label, qs in [
+            ("join annotations (before)", joined.values("id", *METRICS)),
+            ("subquery annotations", subqueries.values("id", *METRICS)),
+            ("rollup table (read)", rollup),
+        ]:
+            seconds, rows = self._time(qs, options["repeat"])
+            results[label] = rows
+            self.stdout.write(f"{label:<28} {seconds * 1000:10.1f} ms  ({len(rows)} rows)")
+
+        # the join fan-out multiplies Sum(sales__price) by the project count
+        before = {row["id"]: row["lifetime_revenue"] or 0 for row in results["join annotations (before)"]}
+        after = {row["id"]: row["lifetime_revenue"] for row in results["subquery annotations"]}
+        wrong = sum(1 for cid, value in after.items() if before[cid] != value)
+        self.stdout.write(f"customers with over-counted lifetime_revenue before: {wrong}")
+
+    def _time(self, qs, repeat):
+        best, rows = None, None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            rows = list(qs.all())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, rows
+
+    def _seed(self, num_customers, projects_per_customer, sales_per_customer):
+        rng = random.Random(42)
+        now = timezone.now()
+
+        user = get_user_model().objects.create(username=f"benchmark-{now.timestamp()}")
+        shop = Shop.objects.create(owner=user, name="Benchmark shop")
+        workflow = WorkflowDefinition.objects.create(shop=shop, name="Benchmark")
+        stage = WorkflowStage.objects.create(workflow=workflow, name="Build", order=1, key="build")
+        templates = [
+            ProductTemplate.objects.create(shop=shop, name=f"Template {i}", workflow=workflow)
+            for i in range(5)
+        ]
+
+        # bulk_create skips the model signals, so nothing is indexed or
+        # rolled up while seeding
+        customers = Customer.objects.bulk_create(
+            [Customer(shop=shop, name=f"Customer {i}") for i in range(num_customers)],
+            batch_size=1000,
+        )
+        projects = Project.objects.bulk_create(
+            [
+                Project(
+                    shop=shop,
+                    customer=customer,
+                    template=rng.choice(templates),
+                    workflow=workflow,
+                    current_stage=stage,
+                    name=f"Project {customer.pk}-{i}",
+                    status=rng.choice(["active", "completed", "cancelled"]),
+                )
+                for customer in customers
+                for i in range(projects_per_customer)
+            ],
+            batch_size=1000,
+        )
+        sales = Sale.objects.bulk_create(
+            [
+                Sale(
+                    shop=shop,
+                    customer=project.customer,
+                    project=project,
+                    price=Decimal(rng.randint(20, 400)),
+                    sold_at=now - timedelta(days=rng.randint(0, 700)),
+                )
+                for i, project in enumerate(projects)
+                if i % max(1, projects_per_customer) < sales_per_customer
+            ],
+            batch_size=1000,
+        )
+        self.stdout.write(
+            f"Seeded {len(customers)} customers, {len(projects)} projects, "
+            f"{len(sales)} sales."
+        )
+        return shop
@@ -0,0 +1,37 @@
+# core/management/commands/rebuild_customer_metrics.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.metrics import rebuild_customer_metrics
+from core.models import Shop
+
+
+class Command(BaseCommand):
+    help = "Rebuild the customer metrics rollup (core.CustomerMetrics) from projects and sales."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shop",
+            type=int,
+            default=None,
+            help="Only rebuild customers of this shop id.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Customers recomputed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        shop = None
+        if options["shop"] is not None:
+            shop = Shop.objects.filter(pk=options["shop"]).first()
+            if shop is None:
+                raise CommandError(f"Shop {options['shop']} does not exist.")
+
+        with transaction.atomic():
+            count = rebuild_customer_metrics(shop=shop, batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Customer metrics rebuilt for {count} customers."))
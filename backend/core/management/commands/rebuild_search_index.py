@@ -0,0 +1,33 @@
+# core/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Shop
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the global search index (core.SearchEntry) from source rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shop",
+            type=int,
+            default=None,
+            help="Only rebuild entries for this shop id.",
+        )
+
+    def handle(self, *args, **options):
+        shop = None
+        if options["shop"] is not None:
+            shop = Shop.objects.filter(pk=options["shop"]).first()
+            if shop is None:
+                raise CommandError(f"Shop {options['shop']} does not exist.")
+
+        with transaction.atomic():
+            counts = rebuild_index(shop=shop)
+
+        for entity_type, count in counts.items():
+            self.stdout.write(f"{entity_type}: {count}")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
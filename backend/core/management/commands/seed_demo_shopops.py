@@ -468,7 +468,6 @@ class Command(BaseCommand):
                 started_at=started_at,
                 completed_at=completed_at,
                 estimated_hours=estimated_hours,
-                actual_hours=actual_hours,
                 status=status,
                 expected_price=expected_price,
                 expected_currency=shop.currency,
@@ -483,7 +482,8 @@ class Command(BaseCommand):
             )
 
             self._seed_stage_history_for_project(project, stages, created_at)
-            self._seed_work_logs_for_project(project)
+            # actual_hours is summed from these logs (projects.hours)
+            self._seed_work_logs_for_project(project, actual_hours)
             projects.append(project)
 
         return projects
@@ -502,14 +502,14 @@ class Command(BaseCommand):
             entered_at += timedelta(days=random.randint(1, 7))
             ProjectStageHistory.objects.filter(pk=hist.pk).update(entered_at=entered_at)
 
-    def _seed_work_logs_for_project(self, project):
+    def _seed_work_logs_for_project(self, project, actual_hours=None):
         if not project.started_at:
             return
 
         end_time = project.completed_at or timezone.now()
         end_time = max(end_time, project.started_at + timedelta(hours=2))
 
-        total_hours = float(project.actual_hours or project.estimated_hours or 4)
+        total_hours = float(actual_hours or project.estimated_hours or 4)
         total_hours = max(total_hours, 1.0)
 
         num_logs = random.randint(1, 4)
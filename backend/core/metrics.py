@@ -0,0 +1,119 @@
+# core/metrics.py
+"""
+Per-customer rollup (core.CustomerMetrics) behind the customer list.
+
+Each metric is its own correlated subquery (core.subqueries), so there is
+no projects × sales join fan-out. Writes to Project / Sale refresh only
+the customers they touch (core.signals), after the transaction commits;
+`manage.py rebuild_customer_metrics` rebuilds everything.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Customer, CustomerMetrics
+from core.subqueries import SubqueryCount, SubquerySum
+from projects.models import Project
+from sales.models import Sale
+
+
+METRIC_FIELDS = [
+    "total_projects",
+    "total_products",
+    "total_sales",
+    "lifetime_revenue",
+    "orders_this_year",
+    "orders_year",
+    "completed_projects",
+]
+
+
+def live_metric_annotations(year):
+    """
+    The rollup's metrics computed live, one correlated subquery each
+    (core.subqueries), for annotating a Customer queryset.
+    """
+    projects = Project.objects.all()
+    return {
+        "total_projects": SubqueryCount(projects, "customer"),
+        "total_products": SubqueryCount(projects, "customer", "template", distinct=True),
+        "total_sales": SubqueryCount(Sale.objects.all(), "customer"),
+        "lifetime_revenue": SubquerySum(Sale.objects.all(), "customer", "price"),
+        "orders_this_year": SubqueryCount(projects.filter(created_at__year=year), "customer"),
+        "completed_projects": SubqueryCount(projects.filter(status="completed"), "customer"),
+    }
+
+
+def compute_metrics(customer_ids, year=None):
+    """
+    {customer_id: {metric: value}} for the given customers.
+    """
+    year = year or timezone.now().year
+    annotations = live_metric_annotations(year)
+    rows = (
+        Customer.objects.filter(id__in=customer_ids)
+        .order_by()
+        .annotate(**annotations)
+        .values("id", *annotations)
+    )
+    return {row.pop("id"): {**row, "orders_year": year} for row in rows}
+
+
+def refresh_customer_metrics(customer_ids):
+    """
+    Recompute and upsert the rollup rows for these customers.
+    """
+    customer_ids = {cid for cid in customer_ids if cid is not None}
+    if not customer_ids:
+        return 0
+
+    # only customers that still exist come back; deleted ones took their
+    # rollup row with them
+    year = timezone.now().year
+    computed = compute_metrics(customer_ids, year=year)
+    if not computed:
+        return 0
+
+    rows = [
+        CustomerMetrics(customer_id=customer_id, **values)
+        for customer_id, values in computed.items()
+    ]
+
+    CustomerMetrics.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["customer"],
+        update_fields=[*METRIC_FIELDS, "updated_at"],
+    )
+    return len(rows)
+
+
+def schedule_refresh(customer_ids):
+    """
+    Refresh once the current transaction commits (immediately in autocommit).
+    """
+    customer_ids = {cid for cid in customer_ids if cid is not None}
+    if customer_ids:
+        transaction.on_commit(partial(refresh_customer_metrics, customer_ids))
+
+
+def rebuild_customer_metrics(shop=None, batch_size=1000):
+    """
+    Recompute every customer's rollup row (optionally for one shop).
+    Returns the number of customers processed.
+    """
+    qs = Customer.objects.order_by("id")
+    if shop is not None:
+        qs = qs.filter(shop=shop)
+
+    total = 0
+    last_id = 0
+    while True:
+        batch = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+        if not batch:
+            break
+        total += refresh_customer_metrics(batch)
+        last_id = batch[-1]
+    return total
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_shop_address_line1_shop_address_line2_shop_city_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('subtitle', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='core.shop')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['shop', 'entity_type'], name='core_search_shop_id_6cc5d0_idx')],
+                'unique_together': {('entity_type', 'object_id')},
+            },
+        ),
+    ]
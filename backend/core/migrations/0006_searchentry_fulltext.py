@@ -0,0 +1,95 @@
+# Full-text index for core.SearchEntry.
+#
+# - SQLite: external-content FTS5 table kept in sync by triggers.
+# - Postgres: stored tsvector column + GIN index.
+# Other backends fall back to the ORM search engine and need nothing here.
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS core_searchentry_fts USING fts5(
+        label,
+        body,
+        content='core_searchentry',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_ai
+    AFTER INSERT ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(rowid, label, body)
+        VALUES (new.id, new.label, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_ad
+    AFTER DELETE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, label, body)
+        VALUES ('delete', old.id, old.label, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_au
+    AFTER UPDATE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, label, body)
+        VALUES ('delete', old.id, old.label, old.body);
+        INSERT INTO core_searchentry_fts(rowid, label, body)
+        VALUES (new.id, new.label, new.body);
+    END
+    """,
+    "INSERT INTO core_searchentry_fts(core_searchentry_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_au",
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_ad",
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_ai",
+    "DROP TABLE IF EXISTS core_searchentry_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE core_searchentry
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(label, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS core_searchentry_vector_gin
+    ON core_searchentry USING GIN (search_vector)
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_searchentry_vector_gin",
+    "ALTER TABLE core_searchentry DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_searchentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# On Postgres fuzzy matching uses pg_trgm directly on the label column;
+# the SearchTrigram side table stays empty there.
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS core_searchentry_label_trgm
+    ON core_searchentry USING GIN (label gin_trgm_ops)
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_searchentry_label_trgm",
+]
+
+
+def _run_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return run
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_searchentry_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shop_id', models.BigIntegerField()),
+                ('entity_type', models.CharField(max_length=20)),
+                ('trigram', models.CharField(max_length=3)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='core.searchentry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['shop_id', 'entity_type', 'trigram', 'entry'], name='core_search_shop_id_27d1f0_idx')],
+            },
+        ),
+        migrations.RunPython(
+            _run_postgres(POSTGRES_FORWARD),
+            _run_postgres(POSTGRES_BACKWARD),
+        ),
+    ]
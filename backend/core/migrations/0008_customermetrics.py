@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_searchtrigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerMetrics',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metrics', serialize=False, to='core.customer')),
+                ('total_projects', models.PositiveIntegerField(default=0)),
+                ('total_products', models.PositiveIntegerField(default=0)),
+                ('total_sales', models.PositiveIntegerField(default=0)),
+                ('lifetime_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('orders_this_year', models.PositiveIntegerField(default=0)),
+                ('orders_year', models.PositiveSmallIntegerField(default=0)),
+                ('completed_projects', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_customermetrics'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['shop', 'created_at', 'id'], name='core_custom_shop_id_71994d_idx'),
+        ),
+    ]
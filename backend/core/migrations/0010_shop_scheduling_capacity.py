@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:03
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_list_page_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shop',
+            name='daily_capacity_hours',
+            field=models.DecimalField(decimal_places=2, default=8, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='shop',
+            name='work_days',
+            field=models.JSONField(blank=True, default=core.models.default_work_days),
+        ),
+    ]
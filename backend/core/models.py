@@ -1,7 +1,13 @@
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.conf import settings
 from django.db import models
 
 
+def default_work_days():
+    return [0, 1, 2, 3, 4]
+
+
 class Shop(models.Model):
     owner = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -37,6 +43,10 @@ class Shop(models.Model):
     default_payment_terms = models.CharField(max_length=50, default="50/50")
     default_project_type = models.CharField(max_length=100, blank=True, null=True)
 
+    # Scheduling capacity: bench hours per working day, weekdays worked (0 = Monday)
+    daily_capacity_hours = models.DecimalField(max_digits=5, decimal_places=2, default=8)
+    work_days = models.JSONField(blank=True, default=default_work_days)
+
     # Appearance
     theme = models.CharField(
         max_length=20,
@@ -56,6 +66,16 @@ class Shop(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @property
+    def zoneinfo(self):
+        """
+        The shop's timezone as a tzinfo; UTC if the stored name is unknown.
+        """
+        try:
+            return ZoneInfo(self.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            return ZoneInfo("UTC")
+
     def __str__(self) -> str:
         return self.name
 
@@ -107,7 +127,99 @@ class Customer(models.Model):
         indexes = [
             models.Index(fields=["shop", "name"]),
             models.Index(fields=["shop", "email"]),
+            # list pages by (-created_at, -id)
+            models.Index(fields=["shop", "created_at", "id"]),
         ]
 
     def __str__(self) -> str:
         return self.name
+
+
+class SearchEntry(models.Model):
+    """
+    Denormalized, shop-scoped search document for one searchable row
+    (customer, project, material, consumable, equipment).
+
+    Kept in sync by core.signals; the full-text index itself lives next to
+    this table (FTS5 virtual table on SQLite, tsvector + GIN on Postgres).
+    """
+
+    shop = models.ForeignKey(
+        Shop,
+        on_delete=models.CASCADE,
+        related_name="search_entries",
+    )
+    entity_type = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+
+    label = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [("entity_type", "object_id")]
+        indexes = [
+            models.Index(fields=["shop", "entity_type"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.entity_type}:{self.object_id} – {self.label}"
+
+
+class SearchTrigram(models.Model):
+    """
+    Character trigram of a SearchEntry label, for typo-tolerant matching on
+    backends without pg_trgm. Maintained alongside SearchEntry.
+    """
+
+    entry = models.ForeignKey(
+        SearchEntry,
+        on_delete=models.CASCADE,
+        related_name="trigrams",
+    )
+    # denormalized from entry so candidate lookups stay on one index
+    shop_id = models.BigIntegerField()
+    entity_type = models.CharField(max_length=20)
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            # covering index: candidate lookup + GROUP BY entry never touch the table
+            models.Index(fields=["shop_id", "entity_type", "trigram", "entry"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.entry_id}:{self.trigram!r}"
+
+
+class CustomerMetrics(models.Model):
+    """
+    Materialized per-customer rollup for the customer list.
+
+    Refreshed from Project / Sale writes (core.signals) and rebuilt in full
+    with `manage.py rebuild_customer_metrics`. orders_this_year counts the
+    projects created in `orders_year`; readers treat it as 0 once the
+    calendar year has moved on.
+    """
+
+    customer = models.OneToOneField(
+        Customer,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="metrics",
+    )
+
+    total_projects = models.PositiveIntegerField(default=0)
+    total_products = models.PositiveIntegerField(default=0)
+    total_sales = models.PositiveIntegerField(default=0)
+    lifetime_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    orders_this_year = models.PositiveIntegerField(default=0)
+    orders_year = models.PositiveSmallIntegerField(default=0)
+    completed_projects = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Metrics for customer {self.customer_id}"
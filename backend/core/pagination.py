@@ -0,0 +1,111 @@
+# core/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Opt-in: a request is paginated only when it passes `cursor` or
+`page_size`; without either the endpoint keeps returning the plain list
+the current frontend expects.
+
+Pages are ordered on a composite key, `(-created_at, -id)` unless the
+view sets `cursor_ordering`, which must end in a unique field (`id`).
+DRF's CursorPagination keeps only the first field in the cursor and steps
+over ties with an OFFSET, which degrades to an offset scan when that field
+repeats (e.g. product names). Here the cursor holds the whole key and the
+next page is filtered on it as a tuple, `(a, b) > (x, y)` spelled out as
+
+    a >= x AND (a > x OR (a = x AND b > y))
+
+so each page is a range scan on the matching (shop, ..., id) index, and
+deep pages cost the same as the first.
+"""
+
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class OptInCursorPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._after(ordering, current_position))
+
+        # positions are unique, so `offset` only matters for cursors built
+        # by plain CursorPagination; one extra row tells if a page follows
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, "cursor_ordering", self.ordering))
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            name = order.lstrip("-")
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values)
+
+    def _after(self, ordering, position):
+        """
+        Rows strictly after `position` in `ordering`, as the expanded tuple
+        comparison (plus a bound on the leading field for the index).
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        fields = [(order.lstrip("-"), "lt" if order.startswith("-") else "gt") for order in ordering]
+        after = Q()
+        equal = Q()
+        for (name, op), value in zip(fields, values):
+            after |= equal & Q(**{f"{name}__{op}": value})
+            equal &= Q(**{name: value})
+        leading, op = fields[0]
+        return Q(**{f"{leading}__{op}e": values[0]}) & after
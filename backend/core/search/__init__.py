@@ -0,0 +1,23 @@
+from .documents import (
+    ENTITY_TYPES,
+    index_instance,
+    index_new_instances,
+    rebuild_index,
+    result_url,
+    unindex_instance,
+)
+from .engines import get_search_engine
+from .query import SearchQuery, compile_project_filters, parse_query
+
+__all__ = [
+    "ENTITY_TYPES",
+    "SearchQuery",
+    "compile_project_filters",
+    "get_search_engine",
+    "index_instance",
+    "index_new_instances",
+    "parse_query",
+    "rebuild_index",
+    "result_url",
+    "unindex_instance",
+]
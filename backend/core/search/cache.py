@@ -0,0 +1,90 @@
+# core/search/cache.py
+"""
+Per-shop search result cache.
+
+Keys look like  search:<shop_id>:v<version>:<digest of query and parts>,
+the query text normalized, the other parts (cursor token, page size, ...)
+as given. Any committed write to a searchable model bumps the shop's
+version (core.signals), so stale entries are simply never read again and age out through the cache
+backend's own TTL / max-entries culling — no explicit purge needed.
+
+Only uses get/set/add/incr, so it works with locmem, file, database and
+Redis-compatible backends alike.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+DEFAULT_TIMEOUT = 300
+
+
+def _cache():
+    return caches[getattr(settings, "SHOPOPS_SEARCH_CACHE", "default")]
+
+
+def _timeout():
+    return getattr(settings, "SHOPOPS_SEARCH_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def _version_key(shop_id) -> str:
+    return f"search:{shop_id}:version"
+
+
+def normalize_query(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def _seed_version() -> int:
+    # time-based seed: if the version key is ever evicted, a fresh seed can
+    # never collide with versions that older cached results were stored under
+    return time.time_ns() // 1_000_000
+
+
+def get_shop_version(shop_id) -> int:
+    cache = _cache()
+    key = _version_key(shop_id)
+    version = cache.get(key)
+    if version is None:
+        # add() so concurrent first readers agree on one seed
+        cache.add(key, _seed_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_shop_version(shop_id):
+    """
+    Move the shop to a new version; returns it, or None if the version
+    key was missing.
+    """
+    cache = _cache()
+    key = _version_key(shop_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # missing: the next reader seeds a fresh version anyway
+        return None
+
+
+def result_key(shop_id, version, query, *parts) -> str:
+    # only the query text is case/space-insensitive: cursor tokens are not
+    raw = "\x1f".join([normalize_query(query), *(str(p) for p in parts)])
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"search:{shop_id}:v{version}:{digest}"
+
+
+def get_or_compute(shop_id, query, parts, compute):
+    """
+    Return the cached value for (shop, current version, query, parts),
+    computing and storing it on a miss.
+    """
+    cache = _cache()
+    key = result_key(shop_id, get_shop_version(shop_id), query, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=_timeout())
+    return value
@@ -0,0 +1,277 @@
+# core/search/documents.py
+"""
+Mapping between searchable models and their core.SearchEntry documents.
+
+Each searchable model contributes:
+- label     -> main text in the UI (weighted highest in the index)
+- subtitle  -> secondary text shown under the label
+- body      -> everything else that should be matched by free text
+"""
+
+from django.apps import apps
+from django.db import connections, transaction
+
+from core.models import SearchEntry, SearchTrigram, Shop
+
+from . import cache as search_cache
+from . import trigrams
+from .engines import get_search_engine
+
+
+# entity_type -> "app_label.ModelName"
+SEARCHABLE_MODELS = {
+    "customer": "core.Customer",
+    "project": "projects.Project",
+    "material": "inventory.Material",
+    "consumable": "inventory.Consumable",
+    "equipment": "inventory.Equipment",
+}
+
+# entity_type -> frontend route
+RESULT_URLS = {
+    "customer": "/customers/{id}",
+    "project": "/projects/{id}",
+    "material": "/inventory/materials/{id}",
+    "consumable": "/inventory/consumables/{id}",
+    "equipment": "/inventory/equipment/{id}",
+}
+
+ENTITY_TYPES = list(SEARCHABLE_MODELS)
+
+
+def get_model(entity_type: str):
+    return apps.get_model(SEARCHABLE_MODELS[entity_type])
+
+
+def entity_type_for(instance):
+    label = instance._meta.label
+    for entity_type, model_label in SEARCHABLE_MODELS.items():
+        if model_label == label:
+            return entity_type
+    return None
+
+
+def result_url(entity_type: str, object_id) -> str:
+    return RESULT_URLS[entity_type].format(id=object_id)
+
+
+def _join(*parts) -> str:
+    return " ".join(str(p) for p in parts if p)
+
+
+def build_document(entity_type: str, obj):
+    """
+    Return the {label, subtitle, body} document for a model instance,
+    or None when the row should not be searchable (e.g. soft-deleted inventory).
+    """
+    if entity_type == "customer":
+        return {
+            "label": obj.name,
+            "subtitle": obj.email or obj.phone or "",
+            "body": _join(obj.email, obj.phone),
+        }
+
+    if entity_type == "project":
+        return {
+            "label": obj.name,
+            "subtitle": obj.status or "",
+            "body": _join(obj.status, obj.notes),
+        }
+
+    # Inventory: inactive rows are soft-deleted and never searchable
+    if not obj.is_active:
+        return None
+
+    if entity_type == "material":
+        return {
+            "label": obj.name,
+            "subtitle": obj.category or obj.supplier_name or "",
+            "body": _join(obj.category, obj.supplier_name, obj.notes),
+        }
+
+    # consumable / equipment
+    return {
+        "label": obj.name,
+        "subtitle": obj.notes[:60] if obj.notes else "",
+        "body": obj.notes or "",
+    }
+
+
+def _entry_fields(document):
+    return {
+        "label": (document["label"] or "")[:255],
+        "subtitle": (document["subtitle"] or "")[:255],
+        "body": document["body"] or "",
+    }
+
+
+def index_instance(instance):
+    """
+    Create/update (or remove) the SearchEntry for a single saved instance.
+    Returns the entry, or None when the instance is not searchable.
+    """
+    entity_type = entity_type_for(instance)
+    if entity_type is None:
+        return None
+
+    document = build_document(entity_type, instance)
+    if document is None:
+        unindex_instance(instance)
+        return None
+
+    fields = {"shop_id": instance.shop_id, **_entry_fields(document)}
+    entry = SearchEntry.objects.filter(
+        entity_type=entity_type, object_id=instance.pk
+    ).first()
+
+    if entry is None:
+        entry = SearchEntry.objects.create(
+            entity_type=entity_type, object_id=instance.pk, **fields
+        )
+        label_changed = True
+    else:
+        label_changed = entry.label != fields["label"]
+        for name, value in fields.items():
+            setattr(entry, name, value)
+        entry.save()
+
+    # trigrams only depend on the label
+    if label_changed and get_search_engine().uses_trigram_table:
+        trigrams.index_entry_trigrams(entry)
+
+    return entry
+
+
+def index_new_instances(instances, batch_size=1000):
+    """
+    Index freshly bulk_create()d rows (no signals fire for those) with
+    bulk inserts. Returns the created entries.
+    """
+    entries = []
+    for obj in instances:
+        entity_type = entity_type_for(obj)
+        document = build_document(entity_type, obj) if entity_type else None
+        if document is None:
+            continue
+        entries.append(
+            SearchEntry(
+                shop_id=obj.shop_id,
+                entity_type=entity_type,
+                object_id=obj.pk,
+                **_entry_fields(document),
+            )
+        )
+
+    SearchEntry.objects.bulk_create(entries, batch_size=batch_size)
+    if get_search_engine().uses_trigram_table:
+        SearchTrigram.objects.bulk_create(
+            [
+                row
+                for entry in entries
+                if entry.entity_type in trigrams.FUZZY_ENTITY_TYPES
+                for row in trigrams.build_trigram_rows(
+                    entry.id, entry.shop_id, entry.entity_type, entry.label
+                )
+            ],
+            batch_size=batch_size,
+        )
+    return entries
+
+
+def unindex_instance(instance):
+    entity_type = entity_type_for(instance)
+    if entity_type is None:
+        return
+    SearchEntry.objects.filter(entity_type=entity_type, object_id=instance.pk).delete()
+
+
+def rebuild_index(shop=None, batch_size=1000):
+    """
+    Rebuild SearchEntry rows from scratch (all shops, or a single shop).
+    Once committed, every rebuilt shop moves to a new search version, so
+    cached results and loaded suggest indexes from before are not served.
+
+    Returns {entity_type: indexed_count}.
+    """
+    shop_ids = [shop.pk] if shop is not None else list(Shop.objects.values_list("pk", flat=True))
+
+    def bump_versions():
+        for shop_id in shop_ids:
+            search_cache.bump_shop_version(shop_id)
+
+    transaction.on_commit(bump_versions)
+
+    entries = SearchEntry.objects.all()
+    if shop is not None:
+        entries = entries.filter(shop=shop)
+    entries.delete()
+
+    with_trigrams = get_search_engine().uses_trigram_table
+
+    def flush(batch):
+        SearchEntry.objects.bulk_create(batch)
+        if with_trigrams:
+            SearchTrigram.objects.bulk_create(
+                [
+                    row
+                    for entry in batch
+                    if entry.entity_type in trigrams.FUZZY_ENTITY_TYPES
+                    for row in trigrams.build_trigram_rows(
+                        entry.id, entry.shop_id, entry.entity_type, entry.label
+                    )
+                ],
+                batch_size=batch_size,
+            )
+
+    counts = {}
+    for entity_type in ENTITY_TYPES:
+        qs = get_model(entity_type).objects.all()
+        if shop is not None:
+            qs = qs.filter(shop=shop)
+
+        batch = []
+        indexed = 0
+        for obj in qs.iterator(chunk_size=batch_size):
+            document = build_document(entity_type, obj)
+            if document is None:
+                continue
+            batch.append(
+                SearchEntry(
+                    shop_id=obj.shop_id,
+                    entity_type=entity_type,
+                    object_id=obj.pk,
+                    **_entry_fields(document),
+                )
+            )
+            if len(batch) >= batch_size:
+                flush(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            flush(batch)
+            indexed += len(batch)
+
+        counts[entity_type] = indexed
+
+    return counts
+
+
+def backfill_index(using="default", **kwargs):
+    """
+    post_migrate: index existing rows the first time the search index
+    exists, so search works right after the upgrade that adds it.
+    Afterwards the table is never empty while searchable rows exist, and
+    this costs two cheap queries per migrate.
+    """
+    tables = set(connections[using].introspection.table_names())
+    models = [get_model(entity_type) for entity_type in ENTITY_TYPES]
+    if SearchEntry._meta.db_table not in tables or any(
+        model._meta.db_table not in tables for model in models
+    ):
+        # partial migrate: not every searchable table exists yet
+        return
+    if SearchEntry.objects.using(using).exists():
+        return
+    if not any(model.objects.using(using).exists() for model in models):
+        return
+    rebuild_index()
@@ -0,0 +1,448 @@
+# core/search/engines.py
+"""
+Pluggable full-text search engines over core.SearchEntry.
+
+- Fts5SearchEngine      -> SQLite FTS5 virtual table (dev / single node)
+- PostgresSearchEngine  -> tsvector column + GIN index
+- BasicSearchEngine     -> plain ORM icontains (any other backend)
+
+Pick one with settings.SHOPOPS_SEARCH_ENGINE ("auto", "fts5", "postgres",
+"basic"); "auto" chooses based on the database vendor.
+"""
+
+import re
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import SearchEntry
+
+from . import ranking, trigrams
+
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+SEGMENT_RE = re.compile(r'"([^"]*)"|([^\s"]+)')
+
+
+def tokenize(text: str):
+    """
+    Split free text into match terms: a tuple of one word for bare words
+    (matched as a prefix), several words for a "quoted phrase".
+    """
+    terms = []
+    for phrase, bare in SEGMENT_RE.findall((text or "").lower()):
+        words = TOKEN_RE.findall(phrase or bare)
+        if phrase and len(words) > 1:
+            terms.append(tuple(words))
+        else:
+            terms.extend((w,) for w in words)
+    return terms
+
+
+def _nothing_to_match(q, tokens):
+    # punctuation-only input: no tokens, but not a blank "browse" query either
+    return not tokens and bool((q or "").strip())
+
+
+def _row_to_result(row):
+    entity_type, object_id, label, subtitle, score = row
+    return {
+        "type": entity_type,
+        "id": object_id,
+        "label": label,
+        "subtitle": subtitle or "",
+        "score": float(score or 0),
+    }
+
+
+def _fetch(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [_row_to_result(row) for row in cursor.fetchall()]
+
+
+def _page_row(row):
+    entity_type, object_id, label, subtitle, score, entry_id = row
+    return {
+        "type": entity_type,
+        "id": object_id,
+        "label": label,
+        "subtitle": subtitle or "",
+        "score": float(score or 0),
+        "entry_id": entry_id,
+    }
+
+
+def _union_all(parts):
+    """
+    Combine (sql, params) parts with UNION ALL; each part keeps its own
+    ORDER BY/LIMIT by being wrapped in a derived table.
+    """
+    sqls, params = [], []
+    for i, (sql, part_params) in enumerate(parts):
+        sqls.append(f"SELECT * FROM ({sql}) AS part_{i}")
+        params.extend(part_params)
+    return " UNION ALL ".join(sqls), params
+
+
+class BaseSearchEngine:
+    name = "base"
+
+    # False when fuzzy matching runs on a native index (pg_trgm) instead
+    # of the core.SearchTrigram side table
+    uses_trigram_table = True
+
+    def search(self, shop, q, entity_type, limit):
+        """
+        Return up to `limit` results for one entity type, best match first.
+        Each result is {type, id, label, subtitle, score}.
+        """
+        raise NotImplementedError
+
+    def match_ids(self, shop, q, entity_type, limit):
+        """
+        Ranked object ids for one entity type (used to combine free text
+        with model-level filters, e.g. project status/stage).
+        """
+        return [r["id"] for r in self.search(shop, q, entity_type, limit)]
+
+    # candidates per type for engines that rank pages in Python
+    PAGE_CANDIDATE_LIMIT = 200
+
+    def search_page(self, shop, q, entity_types, page_size, cursor=None):
+        """
+        One page of relevance-ranked results merged across `entity_types`.
+        Returns (rows, next_cursor_token); rows carry `score` and `entry_id`.
+
+        Fallback implementation: score a bounded candidate set in Python.
+        """
+        tokens = tokenize(q)
+        if _nothing_to_match(q, tokens):
+            return [], None
+
+        asof = cursor.asof if cursor else timezone.now()
+        q_norm = ranking.normalized_text(q)
+        candidates = []
+        for entity_type in entity_types:
+            for entry in self.candidate_entries(shop, tokens, entity_type):
+                row = {
+                    "type": entry.entity_type,
+                    "id": entry.object_id,
+                    "label": entry.label,
+                    "subtitle": entry.subtitle or "",
+                    "entry_id": entry.id,
+                    "score": ranking.python_score(
+                        entry.entity_type, entry.label, entry.updated_at, q_norm, asof
+                    ),
+                }
+                if ranking.is_after(row, cursor):
+                    candidates.append(row)
+
+        return ranking.build_page(candidates, page_size, asof)
+
+    def candidate_entries(self, shop, tokens, entity_type):
+        raise NotImplementedError
+
+    def fuzzy_sql(self, q, query_grams, shop_id, entity_type, limit):
+        return trigrams.side_table_sql(query_grams, shop_id, entity_type, limit)
+
+    def fuzzy_search(self, shop, q, entity_types, limit):
+        """
+        Typo-tolerant match on labels by trigram similarity, up to `limit`
+        results per entity type in one statement.
+        """
+        entity_types = [t for t in entity_types if t in trigrams.FUZZY_ENTITY_TYPES]
+        query_grams = trigrams.trigrams(q)
+        if not entity_types or not query_grams:
+            return []
+
+        sql, params = _union_all(
+            [
+                self.fuzzy_sql(q, query_grams, shop.id, entity_type, limit)
+                for entity_type in entity_types
+            ]
+        )
+        return _group_by_type(_fetch(sql, params), entity_types)
+
+
+def _group_by_type(rows, entity_types):
+    """
+    UNION ALL gives no ordering guarantee across (or inside) its parts:
+    restore type grouping, best score first.
+    """
+    position = {t: i for i, t in enumerate(entity_types)}
+    return sorted(
+        rows,
+        key=lambda r: (position[r["type"]], -r["score"], -r["id"]),
+    )
+
+
+class RawSQLSearchEngine(BaseSearchEngine):
+    """
+    Engines that rank inside the database with a single SQL statement
+    per entity type.
+    """
+
+    def build_match(self, tokens):
+        raise NotImplementedError
+
+    def ranked_sql(self, match, shop_id, entity_type, limit):
+        """
+        Return (sql, params) selecting
+        (entity_type, object_id, label, subtitle, score) ordered by score.
+        """
+        raise NotImplementedError
+
+    def match_clause(self, tokens):
+        """
+        Return (from_sql, rank_sql, rank_params, where_sql, where_params)
+        for a full-text match; rank_sql is a 0..1 relevance expression.
+        """
+        raise NotImplementedError
+
+    def age_days_sql(self):
+        """
+        SQL for the age of e.updated_at in days, relative to one %s param.
+        """
+        raise NotImplementedError
+
+    def age_param(self, asof):
+        return asof
+
+    def page_part_sql(self, tokens, q_norm, shop_id, entity_type, asof, cursor, limit):
+        if tokens:
+            from_sql, rank_sql, rank_params, where_sql, where_params = self.match_clause(tokens)
+        else:
+            from_sql, rank_sql, rank_params = "core_searchentry e", "0.0", []
+            where_sql, where_params = "1 = 1", []
+
+        keyset_sql, keyset_params = "1 = 1", []
+        if cursor is not None:
+            keyset_sql = "(s.score < %s OR (s.score = %s AND s.entry_id < %s))"
+            keyset_params = [cursor.score, cursor.score, cursor.entry_id]
+
+        sql = (
+            "SELECT * FROM ("
+            "SELECT e.entity_type, e.object_id, e.label, e.subtitle, "
+            f"%s * ({rank_sql} "
+            f"+ CASE WHEN LOWER(e.label) = %s THEN {ranking.EXACT_BONUS} ELSE 0.0 END "
+            f"+ CASE WHEN LOWER(e.label) LIKE %s ESCAPE '\\' THEN {ranking.PREFIX_BONUS} ELSE 0.0 END) "
+            f"+ {ranking.RECENCY_WEIGHT} / (1.0 + {self.age_days_sql()} / {ranking.RECENCY_HALF_LIFE_DAYS}) "
+            "AS score, "
+            "e.id AS entry_id "
+            f"FROM {from_sql} "
+            f"WHERE {where_sql} AND e.shop_id = %s AND e.entity_type = %s"
+            ") s "
+            f"WHERE {keyset_sql} "
+            "ORDER BY s.score DESC, s.entry_id DESC "
+            "LIMIT %s"
+        )
+        params = [
+            ranking.TYPE_WEIGHTS.get(entity_type, 1.0),
+            *rank_params,
+            q_norm,
+            ranking.like_prefix(q_norm),
+            self.age_param(asof),
+            *where_params,
+            shop_id,
+            entity_type,
+            *keyset_params,
+            limit,
+        ]
+        return sql, params
+
+    def search_page(self, shop, q, entity_types, page_size, cursor=None):
+        """
+        Every entity type's next page_size + 1 rows after the cursor in one
+        UNION ALL statement, then a bounded top-k merge.
+        """
+        tokens = tokenize(q)
+        if _nothing_to_match(q, tokens):
+            return [], None
+
+        asof = cursor.asof if cursor else timezone.now()
+        q_norm = ranking.normalized_text(q)
+        sql, params = _union_all(
+            [
+                self.page_part_sql(
+                    tokens, q_norm, shop.id, entity_type, asof, cursor, page_size + 1
+                )
+                for entity_type in entity_types
+            ]
+        )
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(sql, params)
+            rows = [_page_row(row) for row in db_cursor.fetchall()]
+
+        return ranking.build_page(rows, page_size, asof)
+
+    def browse_sql(self, shop_id, entity_type, limit):
+        sql = (
+            "SELECT e.entity_type, e.object_id, e.label, e.subtitle, 0 AS score "
+            "FROM core_searchentry e "
+            "WHERE e.shop_id = %s AND e.entity_type = %s "
+            "ORDER BY e.updated_at DESC, e.id DESC "
+            "LIMIT %s"
+        )
+        return sql, [shop_id, entity_type, limit]
+
+    def part_sql(self, tokens, shop_id, entity_type, limit):
+        if not tokens:
+            return self.browse_sql(shop_id, entity_type, limit)
+        return self.ranked_sql(self.build_match(tokens), shop_id, entity_type, limit)
+
+    def search(self, shop, q, entity_type, limit):
+        tokens = tokenize(q)
+        if _nothing_to_match(q, tokens):
+            return []
+        return _fetch(*self.part_sql(tokens, shop.id, entity_type, limit))
+
+
+class Fts5SearchEngine(RawSQLSearchEngine):
+    name = "fts5"
+
+    # bm25 column weights: label, body
+    LABEL_WEIGHT = 10.0
+    BODY_WEIGHT = 1.0
+
+    def build_match(self, tokens):
+        # every term must match; bare words as a prefix (search-as-you-type)
+        return " ".join(
+            f'"{t[0]}"*' if len(t) == 1 else '"' + " ".join(t) + '"'
+            for t in tokens
+        )
+
+    def match_clause(self, tokens):
+        bm25 = f"bm25(core_searchentry_fts, {self.LABEL_WEIGHT}, {self.BODY_WEIGHT})"
+        return (
+            "core_searchentry_fts JOIN core_searchentry e ON e.id = core_searchentry_fts.rowid",
+            # bm25 is negative, better matches more so: squash -bm25 to 0..1
+            f"((-{bm25}) / (1.0 - {bm25}))",
+            [],
+            "core_searchentry_fts MATCH %s",
+            [self.build_match(tokens)],
+        )
+
+    def age_days_sql(self):
+        return "(julianday(%s) - julianday(e.updated_at))"
+
+    def age_param(self, asof):
+        # same naive-UTC text format Django stores datetimes in on SQLite
+        return asof.astimezone(dt_timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    def ranked_sql(self, match, shop_id, entity_type, limit):
+        sql = (
+            "SELECT e.entity_type, e.object_id, e.label, e.subtitle, "
+            f"-bm25(core_searchentry_fts, {self.LABEL_WEIGHT}, {self.BODY_WEIGHT}) AS score "
+            "FROM core_searchentry_fts "
+            "JOIN core_searchentry e ON e.id = core_searchentry_fts.rowid "
+            "WHERE core_searchentry_fts MATCH %s "
+            "AND e.shop_id = %s AND e.entity_type = %s "
+            "ORDER BY score DESC, e.id DESC "
+            "LIMIT %s"
+        )
+        return sql, [match, shop_id, entity_type, limit]
+
+
+class PostgresSearchEngine(RawSQLSearchEngine):
+    name = "postgres"
+    uses_trigram_table = False
+
+    def build_match(self, tokens):
+        return " & ".join(
+            f"{t[0]}:*" if len(t) == 1 else "(" + " <-> ".join(t) + ")"
+            for t in tokens
+        )
+
+    def match_clause(self, tokens):
+        return (
+            "core_searchentry e",
+            "ts_rank(e.search_vector, to_tsquery('simple', %s))",
+            [self.build_match(tokens)],
+            "e.search_vector @@ to_tsquery('simple', %s)",
+            [self.build_match(tokens)],
+        )
+
+    def age_days_sql(self):
+        return "(EXTRACT(EPOCH FROM (%s - e.updated_at)) / 86400.0)"
+
+    def ranked_sql(self, match, shop_id, entity_type, limit):
+        sql = (
+            "SELECT e.entity_type, e.object_id, e.label, e.subtitle, "
+            "ts_rank(e.search_vector, to_tsquery('simple', %s)) AS score "
+            "FROM core_searchentry e "
+            "WHERE e.search_vector @@ to_tsquery('simple', %s) "
+            "AND e.shop_id = %s AND e.entity_type = %s "
+            "ORDER BY score DESC, e.id DESC "
+            "LIMIT %s"
+        )
+        return sql, [match, match, shop_id, entity_type, limit]
+
+    def fuzzy_sql(self, q, query_grams, shop_id, entity_type, limit):
+        # pg_trgm builds its own trigrams from the text
+        text = " ".join(trigrams.WORD_RE.findall(q.lower()))
+        sql = (
+            "SELECT e.entity_type, e.object_id, e.label, e.subtitle, "
+            "word_similarity(%s, e.label) AS score "
+            "FROM core_searchentry e "
+            "WHERE %s <%% e.label "
+            "AND e.shop_id = %s AND e.entity_type = %s "
+            "ORDER BY score DESC, similarity(%s, e.label) DESC, e.id DESC "
+            "LIMIT %s"
+        )
+        return sql, [text, text, shop_id, entity_type, text, limit]
+
+
+class BasicSearchEngine(BaseSearchEngine):
+    name = "basic"
+
+    def search(self, shop, q, entity_type, limit):
+        tokens = tokenize(q)
+        if _nothing_to_match(q, tokens):
+            return []
+        rows = self.base_queryset(shop, tokens, entity_type).values_list(
+            "entity_type", "object_id", "label", "subtitle"
+        )[:limit]
+        return [_row_to_result((*row, 0)) for row in rows]
+
+    def candidate_entries(self, shop, tokens, entity_type):
+        return self.base_queryset(shop, tokens, entity_type)[: self.PAGE_CANDIDATE_LIMIT]
+
+    def base_queryset(self, shop, tokens, entity_type):
+        qs = SearchEntry.objects.filter(shop=shop, entity_type=entity_type)
+        for token in tokens:
+            text = " ".join(token)
+            qs = qs.filter(Q(label__icontains=text) | Q(body__icontains=text))
+        ordering = ("-id",) if tokens else ("-updated_at", "-id")
+        return qs.order_by(*ordering)
+
+
+ENGINES = {
+    "fts5": Fts5SearchEngine,
+    "postgres": PostgresSearchEngine,
+    "basic": BasicSearchEngine,
+}
+
+VENDOR_ENGINES = {
+    "sqlite": "fts5",
+    "postgresql": "postgres",
+}
+
+_engine_cache = {}
+
+
+def get_search_engine():
+    """
+    Return the configured search engine for the default database.
+    """
+    name = getattr(settings, "SHOPOPS_SEARCH_ENGINE", "auto")
+    if name == "auto":
+        name = VENDOR_ENGINES.get(connection.vendor, "basic")
+
+    engine = _engine_cache.get(name)
+    if engine is None:
+        engine = _engine_cache[name] = ENGINES[name]()
+    return engine
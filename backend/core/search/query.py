@@ -0,0 +1,213 @@
+# core/search/query.py
+"""
+Search box query language, parsed in one pass into a small typed AST.
+
+    customer: amy                 -> entity prefix + free text
+    projects for amy              -> projects filtered by customer name
+    walnut "end grain" status:active stage:sanding due:overdue tag:urgent price>=50
+
+Parsed queries are immutable and cached (search-as-you-type re-sends
+near-identical strings constantly); filters compile straight to ORM Q objects.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.db.models import Q
+
+
+# entity prefixes like "customer: amy"
+PREFIX_MAP = {
+    "customer": "customer",
+    "customers": "customer",
+    "cust": "customer",
+    "c": "customer",
+
+    "project": "project",
+    "projects": "project",
+    "proj": "project",
+    "p": "project",
+
+    "material": "material",
+    "materials": "material",
+    "mat": "material",
+
+    "consumable": "consumable",
+    "consumables": "consumable",
+    "cons": "consumable",
+
+    "equipment": "equipment",
+    "equip": "equipment",
+    "eq": "equipment",
+}
+
+FILTER_KEYS = ("status", "stage", "due", "tag")
+
+PRICE_LOOKUPS = {
+    ">": "expected_price__gt",
+    ">=": "expected_price__gte",
+    "<": "expected_price__lt",
+    "<=": "expected_price__lte",
+    "=": "expected_price",
+}
+
+PARSE_CACHE_SIZE = 2048
+
+# One master pattern; alternatives are tried left to right at each position,
+# so the input is consumed in a single left-to-right scan.
+TOKEN_RE = re.compile(
+    r"""
+      (?P<ws>\s+)
+    | (?P<filter>(?:status|stage|due|tag))\s*:\s*
+      (?:"(?P<filter_dq>[^"]*)"|'(?P<filter_sq>[^']*)'|(?P<filter_word>[^\s"']+))
+    | price\s*(?P<price_op>>=|<=|>|<|=)\s*(?P<price_value>[0-9]+(?:\.[0-9]+)?)
+    | "(?P<phrase_dq>[^"]*)"?
+    | '(?P<phrase_sq>[^']*)'?
+    | (?P<word>[^\s"']+)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+PREFIX_RE = re.compile(r"\s*([A-Za-z]+)\s*:")
+PROJECTS_FOR_RE = re.compile(r"""\s*["']?\s*projects\s+for\s+(.+?)\s*["']?\s*$""", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class PriceFilter:
+    op: str
+    value: Decimal
+
+
+@dataclass(frozen=True)
+class ProjectFilters:
+    status: str | None = None
+    stage: str | None = None
+    due: str | None = None
+    tag: str | None = None
+    price: PriceFilter | None = None
+    customer_name: str | None = None
+
+    def __bool__(self):
+        return any(
+            v is not None
+            for v in (self.status, self.stage, self.due, self.tag, self.price, self.customer_name)
+        )
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    entity: str | None
+    terms: tuple = ()
+    phrases: tuple = ()
+    filters: ProjectFilters = ProjectFilters()
+
+    @property
+    def text(self) -> str:
+        """
+        Free text for the search engine; phrases keep their quotes.
+        """
+        return " ".join([*self.terms, *(f'"{p}"' for p in self.phrases)])
+
+
+def _scan(text: str):
+    """
+    Single pass over `text` → (terms, phrases, filter values).
+    """
+    terms, phrases = [], []
+    values = {}
+
+    for m in TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "ws":
+            continue
+
+        if m.group("filter"):
+            key = m.group("filter").lower()
+            value = m.group("filter_dq") or m.group("filter_sq") or m.group("filter_word")
+            # first occurrence wins
+            if value and key not in values:
+                values[key] = value.strip()
+        elif m.group("price_op"):
+            if "price" not in values:
+                try:
+                    values["price"] = PriceFilter(
+                        m.group("price_op"), Decimal(m.group("price_value"))
+                    )
+                except InvalidOperation:
+                    pass
+        elif m.group("phrase_dq") is not None or m.group("phrase_sq") is not None:
+            phrase = (m.group("phrase_dq") or m.group("phrase_sq") or "").strip()
+            if phrase:
+                phrases.append(phrase)
+        else:
+            terms.append(m.group("word"))
+
+    return tuple(terms), tuple(phrases), values
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_query(text: str) -> SearchQuery:
+    """
+    Parse raw search box text into a SearchQuery.
+
+    If project filters are present without an explicit entity prefix the
+    query is treated as a project search.
+    """
+    text = (text or "").strip()
+
+    # natural language: projects for amy → projects whose customer matches
+    m = PROJECTS_FOR_RE.match(text)
+    if m:
+        return SearchQuery(
+            entity="project",
+            filters=ProjectFilters(customer_name=m.group(1)),
+        )
+
+    entity = None
+    m = PREFIX_RE.match(text)
+    if m and m.group(1).lower() in PREFIX_MAP:
+        entity = PREFIX_MAP[m.group(1).lower()]
+        text = text[m.end():]
+
+    terms, phrases, values = _scan(text)
+    filters = ProjectFilters(**values)
+
+    if entity is None and filters:
+        entity = "project"
+
+    return SearchQuery(entity=entity, terms=terms, phrases=phrases, filters=filters)
+
+
+def compile_project_filters(filters: ProjectFilters, today: date) -> Q:
+    """
+    Compile parsed project filters to a single Q over projects.Project.
+    """
+    q = Q()
+
+    if filters.status:
+        q &= Q(status__icontains=filters.status)
+
+    if filters.stage:
+        q &= Q(current_stage__name__icontains=filters.stage)
+
+    if filters.due:
+        due = filters.due.lower()
+        if due == "today":
+            q &= Q(due_date=today)
+        elif due == "overdue":
+            q &= Q(due_date__lt=today, completed_at__isnull=True)
+
+    # tag: urgent — treat as fuzzy match in status/notes
+    if filters.tag:
+        q &= Q(notes__icontains=filters.tag) | Q(status__icontains=filters.tag)
+
+    if filters.price is not None:
+        q &= Q(**{PRICE_LOOKUPS[filters.price.op]: filters.price.value})
+
+    if filters.customer_name:
+        q &= Q(customer__name__icontains=filters.customer_name)
+
+    return q
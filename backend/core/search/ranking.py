@@ -0,0 +1,121 @@
+# core/search/ranking.py
+"""
+Relevance scoring, cross-entity top-k merge and opaque page cursors for
+global search.
+
+    score = type_weight * (text_rank + exact_bonus + prefix_bonus)
+            + RECENCY_WEIGHT / (1 + age_days / RECENCY_HALF_LIFE_DAYS)
+
+text_rank is the engine's own relevance, squashed to 0..1 (FTS5 bm25 /
+Postgres ts_rank; label hits already weigh more than body hits there).
+Engines compute the score in SQL so pages can be fetched by keyset
+(score, entry_id) without re-running earlier pages.
+"""
+
+import base64
+import heapq
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from rest_framework.exceptions import ValidationError
+
+
+TYPE_WEIGHTS = {
+    "customer": 1.0,
+    "project": 1.0,
+    "material": 0.9,
+    "consumable": 0.8,
+    "equipment": 0.8,
+}
+
+EXACT_BONUS = 3.0
+PREFIX_BONUS = 1.5
+RECENCY_WEIGHT = 0.5
+RECENCY_HALF_LIFE_DAYS = 30.0
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """
+    Position after the last returned row, plus the reference time used for
+    recency so every page of one search scores rows identically.
+    """
+
+    score: float
+    entry_id: int
+    asof: datetime
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            {"s": self.score, "e": self.entry_id, "t": self.asof.isoformat()},
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @classmethod
+    def decode(cls, token: str) -> "PageCursor":
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            return cls(
+                score=float(data["s"]),
+                entry_id=int(data["e"]),
+                asof=datetime.fromisoformat(data["t"]),
+            )
+        except (ValueError, KeyError, TypeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+
+
+def normalized_text(q: str) -> str:
+    return " ".join((q or "").lower().replace('"', " ").split())
+
+
+def like_prefix(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def python_score(entity_type, label, updated_at, q_norm, asof, text_rank=0.0):
+    """
+    Same formula as the engines' SQL, for engines that rank in Python.
+    """
+    lower = (label or "").lower()
+    bonus = 0.0
+    if q_norm and lower == q_norm:
+        bonus += EXACT_BONUS
+    if q_norm and lower.startswith(q_norm):
+        bonus += PREFIX_BONUS
+    age_days = max((asof - updated_at).total_seconds(), 0) / 86400.0
+    return (
+        TYPE_WEIGHTS.get(entity_type, 1.0) * (text_rank + bonus)
+        + RECENCY_WEIGHT / (1.0 + age_days / RECENCY_HALF_LIFE_DAYS)
+    )
+
+
+def is_after(row, cursor: PageCursor | None) -> bool:
+    if cursor is None:
+        return True
+    return (row["score"], row["entry_id"]) < (cursor.score, cursor.entry_id)
+
+
+def merge_top_k(rows, page_size):
+    """
+    Merge candidate rows from every entity type, keeping only the best
+    page_size + 1 (the extra row tells us whether there is a next page).
+    """
+    return heapq.nlargest(
+        page_size + 1, rows, key=lambda r: (r["score"], r["entry_id"])
+    )
+
+
+def build_page(rows, page_size, asof):
+    """
+    -> (results, next_cursor_token_or_None)
+    """
+    top = merge_top_k(rows, page_size)
+    page = top[:page_size]
+    next_token = None
+    if len(top) > page_size and page:
+        last = page[-1]
+        next_token = PageCursor(last["score"], last["entry_id"], asof).encode()
+    return page, next_token
@@ -0,0 +1,167 @@
+# core/search/suggest.py
+"""
+In-process prefix index for command-palette name completion.
+
+Per shop we keep a sorted array of lowercase keys — one per word start in
+each label, so "wal" completes both "Walnut board" and "Bob Walnut" — and
+answer prefix lookups with bisect. Indexes are built lazily from
+core.SearchEntry (one query), patched from this process's committed
+writes, and rebuilt when the shop's search version (see
+core.search.cache) shows a write they have not seen.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from core.models import SearchEntry
+
+from . import cache as search_cache
+from .trigrams import WORD_RE
+
+
+# shops kept in memory per process (least recently used dropped first)
+MAX_SHOPS = 64
+
+# candidates scanned per lookup before ranking; keeps lookups bounded even
+# for very common prefixes
+SCAN_FACTOR = 8
+
+
+def _word_keys(label: str):
+    """
+    Keys for every word start in the label: "Bob Walnut" → "bob walnut", "walnut".
+    """
+    lower = (label or "").lower()
+    return [lower[m.start():] for m in WORD_RE.finditer(lower)]
+
+
+class ShopSuggestIndex:
+    def __init__(self, version):
+        self.version = version
+        self._keys = []       # sorted: (key, entity_type, object_id)
+        self._items = {}      # (entity_type, object_id) -> (label, subtitle)
+
+    def add(self, entity_type, object_id, label, subtitle=""):
+        ref = (entity_type, object_id)
+        if ref in self._items:
+            self.remove(entity_type, object_id)
+        self._items[ref] = (label, subtitle)
+        for key in _word_keys(label):
+            insort(self._keys, (key, entity_type, object_id))
+
+    def remove(self, entity_type, object_id):
+        item = self._items.pop((entity_type, object_id), None)
+        if item is None:
+            return
+        for key in _word_keys(item[0]):
+            entry = (key, entity_type, object_id)
+            i = bisect_left(self._keys, entry)
+            if i < len(self._keys) and self._keys[i] == entry:
+                del self._keys[i]
+
+    def bulk_load(self, rows):
+        for entity_type, object_id, label, subtitle in rows:
+            self._items[(entity_type, object_id)] = (label, subtitle)
+            self._keys.extend((key, entity_type, object_id) for key in _word_keys(label))
+        self._keys.sort()
+
+    def complete(self, prefix: str, limit: int):
+        """
+        Top `limit` completions: whole-label prefix matches first, then
+        word matches; shorter labels before longer ones.
+        """
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+
+        seen = {}
+        i = bisect_left(self._keys, (prefix,))
+        end = len(self._keys)
+        budget = limit * SCAN_FACTOR
+        while i < end and budget > 0:
+            key, entity_type, object_id = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            ref = (entity_type, object_id)
+            if ref not in seen:
+                label, subtitle = self._items[ref]
+                starts_label = label.lower().startswith(prefix)
+                seen[ref] = (not starts_label, len(label), label.lower(), ref, label, subtitle)
+                budget -= 1
+            i += 1
+
+        ranked = sorted(seen.values())[:limit]
+        return [
+            {
+                "type": ref[0],
+                "id": ref[1],
+                "label": label,
+                "subtitle": subtitle,
+            }
+            for _, _, _, ref, label, subtitle in ranked
+        ]
+
+
+_lock = threading.Lock()
+_indexes = OrderedDict()
+
+
+def _build(shop_id, version):
+    index = ShopSuggestIndex(version)
+    index.bulk_load(
+        SearchEntry.objects.filter(shop_id=shop_id).values_list(
+            "entity_type", "object_id", "label", "subtitle"
+        ).iterator(chunk_size=2000)
+    )
+    return index
+
+
+def get_index(shop_id) -> ShopSuggestIndex:
+    version = search_cache.get_shop_version(shop_id)
+    with _lock:
+        index = _indexes.get(shop_id)
+        if index is not None and index.version == version:
+            _indexes.move_to_end(shop_id)
+            return index
+
+    index = _build(shop_id, version)
+    with _lock:
+        _indexes[shop_id] = index
+        _indexes.move_to_end(shop_id)
+        while len(_indexes) > MAX_SHOPS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def suggest(shop_id, prefix, limit=8):
+    return get_index(shop_id).complete(prefix, limit)
+
+
+def apply_changes(shop_id, changes, version) -> None:
+    """
+    Patch an already-loaded shop index with committed writes, after the
+    shop's search version was bumped to `version`: `changes` is
+    [(entity_type, object_id, entry)], entry None when the row left the
+    index. Applied in place only if the index was current just before
+    that bump; otherwise it missed another write (maybe from another
+    process) and is dropped, to be rebuilt on the next lookup.
+    """
+    with _lock:
+        index = _indexes.get(shop_id)
+        if index is None:
+            return  # built lazily on next lookup
+        if version is None or index.version != version - 1:
+            del _indexes[shop_id]
+            return
+        for entity_type, object_id, entry in changes:
+            if entry is None:
+                index.remove(entity_type, object_id)
+            else:
+                index.add(entity_type, object_id, entry.label, entry.subtitle)
+        index.version = version
+
+
+def reset():
+    with _lock:
+        _indexes.clear()
@@ -0,0 +1,97 @@
+# core/search/trigrams.py
+"""
+Character-trigram fuzzy matching ("walnt" -> "Walnut", "amy smth" -> "Amy Smith").
+
+On Postgres this is pg_trgm over core_searchentry.label. Everywhere else
+the label trigrams are kept in the core.SearchTrigram side table and
+candidates are found by an indexed (shop, entity_type, trigram) lookup.
+
+Scoring follows pg_trgm's word similarity, so a short query still matches
+a longer multi-word label:
+
+    score      = shared / query_trigrams                    (filter + rank)
+    similarity = shared / (query + label - shared)           (tie-break)
+"""
+
+import math
+import re
+
+from core.models import SearchTrigram
+
+
+# Only labels of these entity types get trigrams (names people misspell)
+FUZZY_ENTITY_TYPES = ["customer", "material", "consumable", "equipment"]
+
+# same default as pg_trgm.word_similarity_threshold
+SIMILARITY_THRESHOLD = 0.6
+
+WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def trigrams(text: str):
+    """
+    pg_trgm-style trigrams: lowercase words, each padded with two leading
+    spaces and one trailing space.
+    """
+    grams = set()
+    for word in WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i : i + 3])
+    return grams
+
+
+def index_entry_trigrams(entry):
+    """
+    Replace the trigram rows for one SearchEntry.
+    """
+    SearchTrigram.objects.filter(entry=entry).delete()
+    if entry.entity_type not in FUZZY_ENTITY_TYPES:
+        return
+    SearchTrigram.objects.bulk_create(
+        build_trigram_rows(entry.id, entry.shop_id, entry.entity_type, entry.label)
+    )
+
+
+def build_trigram_rows(entry_id, shop_id, entity_type, label):
+    return [
+        SearchTrigram(
+            entry_id=entry_id,
+            shop_id=shop_id,
+            entity_type=entity_type,
+            trigram=gram,
+        )
+        for gram in sorted(trigrams(label))
+    ]
+
+
+def side_table_sql(query_grams, shop_id, entity_type, limit, threshold=SIMILARITY_THRESHOLD):
+    """
+    (sql, params) ranking one entity type by trigram similarity using the
+    side table. Portable SQL; columns match the engines' ranked selects.
+    """
+    grams = sorted(query_grams)
+    min_shared = max(1, math.ceil(threshold * len(grams)))
+    placeholders = ", ".join(["%s"] * len(grams))
+
+    sql = (
+        "SELECT e.entity_type, e.object_id, e.label, e.subtitle, "
+        "CAST(m.shared AS REAL) / %s AS score "
+        "FROM ("
+        "SELECT t.entry_id, COUNT(*) AS shared "
+        "FROM core_searchtrigram t "
+        f"WHERE t.shop_id = %s AND t.entity_type = %s AND t.trigram IN ({placeholders}) "
+        "GROUP BY t.entry_id "
+        "HAVING COUNT(*) >= %s"
+        ") m "
+        "JOIN core_searchentry e ON e.id = m.entry_id "
+        "ORDER BY score DESC, "
+        "CAST(m.shared AS REAL) / ("
+        "%s + (SELECT COUNT(*) FROM core_searchtrigram t2 WHERE t2.entry_id = m.entry_id)"
+        " - m.shared"
+        ") DESC, "
+        "e.id DESC "
+        "LIMIT %s"
+    )
+    params = [len(grams), shop_id, entity_type, *grams, min_shared, len(grams), limit]
+    return sql, params
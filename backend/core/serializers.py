@@ -40,6 +40,8 @@ class ShopSerializer(serializers.ModelSerializer):
             "default_markup_pct",
             "default_payment_terms",
             "default_project_type",
+            "daily_capacity_hours",
+            "work_days",
 
             # Appearance
             "theme",
@@ -63,6 +65,22 @@ class ShopSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def validate_work_days(self, value):
+        if (
+            not isinstance(value, list)
+            or not value
+            or any(not isinstance(day, int) or not 0 <= day <= 6 for day in value)
+        ):
+            raise serializers.ValidationError(
+                "Expected a non-empty list of weekdays, 0 (Monday) to 6 (Sunday)."
+            )
+        return sorted(set(value))
+
+    def validate_daily_capacity_hours(self, value):
+        if value <= 0 or value > 24:
+            raise serializers.ValidationError("Must be between 0 and 24 hours.")
+        return value
+
 User = get_user_model()
 
 class CurrentUserSerializer(serializers.ModelSerializer):
@@ -130,4 +148,5 @@ class SearchResultSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     label = serializers.CharField()     # main text in the UI
     subtitle = serializers.CharField(allow_blank=True)
+    score = serializers.FloatField(required=False, allow_null=True)  # relevance, higher first
     url = serializers.CharField()       # frontend route to navigate to
\ No newline at end of file
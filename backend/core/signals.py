@@ -0,0 +1,135 @@
+# core/signals.py
+"""
+Keep the global search index (core.SearchEntry) in sync with the
+searchable models, invalidate cached search results by bumping the shop's
+search version, and patch any loaded suggest index. Also keeps the
+customer rollup (core.CustomerMetrics) current on Project / Sale writes.
+Connected in CoreConfig.ready().
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from core import metrics
+from core.models import SearchEntry
+from core.search import cache as search_cache
+from core.search import documents, suggest
+
+
+def _on_commit_changed(shop_id, changes=()):
+    """
+    Once the transaction commits, bump the shop's search version and patch
+    its loaded suggest index with `changes`, [(entity_type, object_id,
+    entry or None)]. Not before: a search running meanwhile must not cache
+    pre-commit rows under the new version, and a rollback must leave the
+    suggest index alone.
+    """
+    def run():
+        version = search_cache.bump_shop_version(shop_id)
+        suggest.apply_changes(shop_id, changes, version)
+
+    transaction.on_commit(run)
+
+
+def _on_searchable_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        # loaddata: documents are rebuilt with `manage.py rebuild_search_index`
+        return
+    entry = documents.index_instance(instance)
+    _on_commit_changed(
+        instance.shop_id, [(documents.entity_type_for(instance), instance.pk, entry)]
+    )
+
+
+def _on_searchable_deleted(sender, instance, **kwargs):
+    documents.unindex_instance(instance)
+    _on_commit_changed(
+        instance.shop_id, [(documents.entity_type_for(instance), instance.pk, None)]
+    )
+
+
+def notify_bulk_created(instances):
+    """
+    Do what the post_save handlers would have done for rows inserted with
+    bulk_create(): index them, invalidate cached searches and refresh the
+    customer rollups they touch.
+    """
+    instances = list(instances)
+    changes = {obj.shop_id: [] for obj in instances}
+    for entry in documents.index_new_instances(instances):
+        changes[entry.shop_id].append((entry.entity_type, entry.object_id, entry))
+    for shop_id, shop_changes in changes.items():
+        _on_commit_changed(shop_id, shop_changes)
+    metrics.schedule_refresh({getattr(obj, "customer_id", None) for obj in instances})
+
+
+def notify_bulk_updated(shop_id, entity_type, object_ids):
+    """
+    Do what the post_save handlers would have done for rows changed with
+    bulk_update() whose search document is unchanged (e.g. a stage move):
+    touch their entries, which rank by recency, and invalidate cached
+    searches once the transaction commits.
+    """
+    SearchEntry.objects.filter(
+        shop_id=shop_id, entity_type=entity_type, object_id__in=object_ids
+    ).update(updated_at=timezone.now())
+    _on_commit_changed(shop_id)
+
+
+def connect_search_signals():
+    for entity_type in documents.ENTITY_TYPES:
+        model = documents.get_model(entity_type)
+        post_save.connect(
+            _on_searchable_saved,
+            sender=model,
+            dispatch_uid=f"search-index-save-{entity_type}",
+        )
+        post_delete.connect(
+            _on_searchable_deleted,
+            sender=model,
+            dispatch_uid=f"search-index-delete-{entity_type}",
+        )
+
+
+# ---------- customer metrics ----------
+
+def _remember_customer(sender, instance, **kwargs):
+    # read through __dict__: touching a deferred field would cost a query
+    instance._metrics_customer_id = instance.__dict__.get("customer_id")
+
+
+def _on_customer_activity_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        # loaddata: rollups are rebuilt with `manage.py rebuild_customer_metrics`
+        return
+    previous = getattr(instance, "_metrics_customer_id", None)
+    metrics.schedule_refresh({previous, instance.customer_id})
+    instance._metrics_customer_id = instance.customer_id
+
+
+def _on_customer_activity_deleted(sender, instance, **kwargs):
+    metrics.schedule_refresh({instance.customer_id})
+
+
+def connect_metrics_signals():
+    from projects.models import Project
+    from sales.models import Sale
+
+    for model in (Project, Sale):
+        label = model._meta.label_lower
+        post_init.connect(
+            _remember_customer,
+            sender=model,
+            dispatch_uid=f"customer-metrics-init-{label}",
+        )
+        post_save.connect(
+            _on_customer_activity_saved,
+            sender=model,
+            dispatch_uid=f"customer-metrics-save-{label}",
+        )
+        post_delete.connect(
+            _on_customer_activity_deleted,
+            sender=model,
+            dispatch_uid=f"customer-metrics-delete-{label}",
+        )
@@ -0,0 +1,47 @@
+# core/subqueries.py
+"""
+Per-row aggregates over reverse relations as correlated subqueries.
+
+    Customer.objects.annotate(
+        total_projects=SubqueryCount(Project.objects.all(), "customer"),
+        lifetime_revenue=SubquerySum(Sale.objects.all(), "customer", "price"),
+    )
+
+Each metric is its own scalar subquery driven by the relation's FK index,
+so annotating several reverse relations never joins them together: no
+row fan-out, no DISTINCT, no GROUP BY over the outer table, and Sum does
+not over-count.
+"""
+
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+
+class SubqueryAggregate(Subquery):
+    """
+    aggregate(column) over `queryset` rows whose `field` points at the outer
+    row's `outer_ref` (its primary key by default).
+    """
+
+    aggregate = None
+
+    def __init__(self, queryset, field, column="pk", *, outer_ref="pk", distinct=False, **extra):
+        aggregate = self.aggregate(column, distinct=True) if distinct else self.aggregate(column)
+        queryset = (
+            queryset.order_by()
+            .filter(**{field: OuterRef(outer_ref)})
+            .values(field)
+            .annotate(_aggregate=aggregate)
+            .values("_aggregate")
+        )
+        super().__init__(queryset, **extra)
+
+
+class SubqueryCount(SubqueryAggregate):
+    aggregate = Count
+    # no related rows → no group → 0, not NULL
+    template = "COALESCE((%(subquery)s), 0)"
+
+
+class SubquerySum(SubqueryAggregate):
+    aggregate = Sum
+    template = "COALESCE((%(subquery)s), 0)"
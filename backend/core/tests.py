@@ -1,3 +1,273 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Customer, CustomerMetrics, SearchEntry, Shop
+from core.search import cache as search_cache
+from core.search import suggest
+from core.search.documents import backfill_index, rebuild_index
+from core.search.engines import get_search_engine
+from core.search.query import PriceFilter, parse_query
+from inventory.models import Material
+from sales.models import Sale
+
+
+class DashboardSummaryTests(APITestCase):
+    url = "/api/dashboard/summary/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+        self.client.force_authenticate(self.user)
+
+    def test_expenses_count_each_sale_once(self):
+        now = timezone.now()
+        # legacy total plus the breakdown: the total wins
+        Sale.objects.create(
+            shop=self.shop,
+            price=Decimal("100.00"),
+            fees=Decimal("10.00"),
+            platform_fees=Decimal("4.00"),
+            shipping_cost=Decimal("2.00"),
+            sold_at=now,
+        )
+        # breakdown only, shipping unknown
+        Sale.objects.create(
+            shop=self.shop, price=Decimal("50.00"), platform_fees=Decimal("3.00"), sold_at=now
+        )
+        # no fees at all
+        Sale.objects.create(shop=self.shop, price=Decimal("20.00"), sold_at=now)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        this_month = response.json()["revenueVsExpenses"][-1]
+        self.assertEqual(this_month["revenue"], 170.0)
+        self.assertEqual(this_month["expenses"], 13.0)
+
+
+class SearchCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+
+    def test_version_bumps_only_on_commit(self):
+        version = search_cache.get_shop_version(self.shop.id)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Customer.objects.create(shop=self.shop, name="Ada Walnut")
+            # a search running now still sees the old rows: same version
+            self.assertEqual(search_cache.get_shop_version(self.shop.id), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertGreater(search_cache.get_shop_version(self.shop.id), version)
+
+    def test_result_key_keeps_cursor_case(self):
+        key = search_cache.result_key(self.shop.id, 1, "Walnut  Board", "global", 20, "eyJhIjoxfQ")
+
+        self.assertEqual(
+            key, search_cache.result_key(self.shop.id, 1, "walnut board", "global", 20, "eyJhIjoxfQ")
+        )
+        self.assertNotEqual(
+            key, search_cache.result_key(self.shop.id, 1, "walnut board", "global", 20, "EYjHiJOXfq")
+        )
+
+
+class SuggestIndexTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        suggest.reset()
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+
+    def labels(self, prefix):
+        return [row["label"] for row in suggest.suggest(self.shop.id, prefix)]
+
+    def create_customer(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Customer.objects.create(shop=self.shop, name=name)
+
+    def test_committed_write_patches_loaded_index(self):
+        index = suggest.get_index(self.shop.id)
+
+        self.create_customer("Ada Walnut")
+
+        self.assertIs(suggest.get_index(self.shop.id), index)
+        self.assertEqual(self.labels("wal"), ["Ada Walnut"])
+
+    def test_rolled_back_write_leaves_index_alone(self):
+        index = suggest.get_index(self.shop.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Customer.objects.create(shop=self.shop, name="Bob Walnut")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertIs(suggest.get_index(self.shop.id), index)
+        self.assertEqual(self.labels("wal"), [])
+
+    def test_missed_write_drops_index(self):
+        index = suggest.get_index(self.shop.id)
+        # another process wrote: this index never saw it
+        search_cache.bump_shop_version(self.shop.id)
+
+        self.create_customer("Cy Walnut")
+
+        self.assertIsNot(suggest.get_index(self.shop.id), index)
+        self.assertEqual(self.labels("wal"), ["Cy Walnut"])
+
+
+class SearchIndexRebuildTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+        Customer.objects.create(shop=self.shop, name="Ada Walnut")
+
+    def test_rebuild_moves_shop_to_new_version(self):
+        version = search_cache.get_shop_version(self.shop.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_index(shop=self.shop)
+
+        self.assertGreater(search_cache.get_shop_version(self.shop.id), version)
+
+    def test_backfill_indexes_existing_rows_once(self):
+        # rows from before the index existed
+        SearchEntry.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            backfill_index()
+        self.assertEqual(
+            list(SearchEntry.objects.values_list("label", flat=True)), ["Ada Walnut"]
+        )
+
+        # later migrates leave a populated index alone
+        with self.assertNumQueries(2):
+            backfill_index()
+
+
+class GlobalSearchTests(APITestCase):
+    url = "/api/search/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Customer.objects.create(shop=self.shop, name="Ada Walnut")
+            Customer.objects.create(shop=self.shop, name="Bob Walnut")
+            Customer.objects.create(shop=self.shop, name="Cy Walnut")
+            Material.objects.create(shop=self.shop, name="Walnut board", unit="bf")
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_search_is_one_query(self):
+        types = ["customer", "project", "material", "consumable", "equipment"]
+
+        with self.assertNumQueries(1):
+            rows, _ = get_search_engine().search_page(self.shop, "walnut", types, 10)
+
+        self.assertEqual({row["type"] for row in rows}, {"customer", "material"})
+
+    def test_pages_do_not_overlap(self):
+        first = self.search(q="walnut", page_size=3)
+        self.assertEqual(len(first["results"]), 3)
+        self.assertIsNotNone(first["next"])
+
+        second = self.search(q="walnut", page_size=3, cursor=first["next"])
+
+        seen = [(r["type"], r["id"]) for r in first["results"] + second["results"]]
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(len(set(seen)), 4)
+        self.assertIsNone(second["next"])
+
+    def test_misspelled_name_matches_by_trigram(self):
+        labels = [row["label"] for row in self.search(q="customer: walnt")["results"]]
+
+        self.assertIn("Ada Walnut", labels)
+
+
+class SearchQueryParserTests(APITestCase):
+    def test_filters_phrases_and_terms(self):
+        query = parse_query('walnut "end grain" status:active price>=50')
+
+        self.assertEqual(query.entity, "project")
+        self.assertEqual(query.terms, ("walnut",))
+        self.assertEqual(query.phrases, ("end grain",))
+        self.assertEqual(query.filters.status, "active")
+        self.assertEqual(query.filters.price, PriceFilter(">=", Decimal("50")))
+
+    def test_prefix_and_projects_for(self):
+        self.assertEqual(parse_query("cust: amy").entity, "customer")
+        self.assertEqual(parse_query("cust: amy").terms, ("amy",))
+        self.assertEqual(parse_query("projects for amy").filters.customer_name, "amy")
+
+
+class CustomerMetricsTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+        self.client.force_authenticate(self.user)
+
+    def test_sale_refreshes_rollup_on_commit(self):
+        customer = Customer.objects.create(shop=self.shop, name="Ada Walnut")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Sale.objects.create(
+                shop=self.shop, customer=customer, price=Decimal("80.00"), sold_at=timezone.now()
+            )
+            Sale.objects.create(
+                shop=self.shop, customer=customer, price=Decimal("20.00"), sold_at=timezone.now()
+            )
+
+        metrics = CustomerMetrics.objects.get(customer=customer)
+        self.assertEqual(metrics.total_sales, 2)
+        self.assertEqual(metrics.lifetime_revenue, Decimal("100.00"))
+
+        row = self.client.get("/api/core/customers/").json()[0]
+        self.assertEqual(row["total_sales"], 2)
+
+
+class CursorPaginationTests(APITestCase):
+    url = "/api/core/customers/"
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+        self.client.force_authenticate(self.user)
+
+    def test_pages_step_over_ties_in_the_leading_field(self):
+        ids = {Customer.objects.create(shop=self.shop, name=f"C{i}").id for i in range(5)}
+        # every row shares the leading ordering value
+        Customer.objects.update(created_at=timezone.now())
+
+        seen = []
+        response = self.client.get(self.url, {"page_size": 2}).json()
+        seen += [row["id"] for row in response["results"]]
+        while response["next"]:
+            response = self.client.get(response["next"]).json()
+            seen += [row["id"] for row in response["results"]]
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(set(seen), ids)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_plain_list_without_cursor_params(self):
+        Customer.objects.create(shop=self.shop, name="Ada Walnut")
+
+        self.assertIsInstance(self.client.get(self.url).json(), list)
@@ -1,20 +1,27 @@
 # core/views.py
-import re
-from django.db.models import Q, Count, Sum
+from django.db.models import Case, DecimalField, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import api_view
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count
 
+from .dashboard import CACHE_TIMEOUT as DASHBOARD_CACHE_TIMEOUT
+from .dashboard import cached_dashboard_summary
+from .metrics import live_metric_annotations
 from .models import Shop, Customer
 from projects.models import Project
 from inventory.models import Equipment, Material, Consumable
 from products.models import ProductTemplate as Product
 
+from .search import cache as search_cache
+from .search import suggest
+from .search import compile_project_filters, get_search_engine, parse_query, result_url
+from .search.ranking import PageCursor
 from .serializers import ShopSerializer, CurrentUserSerializer, CustomerSerializer, SearchResultSerializer
 
 class MeView(APIView):
@@ -105,40 +112,32 @@ class CustomerViewSet(viewsets.ModelViewSet):
             # No shop yet = no customers
             return Customer.objects.none()
 
-        qs = Customer.objects.filter(shop=shop)
+        # one LEFT JOIN onto the materialized rollup (core.metrics); customers
+        # without a rollup row yet fall back to live per-metric subqueries
+        current_year = timezone.now().year
+        live = live_metric_annotations(current_year)
 
-        # Start-of-year boundary for "orders_this_year"
-        now = timezone.now()
-        """ start_of_year = now.replace(
-            month=1, day=1, hour=0, minute=0, second=0, microsecond=0
-        ) """
-        current_year = now.year
+        def rollup(name, output_field=IntegerField()):
+            return Coalesce(F(f"metrics__{name}"), live[name], output_field=output_field)
 
-        qs = qs.annotate(
-            # --- existing dashboard metrics (unchanged) ---
-            total_projects=Count("projects", distinct=True),
-            total_products=Count("projects__template", distinct=True),
-
-            # --- NEW sales-based metrics ---
-            # number of Sale rows for this customer
-            total_sales=Count("sales", distinct=True),
-
-            # real revenue: sum of Sale.price
-            lifetime_revenue=Sum("sales__price"),
-
-            # sales in the current calendar year
-            orders_this_year=Count(
-                "projects",
-                filter=Q(projects__created_at__year=current_year),
-                distinct=True,
+        qs = Customer.objects.filter(shop=shop).annotate(
+            total_projects=rollup("total_projects"),
+            total_products=rollup("total_products"),
+            total_sales=rollup("total_sales"),
+            lifetime_revenue=rollup(
+                "lifetime_revenue", DecimalField(max_digits=12, decimal_places=2)
             ),
-
-            # completed projects (for completion rate)
-            completed_projects=Count(
-                "projects",
-                filter=Q(projects__status="completed"),
-                distinct=True,
+            # rollup rows from an earlier year have no orders this year
+            orders_this_year=Case(
+                When(
+                    metrics__orders_year=current_year,
+                    then=F("metrics__orders_this_year"),
+                ),
+                When(metrics__isnull=True, then=live["orders_this_year"]),
+                default=Value(0),
+                output_field=IntegerField(),
             ),
+            completed_projects=rollup("completed_projects"),
         )
 
         return qs
@@ -159,31 +158,6 @@ class CustomerViewSet(viewsets.ModelViewSet):
 class GlobalSearchView(APIView):
     permission_classes = [IsAuthenticated]
 
-    # entity prefixes like "customer: amy"
-    PREFIX_MAP = {
-        "customer": "customer",
-        "customers": "customer",
-        "cust": "customer",
-        "c": "customer",
-
-        "project": "project",
-        "projects": "project",
-        "proj": "project",
-        "p": "project",
-
-        "material": "material",
-        "materials": "material",
-        "mat": "material",
-
-        "consumable": "consumable",
-        "consumables": "consumable",
-        "cons": "consumable",
-
-        "equipment": "equipment",
-        "equip": "equipment",
-        "eq": "equipment",
-    }
-
     # ---------- generic helpers ----------
 
     def get_shop(self, request):
@@ -195,175 +169,79 @@ class GlobalSearchView(APIView):
         except Shop.DoesNotExist:
             return None
 
-    def parse_entity_prefix(self, text: str):
-        """
-        Leading entity prefixes like:
-          customer: amy
-          project: table
-        Returns (model_key, remaining_text) or (None, text).
-        """
-        stripped = text.strip()
-        if ":" not in stripped:
-            return None, stripped
-
-        first_colon = stripped.find(":")
-        prefix = stripped[:first_colon].strip().lower()
-        rest = stripped[first_colon + 1 :].strip()
+    # ---------- per-entity search helpers ----------
 
-        model_key = self.PREFIX_MAP.get(prefix)
-        if not model_key:
-            return None, stripped
+    # Free text is matched through the full-text index (core.search); for
+    # filtered project searches we pull this many ranked candidates first.
+    PROJECT_CANDIDATE_LIMIT = 500
 
-        return model_key, rest
+    DEFAULT_PAGE_SIZE = 10
+    MAX_PAGE_SIZE = 50
 
-    def parse_natural_language_projects_for(self, text: str):
-        """
-        'projects for amy' (with or without quotes) →
-        treat as project search filtered by customer name.
-        Returns (clean_text, filters) or None.
-        """
-        stripped = text.strip().strip('"').strip("'")
-        lower = stripped.lower()
-        if lower.startswith("projects for "):
-            name = stripped[len("projects for ") :].strip()
-            if name:
-                return name, {"customer_name": name}
-        return None
-
-    def parse_advanced_project_filters(self, text: str):
-        """
-        Parse project-level filters from the text:
-          status: completed
-          stage: sanding
-          due: today / overdue
-          tag: urgent
-          price>50 / price>=50 / price<50 / price=50
-
-        Returns (clean_free_text, filters_dict).
-        """
-        filters = {}
-        working = text
-
-        # status: completed
-        m = re.search(r"status\s*:\s*([^\s]+)", working, re.IGNORECASE)
-        if m:
-            filters["status"] = m.group(1)
-            working = (working[: m.start()] + working[m.end() :]).strip()
-
-        # stage: sanding
-        m = re.search(r"stage\s*:\s*([^\s]+)", working, re.IGNORECASE)
-        if m:
-            filters["stage"] = m.group(1)
-            working = (working[: m.start()] + working[m.end() :]).strip()
-
-        # due: today / overdue
-        m = re.search(r"due\s*:\s*([^\s]+)", working, re.IGNORECASE)
-        if m:
-            filters["due"] = m.group(1)
-            working = (working[: m.start()] + working[m.end() :]).strip()
-
-        # tag: urgent
-        m = re.search(r"tag\s*:\s*([^\s]+)", working, re.IGNORECASE)
-        if m:
-            filters["tag"] = m.group(1)
-            working = (working[: m.start()] + working[m.end() :]).strip()
-
-        # price>50, price>=50, price<50, price=50
-        m = re.search(
-            r"price\s*(>=|<=|>|<|=)\s*([0-9]+(?:\.[0-9]+)?)",
-            working,
-            re.IGNORECASE,
-        )
-        if m:
-            filters["price_op"] = m.group(1)
-            filters["price_value"] = float(m.group(2))
-            working = (working[: m.start()] + working[m.end() :]).strip()
+    # Unprefixed searches hit every entity type, ranked together
+    FULL_SEARCH_TYPES = ["customer", "project", "material", "consumable", "equipment"]
 
-        return working.strip(), filters
+    def get_engine(self):
+        return get_search_engine()
 
-    # ---------- per-entity search helpers ----------
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get("page_size", self.DEFAULT_PAGE_SIZE))
+        except (TypeError, ValueError):
+            page_size = self.DEFAULT_PAGE_SIZE
+        return max(1, min(page_size, self.MAX_PAGE_SIZE))
 
-    def search_customers(self, shop, q, limit):
-        qs = (
-            Customer.objects.filter(shop=shop)
-            .filter(
-                Q(name__icontains=q)
-                | Q(email__icontains=q)
-                | Q(phone__icontains=q)
-            )[:limit]
-        )
+    def format_results(self, rows):
         return [
             {
-                "type": "customer",
-                "id": c.id,
-                "label": c.name,
-                "subtitle": c.email or c.phone or "",
-                "url": f"/customers/{c.id}",
+                "type": row["type"],
+                "id": row["id"],
+                "label": row["label"],
+                "subtitle": row["subtitle"],
+                "score": round(row["score"], 6) if row.get("score") is not None else None,
+                "url": result_url(row["type"], row["id"]),
             }
-            for c in qs
+            for row in rows
         ]
 
-    def search_projects(self, shop, q, limit, filters=None):
+    def search_page(self, shop, q, entity_types, page_size, cursor=None):
+        """
+        One relevance-ranked page across `entity_types` -> (results, next cursor).
+        """
+        engine = self.get_engine()
+        rows, next_cursor = engine.search_page(shop, q, entity_types, page_size, cursor)
+        if not rows and q and cursor is None:
+            # nothing matched exactly → typo-tolerant trigram match on names
+            rows = engine.fuzzy_search(shop, q, entity_types, page_size)
+            rows = sorted(rows, key=lambda r: r["score"], reverse=True)[:page_size]
+            next_cursor = None
+        return self.format_results(rows), next_cursor
+
+    def search_projects(self, shop, q, limit, filters):
+        """
+        Project search narrowed by DSL filters; a single page, no cursor.
+        """
         qs = Project.objects.filter(shop=shop)
-        filters = filters or {}
 
-        # free text across core project fields
+        # free text across core project fields, ranked by the index
+        ranked_ids = None
         if q:
-            qs = qs.filter(
-                Q(name__icontains=q)
-                | Q(notes__icontains=q)
-                | Q(status__icontains=q)
+            ranked_ids = self.get_engine().match_ids(
+                shop, q, "project", self.PROJECT_CANDIDATE_LIMIT
             )
+            if not ranked_ids:
+                return []
+            qs = qs.filter(id__in=ranked_ids)
 
-        # status: completed
-        status_val = filters.get("status")
-        if status_val:
-            qs = qs.filter(status__icontains=status_val)
-
-        # stage: sanding  (via current_stage FK)
-        stage_val = filters.get("stage")
-        if stage_val:
-            qs = qs.filter(current_stage__name__icontains=stage_val)
-
-        # due: today / overdue
-        due_val = filters.get("due")
-        if due_val:
-            today = timezone.now().date()
-            dv = str(due_val).lower()
-            if dv == "today":
-                qs = qs.filter(due_date=today)
-            elif dv == "overdue":
-                qs = qs.filter(due_date__lt=today, completed_at__isnull=True)
-
-        # tag: urgent — treat as fuzzy match in status/notes
-        tag_val = filters.get("tag")
-        if tag_val:
-            qs = qs.filter(
-                Q(notes__icontains=tag_val)
-                | Q(status__icontains=tag_val)
-            )
+        # status / stage / due / tag / price / customer filters from the query DSL
+        qs = qs.filter(compile_project_filters(filters, timezone.now().date()))
 
-        # price filters use expected_price
-        op = filters.get("price_op")
-        val = filters.get("price_value")
-        if op and val is not None:
-            if op == ">":
-                qs = qs.filter(expected_price__gt=val)
-            elif op == "<":
-                qs = qs.filter(expected_price__lt=val)
-            elif op == ">=":
-                qs = qs.filter(expected_price__gte=val)
-            elif op == "<=":
-                qs = qs.filter(expected_price__lte=val)
-            elif op == "=":
-                qs = qs.filter(expected_price=val)
-
-        # natural language: projects for amy → customer name contains amy
-        cust_name = filters.get("customer_name")
-        if cust_name:
-            qs = qs.filter(customer__name__icontains=cust_name)
-
-        qs = qs[:limit]
+        if ranked_ids is None:
+            projects = list(qs[:limit])
+        else:
+            # keep index relevance order
+            position = {pid: i for i, pid in enumerate(ranked_ids)}
+            projects = sorted(qs, key=lambda p: position[p.id])[:limit]
 
         return [
             {
@@ -371,123 +249,117 @@ class GlobalSearchView(APIView):
                 "id": p.id,
                 "label": p.name,
                 "subtitle": p.status or "",
-                "url": f"/projects/{p.id}",
+                "url": result_url("project", p.id),
             }
-            for p in qs
+            for p in projects
         ]
 
-    def search_materials(self, shop, q, limit):
-        qs = (
-            Material.objects.filter(shop=shop, is_active=True)
-            .filter(
-                Q(name__icontains=q)
-                | Q(category__icontains=q)
-                | Q(supplier_name__icontains=q)
-                | Q(notes__icontains=q)
-            )[:limit]
-        )
-        return [
-            {
-                "type": "material",
-                "id": m.id,
-                "label": m.name,
-                "subtitle": m.category or m.supplier_name or "",
-                "url": f"/inventory/materials/{m.id}",
-            }
-            for m in qs
-        ]
+    # ---------- main GET ----------
 
-    def search_consumables(self, shop, q, limit):
-        qs = (
-            Consumable.objects.filter(shop=shop, is_active=True)
-            .filter(
-                Q(name__icontains=q)
-                | Q(notes__icontains=q)
-            )[:limit]
-        )
-        return [
-            {
-                "type": "consumable",
-                "id": c.id,
-                "label": c.name,
-                "subtitle": c.notes[:60] if c.notes else "",
-                "url": f"/inventory/consumables/{c.id}",
-            }
-            for c in qs
-        ]
+    def get(self, request, *args, **kwargs):
+        raw_q = (request.query_params.get("q") or "").strip()
+        if not raw_q:
+            return Response({"results": [], "next": None})
 
-    def search_equipment(self, shop, q, limit):
-        qs = (
-            Equipment.objects.filter(shop=shop, is_active=True)
-            .filter(
-                Q(name__icontains=q)
-                | Q(notes__icontains=q)
-            )[:limit]
+        shop = self.get_shop(request)
+        if not shop:
+            return Response({"results": [], "next": None})
+
+        page_size = self.get_page_size(request)
+        token = request.query_params.get("cursor") or ""
+        cursor = PageCursor.decode(token) if token else None
+
+        payload = search_cache.get_or_compute(
+            shop.id,
+            raw_q,
+            ["global", page_size, token],
+            lambda: self.run_search(shop, raw_q, page_size, cursor),
         )
-        return [
-            {
-                "type": "equipment",
-                "id": e.id,
-                "label": e.name,
-                "subtitle": e.notes[:60] if e.notes else "",
-                "url": f"/inventory/equipment/{e.id}",
-            }
-            for e in qs
-        ]
+        return Response(payload)
 
-    def default_full_search(self, shop, q):
-        results = []
-        results.extend(self.search_customers(shop, q, limit=5))
-        results.extend(self.search_projects(shop, q, limit=5))
-        results.extend(self.search_materials(shop, q, limit=5))
-        results.extend(self.search_consumables(shop, q, limit=5))
-        results.extend(self.search_equipment(shop, q, limit=5))
-        return results
+    def run_search(self, shop, raw_q, page_size, cursor=None):
+        # prefixes, "projects for …", filters and phrases in one pass (cached)
+        query = parse_query(raw_q)
+        q = query.text
 
-    # ---------- main GET ----------
+        if query.entity == "project" and query.filters:
+            results = self.search_projects(shop, q, page_size, query.filters)
+            next_cursor = None
+        else:
+            # no prefix → search everything, merged by score
+            entity_types = [query.entity] if query.entity else self.FULL_SEARCH_TYPES
+            results, next_cursor = self.search_page(shop, q, entity_types, page_size, cursor)
+
+        # plain dicts: cached values must pickle without the serializer
+        return {
+            "results": [dict(r) for r in SearchResultSerializer(results, many=True).data],
+            "next": next_cursor,
+        }
+
+
+class SearchSuggestView(APIView):
+    """
+    Name completions for the command palette, served from the in-process
+    per-shop prefix index (no database query once the index is warm).
+
+    GET /api/search/suggest/?q=wal&limit=8
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_LIMIT = 8
+    MAX_LIMIT = 20
 
     def get(self, request, *args, **kwargs):
-        raw_q = (request.query_params.get("q") or "").strip()
-        if not raw_q:
+        prefix = (request.query_params.get("q") or "").strip()
+        if not prefix:
             return Response({"results": []})
 
-        shop = self.get_shop(request)
-        if not shop:
+        try:
+            shop = request.user.shop
+        except Shop.DoesNotExist:
             return Response({"results": []})
 
-        q = raw_q
-        model_key = None
-        filters = {}
+        try:
+            limit = int(request.query_params.get("limit", self.DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            limit = self.DEFAULT_LIMIT
+        limit = max(1, min(limit, self.MAX_LIMIT))
+
+        results = [
+            {**row, "url": result_url(row["type"], row["id"])}
+            for row in suggest.suggest(shop.id, prefix, limit)
+        ]
+        return Response({"results": SearchResultSerializer(results, many=True).data})
 
-        # 1) natural language: projects for amy
-        nl = self.parse_natural_language_projects_for(q)
-        if nl:
-            q, filters = nl
-            model_key = "project"
-        else:
-            # 2) entity prefix: customer:, project:, etc.
-            model_key, q = self.parse_entity_prefix(q)
-            # 3) advanced project filters inside whatever's left
-            q, filters = self.parse_advanced_project_filters(q)
-
-        # If we have project filters but no explicit entity, assume project search
-        if not model_key and filters:
-            model_key = "project"
-
-        # Route to the appropriate search
-        if model_key == "customer":
-            results = self.search_customers(shop, q, limit=10)
-        elif model_key == "project":
-            results = self.search_projects(shop, q, limit=10, filters=filters)
-        elif model_key == "material":
-            results = self.search_materials(shop, q, limit=10)
-        elif model_key == "consumable":
-            results = self.search_consumables(shop, q, limit=10)
-        elif model_key == "equipment":
-            results = self.search_equipment(shop, q, limit=10)
-        else:
-            # no prefix, no filters → search everything
-            results = self.default_full_search(shop, q)
 
-        serializer = SearchResultSerializer(results, many=True)
-        return Response({"results": serializer.data})
\ No newline at end of file
+class DashboardSummaryView(APIView):
+    """
+    The dashboard in one response (DashboardSummary, see
+    docs/dashboard_ui_spec.md §6.1), computed from aggregates and rollups.
+
+    GET /api/dashboard/summary/
+
+    Cached per shop for a minute; answers If-None-Match with a 304.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            shop = request.user.shop
+        except Shop.DoesNotExist:
+            return Response(
+                {"detail": "Current user has no shop configured."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        payload, etag = cached_dashboard_summary(shop)
+        etag = f'"{etag}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, max_age=DASHBOARD_CACHE_TIMEOUT)
+        return response
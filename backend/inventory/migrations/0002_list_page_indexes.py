@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_list_page_indexes'),
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consumable',
+            index=models.Index(fields=['shop', 'is_active', 'created_at', 'id'], name='inventory_c_shop_id_958408_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['shop', 'is_active', 'created_at', 'id'], name='inventory_e_shop_id_cd4b10_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='material',
+            index=models.Index(fields=['shop', 'is_active', 'created_at', 'id'], name='inventory_m_shop_id_fb846d_idx'),
+        ),
+    ]
@@ -19,6 +19,12 @@ class Material(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # list pages: shop's active rows by (-created_at, -id)
+            models.Index(fields=["shop", "is_active", "created_at", "id"]),
+        ]
+
     def __str__(self) -> str:
         return self.name
 
@@ -45,6 +51,12 @@ class Consumable(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # list pages: shop's active rows by (-created_at, -id)
+            models.Index(fields=["shop", "is_active", "created_at", "id"]),
+        ]
+
     def __str__(self) -> str:
         return self.name
 
@@ -64,5 +76,11 @@ class Equipment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # list pages: shop's active rows by (-created_at, -id)
+            models.Index(fields=["shop", "is_active", "created_at", "id"]),
+        ]
+
     def __str__(self) -> str:
         return self.name
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_list_page_indexes'),
+        ('inventory', '0002_list_page_indexes'),
+        ('products', '0003_producttemplate_average_consumable_cost_and_more'),
+        ('workflows', '0002_list_page_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producttemplate',
+            index=models.Index(fields=['shop', 'is_active', 'name', 'id'], name='products_pr_shop_id_fe6a80_idx'),
+        ),
+    ]
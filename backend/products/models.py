@@ -70,6 +70,12 @@ class ProductTemplate(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # list pages: shop's active templates by (name, id)
+            models.Index(fields=["shop", "is_active", "name", "id"]),
+        ]
+
     def __str__(self) -> str:
         return self.name
 
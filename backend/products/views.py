@@ -19,6 +19,7 @@ class ProductTemplateViewSet(viewsets.ModelViewSet):
 
     permission_classes = [IsAuthenticated]
     serializer_class = ProductTemplateSerializer
+    cursor_ordering = ("name", "id")
 
     def get_queryset(self):
         user = self.request.user
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        from .hours import connect_hours_signals
+        from .scheduling import connect_schedule_signals
+
+        connect_schedule_signals()
+        connect_hours_signals()
@@ -0,0 +1,193 @@
+# backend/projects/hours.py
+"""
+Logged-hours rollups: Project.actual_hours and ProjectStageHours.
+
+Both are sums of WorkLog intervals; actual_hours also carries the
+project's manual_hours (hours entered by hand before time logging), so
+actual_hours = manual_hours + logged hours on either path. Instead of
+re-summing a project's logs, each WorkLog save / delete applies only the
+change it makes (its old interval out, its new one in) with F()
+increments inside the same transaction. `manage.py reconcile_work_hours`
+recomputes everything from one grouped query if the two ever drift (raw
+SQL, bulk loads). Each interval is rounded to 0.01 h as it is
+applied, so the running totals can sit a few hundredths away from a
+reconcile, which rounds each (project, stage) sum once.
+"""
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DurationField, F, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .models import Project, ProjectStageHours, WorkLog
+from .scheduling import invalidate_plans, replan_from_db
+
+
+HOURS = Decimal("0.01")
+
+
+def log_hours(started_at, ended_at) -> Decimal:
+    """
+    Hours of one interval (2 dp); reversed or incomplete intervals count 0.
+    """
+    if started_at is None or ended_at is None or ended_at <= started_at:
+        return Decimal("0.00")
+    return (Decimal((ended_at - started_at).total_seconds()) / 3600).quantize(HOURS)
+
+
+def apply_hours_delta(deltas) -> None:
+    """
+    Add {(project_id, stage_id): hours} to the rollups; stage_id may be None
+    (counts toward the project total only).
+    """
+    by_project = {}
+    for (project_id, stage_id), hours in deltas.items():
+        if not hours:
+            continue
+        by_project[project_id] = by_project.get(project_id, Decimal("0")) + hours
+        if stage_id is not None:
+            _add_stage_hours(project_id, stage_id, hours)
+
+    for project_id, hours in by_project.items():
+        if hours:
+            Project.objects.filter(pk=project_id).update(
+                actual_hours=Coalesce(F("actual_hours"), Value(Decimal("0"))) + hours
+            )
+    for project_id in by_project:
+        transaction.on_commit(lambda project_id=project_id: replan_from_db(project_id))
+
+
+def _add_stage_hours(project_id, stage_id, hours):
+    rows = ProjectStageHours.objects.filter(project_id=project_id, stage_id=stage_id)
+    if rows.update(hours=F("hours") + hours) or hours < 0:
+        return
+    try:
+        with transaction.atomic():
+            ProjectStageHours.objects.create(project_id=project_id, stage_id=stage_id, hours=hours)
+    except IntegrityError:
+        # created concurrently since the update above
+        rows.update(hours=F("hours") + hours)
+
+
+def _logged(instance):
+    # read through __dict__: a deferred field would cost a query
+    values = instance.__dict__
+    if instance.pk is None or "started_at" not in values or "ended_at" not in values:
+        return None
+    return (
+        values.get("project_id"),
+        values.get("stage_id"),
+        log_hours(values["started_at"], values["ended_at"]),
+    )
+
+
+def _remember_interval(sender, instance, **kwargs):
+    instance._logged_hours = _logged(instance)
+
+
+def _on_log_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # loaddata: use `manage.py reconcile_work_hours`
+        return
+    deltas = {}
+    previous = None if created else getattr(instance, "_logged_hours", None)
+    if not created and previous is None:
+        # loaded with deferred fields: we cannot tell what changed
+        transaction.on_commit(lambda: reconcile_work_hours(project_ids=[instance.project_id]))
+        return
+    if previous is not None:
+        project_id, stage_id, hours = previous
+        deltas[(project_id, stage_id)] = -hours
+    current = _logged(instance)
+    key = (current[0], current[1])
+    deltas[key] = deltas.get(key, Decimal("0")) + current[2]
+    apply_hours_delta(deltas)
+    instance._logged_hours = current
+
+
+def _on_log_deleted(sender, instance, **kwargs):
+    previous = getattr(instance, "_logged_hours", None) or _logged(instance)
+    if previous is None:
+        return
+    project_id, stage_id, hours = previous
+    apply_hours_delta({(project_id, stage_id): -hours})
+
+
+def connect_hours_signals():
+    post_init.connect(_remember_interval, sender=WorkLog, dispatch_uid="work-hours-init")
+    post_save.connect(_on_log_saved, sender=WorkLog, dispatch_uid="work-hours-save")
+    post_delete.connect(_on_log_deleted, sender=WorkLog, dispatch_uid="work-hours-delete")
+
+
+def logged_totals(logs):
+    """
+    {(project_id, stage_id): Decimal hours} for a WorkLog queryset, summed
+    in one grouped query.
+    """
+    duration = Case(
+        When(ended_at__gt=F("started_at"), then=F("ended_at") - F("started_at")),
+        default=Value(None),
+        output_field=DurationField(),
+    )
+    return {
+        (project_id, stage_id): (Decimal(total.total_seconds()) / 3600).quantize(HOURS)
+        for project_id, stage_id, total in logs.order_by()
+        .values("project_id", "stage_id")
+        .annotate(total=Sum(duration))
+        .values_list("project_id", "stage_id", "total")
+        if total is not None
+    }
+
+
+def reconcile_work_hours(shop=None, project_ids=None, batch_size=1000) -> int:
+    """
+    Recompute actual_hours (manual_hours + logged hours) and per-stage
+    hours from WorkLog for a shop, a set of projects, or everything,
+    projects without logs included. Returns the number of projects whose
+    total changed.
+    """
+    projects = Project.objects.all()
+    if shop is not None:
+        projects = projects.filter(shop=shop)
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+
+    totals = logged_totals(WorkLog.objects.filter(project__in=projects))
+
+    project_totals = {}
+    for (project_id, _), hours in totals.items():
+        project_totals[project_id] = project_totals.get(project_id, Decimal("0")) + hours
+
+    with transaction.atomic():
+        changed = []
+        for project in projects.only("id", "actual_hours", "manual_hours").iterator(
+            chunk_size=batch_size
+        ):
+            total = (project.manual_hours or Decimal("0")) + project_totals.get(
+                project.id, Decimal("0")
+            )
+            if project.actual_hours is None and not total:
+                # never logged nor entered: leave it blank
+                continue
+            if project.actual_hours != total:
+                project.actual_hours = total
+                changed.append(project)
+        Project.objects.bulk_update(changed, ["actual_hours"], batch_size=batch_size)
+
+        ProjectStageHours.objects.filter(project__in=projects).delete()
+        ProjectStageHours.objects.bulk_create(
+            [
+                ProjectStageHours(project_id=project_id, stage_id=stage_id, hours=hours)
+                for (project_id, stage_id), hours in totals.items()
+                if stage_id is not None
+            ],
+            batch_size=batch_size,
+        )
+
+        if changed:
+            for shop_id in set(projects.values_list("shop_id", flat=True).distinct()):
+                transaction.on_commit(lambda shop_id=shop_id: invalidate_plans(shop_id))
+
+    return len(changed)
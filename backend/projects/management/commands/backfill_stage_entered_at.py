@@ -0,0 +1,62 @@
+# projects/management/commands/backfill_stage_entered_at.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Case, F, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce
+
+from core.models import Shop
+from projects.models import Project
+from workflows.models import ProjectStageHistory
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate Project.current_stage_entered_at: completion / cancellation "
+        "time for closed projects, else the latest history row for the current "
+        "stage, else created_at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", type=int, default=None, help="Only this shop id.")
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every project, not just those still missing a value.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        qs = Project.objects.order_by("id")
+        if options["shop"] is not None:
+            if not Shop.objects.filter(pk=options["shop"]).exists():
+                raise CommandError(f"Shop {options['shop']} does not exist.")
+            qs = qs.filter(shop_id=options["shop"])
+        if not options["all"]:
+            qs = qs.filter(current_stage_entered_at__isnull=True)
+
+        latest_entry = (
+            ProjectStageHistory.objects.filter(
+                project=OuterRef("pk"), stage=OuterRef("current_stage")
+            )
+            .order_by("-entered_at")
+            .values("entered_at")[:1]
+        )
+        entered_at = Case(
+            When(Q(status="completed", completed_at__isnull=False), then=F("completed_at")),
+            When(Q(status="cancelled", cancelled_at__isnull=False), then=F("cancelled_at")),
+            default=Coalesce(Subquery(latest_entry), F("created_at")),
+        )
+
+        updated = 0
+        last_id = 0
+        batch_size = options["batch_size"]
+        while True:
+            ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            updated += Project.objects.filter(id__in=ids).update(
+                current_stage_entered_at=entered_at
+            )
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} projects."))
@@ -0,0 +1,29 @@
+# projects/management/commands/reconcile_work_hours.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Shop
+from projects.hours import reconcile_work_hours
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Project.actual_hours (manual_hours plus logged hours) and "
+        "per-stage logged hours from WorkLog in one grouped query, repairing "
+        "any drift in the incremental rollups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", type=int, default=None, help="Only this shop id.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        shop = None
+        if options["shop"] is not None:
+            try:
+                shop = Shop.objects.get(pk=options["shop"])
+            except Shop.DoesNotExist:
+                raise CommandError(f"Shop {options['shop']} does not exist.")
+
+        changed = reconcile_work_hours(shop=shop, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled hours; {changed} projects changed."))
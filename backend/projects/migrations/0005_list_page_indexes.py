@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_list_page_indexes'),
+        ('products', '0004_list_page_indexes'),
+        ('projects', '0004_project_completed_at_project_confirmed_at_and_more'),
+        ('workflows', '0002_list_page_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['shop', 'created_at', 'id'], name='projects_pr_shop_id_a23f76_idx'),
+        ),
+    ]
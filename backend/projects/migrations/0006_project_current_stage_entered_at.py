@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_list_page_indexes'),
+        ('products', '0004_list_page_indexes'),
+        ('projects', '0005_list_page_indexes'),
+        ('workflows', '0002_list_page_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='current_stage_entered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['shop', 'status', 'current_stage_entered_at'], name='projects_pr_shop_id_3cc232_idx'),
+        ),
+    ]
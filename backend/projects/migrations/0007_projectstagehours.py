@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_current_stage_entered_at'),
+        ('workflows', '0003_stageflowsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStageHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='worklog',
+            index=models.Index(fields=['project', 'started_at'], name='projects_wo_project_c3e743_idx'),
+        ),
+        migrations.AddField(
+            model_name='projectstagehours',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_hours', to='projects.project'),
+        ),
+        migrations.AddField(
+            model_name='projectstagehours',
+            name='stage',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_hours', to='workflows.workflowstage'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='projectstagehours',
+            unique_together={('project', 'stage')},
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:39
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, DurationField, F, Sum, Value, When
+
+
+def split_manual_hours(apps, schema_editor):
+    # whatever actual_hours holds beyond the logged hours was entered by hand
+    Project = apps.get_model("projects", "Project")
+    WorkLog = apps.get_model("projects", "WorkLog")
+    duration = Case(
+        When(ended_at__gt=F("started_at"), then=F("ended_at") - F("started_at")),
+        default=Value(None),
+        output_field=DurationField(),
+    )
+    logged = {
+        project_id: (Decimal(total.total_seconds()) / 3600).quantize(Decimal("0.01"))
+        for project_id, total in WorkLog.objects.order_by()
+        .values("project_id")
+        .annotate(total=Sum(duration))
+        .values_list("project_id", "total")
+        if total is not None
+    }
+    changed = []
+    for project in Project.objects.filter(actual_hours__isnull=False).only("id", "actual_hours"):
+        manual = project.actual_hours - logged.get(project.id, Decimal("0"))
+        if manual > 0:
+            project.manual_hours = manual
+            changed.append(project)
+    Project.objects.bulk_update(changed, ["manual_hours"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_projectstagehours'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='manual_hours',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(split_manual_hours, migrations.RunPython.noop),
+    ]
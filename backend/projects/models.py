@@ -63,6 +63,14 @@ class Project(models.Model):
         null=True,
         blank=True,
     )
+    # hours entered by hand before time logging; actual_hours is this plus
+    # the logged WorkLog hours (projects.hours)
+    manual_hours = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
 
     status = models.CharField(
         max_length=20,
@@ -88,11 +96,24 @@ class Project(models.Model):
     )
     cancelled_at = models.DateTimeField(null=True, blank=True)
 
+    # when the project entered its current stage (or reached completed /
+    # cancelled); maintained by the project endpoints, see
+    # `manage.py backfill_stage_entered_at` for older rows
+    current_stage_entered_at = models.DateTimeField(null=True, blank=True)
+
     notes = models.TextField(blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # list pages by (-created_at, -id)
+            models.Index(fields=["shop", "created_at", "id"]),
+            # "stuck in stage for more than N days"
+            models.Index(fields=["shop", "status", "current_stage_entered_at"]),
+        ]
+
     def __str__(self) -> str:
         return self.name
 
@@ -125,7 +146,35 @@ class WorkLog(models.Model):
 
     class Meta:
         ordering = ["started_at"]
+        indexes = [
+            models.Index(fields=["project", "started_at"]),
+        ]
 
     def __str__(self) -> str:
         stage_name = self.stage.name if self.stage else "No stage"
         return f"{self.project.name} – {stage_name} ({self.started_at} → {self.ended_at})"
+
+
+class ProjectStageHours(models.Model):
+    """
+    Logged hours per project and stage, kept in step with WorkLog by
+    projects.hours (Project.actual_hours holds the project total).
+    """
+
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="stage_hours",
+    )
+    stage = models.ForeignKey(
+        WorkflowStage,
+        on_delete=models.CASCADE,
+        related_name="project_hours",
+    )
+    hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = [("project", "stage")]
+
+    def __str__(self) -> str:
+        return f"{self.project_id} / {self.stage_id}: {self.hours}h"
@@ -0,0 +1,335 @@
+# backend/projects/scheduling.py
+"""
+Capacity-aware build plan for a shop's active projects.
+
+The shop is one bench with `daily_capacity_hours` on each of its
+`work_days`. Active projects are list-scheduled in priority order, each
+taking its remaining hours (estimated_hours - actual_hours) of bench time
+before the next one starts:
+
+- "edd": earliest due date first
+- "cr":  lowest critical ratio first, i.e. (work days until due) /
+         (work days of remaining work), taken at the plan's start date;
+         overdue projects come first
+
+Because a project only ever waits on those ahead of it, its start and
+finish are a function of the cumulative hours before it, so the plan is
+an ordered list plus prefix sums. Changing one project (hours, due date,
+status) re-slots just that entry and re-adds the sums behind it: the
+cached plan is patched from the Project signals instead of re-planned.
+
+Patches are ordered by a per-shop generation counter (cache incr). A
+cached plan carries the generation it reflects and is only served while
+that is the shop's current one. A patch applies only to the plan of the
+generation just before its own; when two overlap, the loser leaves the
+plan behind and the next read rebuilds it from the database, so no
+update is lost.
+"""
+
+import bisect
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import Project
+
+
+POLICIES = ("edd", "cr")
+CACHE_VERSION = 2
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _cache():
+    return caches[getattr(settings, "SHOPOPS_SCHEDULE_CACHE", "default")]
+
+
+def _key(shop_id, policy) -> str:
+    return f"projects:schedule:v{CACHE_VERSION}:{shop_id}:{policy}"
+
+
+def _generation_key(shop_id) -> str:
+    return f"projects:schedule:v{CACHE_VERSION}:{shop_id}:generation"
+
+
+def _generation(cache, shop_id) -> int:
+    key = _generation_key(shop_id)
+    generation = cache.get(key)
+    if generation is None:
+        # time-based seed: after an eviction no cached plan can match it
+        cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _next_generation(cache, shop_id):
+    try:
+        return cache.incr(_generation_key(shop_id))
+    except ValueError:
+        # missing: no cached plan can be current anyway
+        return None
+
+
+def shop_today(shop) -> date:
+    return timezone.localtime(timezone.now(), shop.zoneinfo).date()
+
+
+def remaining_hours(estimated_hours, actual_hours) -> float:
+    return max(float(estimated_hours or 0) - float(actual_hours or 0), 0.0)
+
+
+@dataclass
+class Plan:
+    shop_id: int
+    policy: str
+    start: date
+    capacity: float  # hours per work day
+    work_days: tuple  # weekday numbers, sorted
+    generation: int = 0  # the shop's plan generation this reflects
+    keys: list = field(default_factory=list)  # priority keys, ascending
+    items: list = field(default_factory=list)  # parallel: (project_id, hours, due_date)
+    cumulative: list = field(default_factory=list)  # hours up to and including items[i]
+    key_by_project: dict = field(default_factory=dict)
+
+    # -- calendar -------------------------------------------------------
+
+    def workday(self, index) -> date:
+        """
+        Date of the `index`-th (0-based) work day on or after `start`.
+        """
+        offsets = [
+            offset for offset in range(7) if (self.start.weekday() + offset) % 7 in self.work_days
+        ]
+        weeks, position = divmod(index, len(offsets))
+        return self.start + timedelta(days=weeks * 7 + offsets[position])
+
+    def _count_workdays(self, first, last) -> int:
+        """
+        Work days in [first, last], inclusive.
+        """
+        weeks, rest = divmod((last - first).days + 1, 7)
+        extra = sum(
+            1 for offset in range(rest) if (first.weekday() + offset) % 7 in self.work_days
+        )
+        return weeks * len(self.work_days) + extra
+
+    def workdays_until(self, day) -> int:
+        """
+        Work days from `start` up to and including `day`; negative when
+        `day` is already past.
+        """
+        if day >= self.start:
+            return self._count_workdays(self.start, day)
+        return -self._count_workdays(day, self.start - timedelta(days=1))
+
+    # -- ordering -------------------------------------------------------
+
+    def priority(self, project_id, hours, due_date):
+        if self.policy == "cr":
+            if due_date is None:
+                ratio = math.inf
+            elif hours <= 0:
+                # nothing left to do: only ahead of others if already overdue
+                ratio = -math.inf if due_date < self.start else math.inf
+            else:
+                ratio = self.workdays_until(due_date) / (hours / self.capacity)
+            return (ratio, due_date or date.max, project_id)
+        return (due_date or date.max, project_id)
+
+    def _recompute_from(self, index):
+        total = self.cumulative[index - 1] if index > 0 else 0.0
+        for i in range(index, len(self.items)):
+            total += self.items[i][1]
+            self.cumulative[i] = total
+
+    def remove(self, project_id):
+        key = self.key_by_project.pop(project_id, None)
+        if key is None:
+            return
+        index = bisect.bisect_left(self.keys, key)
+        del self.keys[index], self.items[index], self.cumulative[index]
+        if index < len(self.items):
+            self._recompute_from(index)
+
+    def upsert(self, project_id, hours, due_date):
+        self.remove(project_id)
+        key = self.priority(project_id, hours, due_date)
+        index = bisect.bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.items.insert(index, (project_id, hours, due_date))
+        self.cumulative.insert(index, 0.0)
+        self.key_by_project[project_id] = key
+        self._recompute_from(index)
+
+    # -- output ---------------------------------------------------------
+
+    def project_rows(self):
+        rows = []
+        previous = 0.0
+        for (project_id, hours, due_date), total in zip(self.items, self.cumulative):
+            start = self.workday(int(previous // self.capacity))
+            finish = self.workday(max(math.ceil(total / self.capacity) - 1, 0)) if hours else start
+            late = due_date is not None and finish > due_date
+            rows.append(
+                {
+                    "project_id": project_id,
+                    "remaining_hours": round(hours, 2),
+                    "due_date": due_date,
+                    "start_date": start,
+                    "finish_date": finish,
+                    "late": late,
+                    "days_late": (finish - due_date).days if late else 0,
+                }
+            )
+            previous = total
+        return rows
+
+    def day_rows(self, days):
+        """
+        Bench allocations for the first `days` work days.
+        """
+        rows = []
+        index = 0
+        for day in range(days):
+            window_start, window_end = day * self.capacity, (day + 1) * self.capacity
+            allocations = []
+            while index < len(self.items):
+                begins = self.cumulative[index - 1] if index > 0 else 0.0
+                ends = self.cumulative[index]
+                if begins >= window_end:
+                    break
+                hours = min(ends, window_end) - max(begins, window_start)
+                if hours > 0:
+                    allocations.append(
+                        {"project_id": self.items[index][0], "hours": round(hours, 2)}
+                    )
+                if ends > window_end:
+                    break
+                index += 1
+            if not allocations and index >= len(self.items):
+                break
+            rows.append({"date": self.workday(day), "allocations": allocations})
+        return rows
+
+
+def build_plan(shop, policy="edd", capacity=None, work_days=None, start=None) -> Plan:
+    """
+    Plan every active project of the shop from one query.
+    """
+    plan = Plan(
+        shop_id=shop.id,
+        policy=policy,
+        start=start or shop_today(shop),
+        capacity=float(capacity or shop.daily_capacity_hours or 8),
+        work_days=tuple(sorted(set(work_days or shop.work_days or range(5)))),
+    )
+    entries = []
+    for project_id, estimated, actual, due_date in Project.objects.filter(
+        shop=shop, status="active"
+    ).values_list("id", "estimated_hours", "actual_hours", "due_date"):
+        hours = remaining_hours(estimated, actual)
+        entries.append((plan.priority(project_id, hours, due_date), (project_id, hours, due_date)))
+    entries.sort()
+
+    total = 0.0
+    for key, item in entries:
+        total += item[1]
+        plan.keys.append(key)
+        plan.items.append(item)
+        plan.cumulative.append(total)
+        plan.key_by_project[item[0]] = key
+    return plan
+
+
+def get_plan(shop, policy="edd") -> Plan:
+    """
+    The shop's plan for today at its configured capacity, cached.
+    """
+    cache = _cache()
+    # read before planning: a write committed meanwhile bumps it past this
+    generation = _generation(cache, shop.id)
+    plan = cache.get(_key(shop.id, policy))
+    if (
+        plan is None
+        or plan.generation != generation
+        or plan.start != shop_today(shop)
+        or plan.capacity != float(shop.daily_capacity_hours)
+        or plan.work_days != tuple(sorted(set(shop.work_days or range(5))))
+    ):
+        plan = build_plan(shop, policy)
+        plan.generation = generation
+        cache.set(_key(shop.id, policy), plan, timeout=CACHE_TIMEOUT)
+    return plan
+
+
+def invalidate_plans(shop_id) -> None:
+    _cache().delete_many([_key(shop_id, policy) for policy in POLICIES])
+
+
+def replan_project(shop_id, project_id, hours=None, due_date=None, active=True) -> None:
+    """
+    Patch one project into (or out of) the cached plans, if any, as the
+    shop's next generation.
+    """
+    cache = _cache()
+    generation = _next_generation(cache, shop_id)
+    if generation is None:
+        return
+    for policy in POLICIES:
+        plan = cache.get(_key(shop_id, policy))
+        if plan is None or plan.generation != generation - 1:
+            # missed another write: stale now, the next read rebuilds it
+            continue
+        if active:
+            plan.upsert(project_id, hours, due_date)
+        else:
+            plan.remove(project_id)
+        plan.generation = generation
+        cache.set(_key(shop_id, policy), plan, timeout=CACHE_TIMEOUT)
+
+
+def replan_from_db(project_id) -> None:
+    """
+    Re-slot a project whose hours were changed by a queryset update (no
+    post_save), e.g. the WorkLog rollups in projects.hours.
+    """
+    row = (
+        Project.objects.filter(pk=project_id)
+        .values_list("shop_id", "estimated_hours", "actual_hours", "due_date", "status")
+        .first()
+    )
+    if row is None:
+        return
+    shop_id, estimated, actual, due_date, status = row
+    replan_project(
+        shop_id, project_id, remaining_hours(estimated, actual), due_date, status == "active"
+    )
+
+
+def _on_project_saved(sender, instance, **kwargs):
+    args = (
+        instance.shop_id,
+        instance.pk,
+        remaining_hours(instance.estimated_hours, instance.actual_hours),
+        instance.due_date,
+        instance.status == "active",
+    )
+    transaction.on_commit(lambda: replan_project(*args))
+
+
+def _on_project_deleted(sender, instance, **kwargs):
+    shop_id, project_id = instance.shop_id, instance.pk
+    transaction.on_commit(lambda: replan_project(shop_id, project_id, active=False))
+
+
+def connect_schedule_signals():
+    post_save.connect(_on_project_saved, sender=Project, dispatch_uid="schedule-project-save")
+    post_delete.connect(
+        _on_project_deleted, sender=Project, dispatch_uid="schedule-project-delete"
+    )
@@ -1,15 +1,73 @@
 # backend/projects/serializers.py
 
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework import serializers as drf_serializers
 
 from core.models import Customer
+from core.signals import notify_bulk_created
 from products.models import ProductTemplate
-from workflows.models import WorkflowDefinition, WorkflowStage
+from workflows.metadata import get_workflow_meta
+from workflows.models import ProjectStageHistory, WorkflowDefinition, WorkflowStage
 from projects.models import Project, WorkLog
+from projects.scheduling import invalidate_plans
 from sales.models import Sale
 
 
+def resolve_workflow(shop, template) -> WorkflowDefinition:
+    """
+    template.workflow if set, else the shop's active default workflow.
+    """
+    workflow = template.workflow
+    if workflow is None:
+        workflow = (
+            WorkflowDefinition.objects.filter(
+                shop=shop,
+                is_default=True,
+                is_active=True,
+            ).first()
+        )
+    if workflow is None:
+        raise serializers.ValidationError(
+            "No workflow is configured for this template or as a shop default."
+        )
+    return workflow
+
+
+def resolve_first_stage_id(workflow) -> int:
+    # read from the database, not the cached stage metadata: another
+    # process may still hold stages that were since deleted or reordered
+    stage_id = (
+        WorkflowStage.objects.filter(workflow=workflow)
+        .order_by("order", "id")
+        .values_list("id", flat=True)
+        .first()
+    )
+    if stage_id is None:
+        raise serializers.ValidationError(
+            "Selected workflow has no stages defined."
+        )
+    return stage_id
+
+
+def template_estimates(template, quantity, estimated_hours=None, expected_price=None):
+    """
+    (estimated_hours, expected_price): provided values win, otherwise the
+    template's per-unit labor hours / base price times quantity.
+    """
+    if estimated_hours is None or estimated_hours == 0:
+        if template.estimated_labor_hours:
+            estimated_hours = template.estimated_labor_hours * quantity
+        else:
+            estimated_hours = 0
+
+    if expected_price is None and template.base_price:
+        expected_price = template.base_price * quantity
+
+    return estimated_hours, expected_price
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     template_name = serializers.CharField(source="template.name", read_only=True)
     customer_name = serializers.CharField(source="customer.name", read_only=True)
@@ -19,10 +77,10 @@ class ProjectSerializer(serializers.ModelSerializer):
         read_only=True,
     )
 
-    # NEW: progress-related fields
-    total_stages = serializers.IntegerField(read_only=True)
-    current_stage_order = serializers.IntegerField(read_only=True)
-    cancel_stage_order = serializers.IntegerField(read_only=True)
+    # NEW: progress-related fields (per-workflow constants, see workflows.metadata)
+    total_stages = serializers.SerializerMethodField()
+    current_stage_order = serializers.SerializerMethodField()
+    cancel_stage_order = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
@@ -53,6 +111,7 @@ class ProjectSerializer(serializers.ModelSerializer):
             "cancel_reason",
             "cancel_stage",
             "cancelled_at",
+            "current_stage_entered_at",
             "notes",
             "created_at",
             "updated_at",
@@ -71,6 +130,9 @@ class ProjectSerializer(serializers.ModelSerializer):
             "cancel_reason",
             "cancel_stage",
             "cancelled_at",
+            "current_stage_entered_at",
+            # summed from WorkLog by projects.hours
+            "actual_hours",
             "quoted_at",
             "confirmed_at",
             "started_at",
@@ -82,6 +144,23 @@ class ProjectSerializer(serializers.ModelSerializer):
             "cancel_stage_order",
         ]
 
+    def _workflow_meta(self, obj):
+        # shared by every row of a list: one cache lookup per workflow
+        metas = self.context.setdefault("workflow_meta", {})
+        meta = metas.get(obj.workflow_id)
+        if meta is None:
+            meta = metas[obj.workflow_id] = get_workflow_meta(obj.workflow_id)
+        return meta
+
+    def get_total_stages(self, obj):
+        return self._workflow_meta(obj).stage_count
+
+    def get_current_stage_order(self, obj):
+        return self._workflow_meta(obj).stage_order(obj.current_stage_id)
+
+    def get_cancel_stage_order(self, obj):
+        return self._workflow_meta(obj).cancel_stage_order
+
     def validate(self, attrs):
         """
         Validation that works for both create and partial update.
@@ -145,60 +224,36 @@ class ProjectSerializer(serializers.ModelSerializer):
         template: ProductTemplate = validated_data.get("template")
         quantity = validated_data.get("quantity", 1)
 
-        # Resolve workflow
-        workflow = template.workflow
-        if workflow is None:
-            workflow = (
-                WorkflowDefinition.objects.filter(
-                    shop=shop,
-                    is_default=True,
-                    is_active=True,
-                ).first()
-            )
-        if workflow is None:
-            raise serializers.ValidationError(
-                "No workflow is configured for this template or as a shop default."
-            )
-
-        # Resolve first stage
-        first_stage: WorkflowStage | None = workflow.stages.order_by("order").first()
-        if first_stage is None:
-            raise serializers.ValidationError(
-                "Selected workflow has no stages defined."
-            )
-
-        # Estimated hours
-        estimated_hours = validated_data.get("estimated_hours")
-        if estimated_hours is None or estimated_hours == 0:
-            if template.estimated_labor_hours:
-                estimated_hours = template.estimated_labor_hours * quantity
-            else:
-                estimated_hours = 0
-
-        # Expected price
-        expected_price = validated_data.get("expected_price")
-        if expected_price is None and template.base_price:
-            expected_price = template.base_price * quantity
+        workflow = resolve_workflow(shop, template)
+        first_stage_id = resolve_first_stage_id(workflow)
+        estimated_hours, expected_price = template_estimates(
+            template,
+            quantity,
+            estimated_hours=validated_data.get("estimated_hours"),
+            expected_price=validated_data.get("expected_price"),
+        )
 
         project = Project.objects.create(
             shop=shop,
             template=template,
             workflow=workflow,
-            current_stage=first_stage,
+            current_stage_id=first_stage_id,
+            current_stage_entered_at=timezone.now(),
             customer=validated_data.get("customer"),
             name=validated_data.get("name"),
             quantity=quantity,
             image=validated_data.get("image"),
             due_date=validated_data.get("due_date"),
             estimated_hours=estimated_hours,
-            actual_hours=validated_data.get("actual_hours"),
             status="active",
             expected_price=expected_price,
             expected_currency=shop.currency,
             notes=validated_data.get("notes", ""),
         )
 
-        # Optionally: you can hook ProjectStageHistory here later
+        # the opening history row is the project's first stage arrival for
+        # stage analytics and the cumulative-flow snapshots
+        ProjectStageHistory.objects.create(project=project, stage_id=first_stage_id)
         return project
 
 
@@ -224,6 +279,137 @@ class LogSaleSerializer(drf_serializers.Serializer):
     )
 
 
+class BulkCreateProjectsSerializer(drf_serializers.Serializer):
+    """
+    "Make 40 coasters": `count` identical projects from one template.
+
+    Names are "<name> #1" … "<name> #N", the number zero-padded to the
+    width of N so they sort in order ("Coaster #01" … "Coaster #40"); name
+    defaults to the template's.
+    """
+
+    MAX_COUNT = 500
+
+    template = drf_serializers.PrimaryKeyRelatedField(queryset=ProductTemplate.objects.all())
+    count = drf_serializers.IntegerField(min_value=1, max_value=MAX_COUNT)
+    name = drf_serializers.CharField(required=False, allow_blank=True, max_length=200)
+    customer = drf_serializers.PrimaryKeyRelatedField(
+        queryset=Customer.objects.all(), required=False, allow_null=True
+    )
+    quantity = drf_serializers.IntegerField(min_value=1, default=1)
+    due_date = drf_serializers.DateField(required=False, allow_null=True)
+    estimated_hours = drf_serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+    expected_price = drf_serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+    notes = drf_serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        shop = self.context["shop"]
+        if attrs["template"].shop_id != shop.id:
+            raise drf_serializers.ValidationError({"template": "Template not found."})
+        customer = attrs.get("customer")
+        if customer is not None and customer.shop_id != shop.id:
+            raise drf_serializers.ValidationError({"customer": "Customer not found."})
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Resolve workflow, first stage and estimates once, then insert every
+        project and its initial stage history row with bulk_create.
+        """
+        shop = self.context["shop"]
+        template: ProductTemplate = validated_data["template"]
+        count = validated_data["count"]
+        quantity = validated_data["quantity"]
+
+        workflow = resolve_workflow(shop, template)
+        first_stage_id = resolve_first_stage_id(workflow)
+        # identical for every project in the batch
+        estimated_hours, expected_price = template_estimates(
+            template,
+            quantity,
+            estimated_hours=validated_data.get("estimated_hours"),
+            expected_price=validated_data.get("expected_price"),
+        )
+        base_name = (validated_data.get("name") or "").strip() or template.name
+        width = len(str(count))
+        now = timezone.now()
+
+        projects = [
+            Project(
+                shop=shop,
+                template=template,
+                workflow=workflow,
+                current_stage_id=first_stage_id,
+                current_stage_entered_at=now,
+                customer=validated_data.get("customer"),
+                name=f"{base_name} #{i:0{width}d}",
+                quantity=quantity,
+                due_date=validated_data.get("due_date"),
+                estimated_hours=estimated_hours,
+                status="active",
+                expected_price=expected_price,
+                expected_currency=shop.currency,
+                notes=validated_data.get("notes", ""),
+            )
+            for i in range(1, count + 1)
+        ]
+
+        with transaction.atomic():
+            projects = Project.objects.bulk_create(projects)
+            ProjectStageHistory.objects.bulk_create(
+                [
+                    ProjectStageHistory(project_id=project.id, stage_id=first_stage_id)
+                    for project in projects
+                ]
+            )
+            # bulk_create sends no post_save: index / roll up / re-plan explicitly
+            notify_bulk_created(projects)
+            transaction.on_commit(lambda: invalidate_plans(shop.id))
+
+        return projects
+
+
+class StageMoveSerializer(drf_serializers.Serializer):
+    project_id = drf_serializers.IntegerField()
+    stage_id = drf_serializers.IntegerField()
+
+
+class BulkMoveSerializer(drf_serializers.Serializer):
+    MAX_MOVES = 500
+
+    moves = StageMoveSerializer(many=True, allow_empty=False, max_length=MAX_MOVES)
+
+    def validate_moves(self, moves):
+        project_ids = [m["project_id"] for m in moves]
+        if len(set(project_ids)) != len(project_ids):
+            raise drf_serializers.ValidationError("Each project may only be moved once per request.")
+        return moves
+
+
+class WorkLogEntrySerializer(drf_serializers.Serializer):
+    # plain ids: existence is checked for the whole batch in one query
+    project_id = drf_serializers.IntegerField()
+    stage_id = drf_serializers.IntegerField(required=False, allow_null=True)
+    started_at = drf_serializers.DateTimeField()
+    ended_at = drf_serializers.DateTimeField()
+    notes = drf_serializers.CharField(required=False, allow_blank=True, default="")
+
+    def validate(self, attrs):
+        if attrs["ended_at"] <= attrs["started_at"]:
+            raise drf_serializers.ValidationError({"ended_at": "Must be after started_at."})
+        return attrs
+
+
+class BulkWorkLogSerializer(drf_serializers.Serializer):
+    MAX_ENTRIES = 5000
+
+    entries = WorkLogEntrySerializer(many=True, allow_empty=False, max_length=MAX_ENTRIES)
+
+
 class WorkLogSerializer(serializers.ModelSerializer):
     """
     Serializer for work logs (time tracking) on a project.
@@ -1,3 +1,247 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Shop
+from projects.hours import reconcile_work_hours
+from projects import scheduling
+from products.models import ProductTemplate
+from projects.models import Project, WorkLog
+from workflows.metadata import get_workflow_meta
+from workflows.models import ProjectStageHistory, WorkflowDefinition, WorkflowStage
+
+
+class BulkMoveSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+        workflow = WorkflowDefinition.objects.create(shop=self.shop, name="Build")
+        self.cut = WorkflowStage.objects.create(workflow=workflow, name="Cut", order=1, key="cut")
+        self.sanding = WorkflowStage.objects.create(
+            workflow=workflow, name="Sanding", order=2, key="sanding"
+        )
+        self.project = Project.objects.create(
+            shop=self.shop, workflow=workflow, current_stage=self.cut, name="Walnut table"
+        )
+        self.client.force_authenticate(self.user)
+
+    def search_ids(self, q):
+        response = self.client.get("/api/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_stage_filter_reflects_bulk_move(self):
+        # cached under the shop's current search version
+        self.assertEqual(self.search_ids("walnut stage:cut"), [self.project.id])
+        self.assertEqual(self.search_ids("walnut stage:sanding"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/projects/bulk_move/",
+                {"moves": [{"project_id": self.project.id, "stage_id": self.sanding.id}]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.search_ids("walnut stage:cut"), [])
+        self.assertEqual(self.search_ids("walnut stage:sanding"), [self.project.id])
+
+
+class WorkHoursTests(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=user, name="Maker Shop")
+        workflow = WorkflowDefinition.objects.create(shop=self.shop, name="Build")
+        self.cut = WorkflowStage.objects.create(workflow=workflow, name="Cut", order=1, key="cut")
+        # hand-entered before time logging
+        self.project = Project.objects.create(
+            shop=self.shop,
+            workflow=workflow,
+            current_stage=self.cut,
+            name="Walnut table",
+            actual_hours=Decimal("10.00"),
+            manual_hours=Decimal("10.00"),
+        )
+
+    def actual_hours(self):
+        return Project.objects.get(pk=self.project.pk).actual_hours
+
+    def test_incremental_and_reconcile_agree(self):
+        started_at = timezone.now() - timedelta(days=1)
+        log = WorkLog.objects.create(
+            project=self.project,
+            stage=self.cut,
+            started_at=started_at,
+            ended_at=started_at + timedelta(hours=2),
+        )
+        self.assertEqual(self.actual_hours(), Decimal("12.00"))
+        self.assertEqual(reconcile_work_hours(shop=self.shop), 0)
+        self.assertEqual(self.actual_hours(), Decimal("12.00"))
+
+        log.delete()
+        self.assertEqual(self.actual_hours(), Decimal("10.00"))
+        self.assertEqual(reconcile_work_hours(shop=self.shop), 0)
+        self.assertEqual(self.actual_hours(), Decimal("10.00"))
+
+    def test_reconcile_repairs_projects_without_logs(self):
+        Project.objects.filter(pk=self.project.pk).update(actual_hours=Decimal("7.00"))
+
+        self.assertEqual(reconcile_work_hours(shop=self.shop), 1)
+        self.assertEqual(self.actual_hours(), Decimal("10.00"))
+
+
+class SchedulePlanCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=user, name="Maker Shop")
+        workflow = WorkflowDefinition.objects.create(shop=self.shop, name="Build")
+        cut = WorkflowStage.objects.create(workflow=workflow, name="Cut", order=1, key="cut")
+
+        def project(name, hours):
+            return Project.objects.create(
+                shop=self.shop,
+                workflow=workflow,
+                current_stage=cut,
+                name=name,
+                estimated_hours=Decimal(hours),
+            )
+
+        self.table = project("Walnut table", "10.00")
+        self.stool = project("Oak stool", "3.00")
+
+    def remaining(self):
+        plan = scheduling.get_plan(Shop.objects.get(pk=self.shop.pk))
+        return {project_id: hours for project_id, hours, _ in plan.items}
+
+    def test_patch_after_a_missed_write_is_not_served(self):
+        self.assertEqual(self.remaining(), {self.table.id: 10.0, self.stool.id: 3.0})
+
+        # another process committed this and took the next generation, but
+        # its patch lost the race and never reached the cache
+        Project.objects.filter(pk=self.table.pk).update(estimated_hours=Decimal("4.00"))
+        scheduling._next_generation(scheduling._cache(), self.shop.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stool.estimated_hours = Decimal("5.00")
+            self.stool.save()
+
+        self.assertEqual(self.remaining(), {self.table.id: 4.0, self.stool.id: 5.0})
+
+    def test_save_patches_cached_plan(self):
+        plan = scheduling.get_plan(self.shop)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stool.estimated_hours = Decimal("5.00")
+            self.stool.save()
+
+        patched = scheduling._cache().get(scheduling._key(self.shop.id, "edd"))
+        self.assertEqual(patched.generation, plan.generation + 1)
+        self.assertEqual(self.remaining(), {self.table.id: 10.0, self.stool.id: 5.0})
+
+
+class ProjectEndpointTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+        self.workflow = WorkflowDefinition.objects.create(shop=self.shop, name="Build")
+        self.cut = WorkflowStage.objects.create(
+            workflow=self.workflow, name="Cut", order=1, key="cut"
+        )
+        self.sanding = WorkflowStage.objects.create(
+            workflow=self.workflow, name="Sanding", order=2, key="sanding"
+        )
+        self.template = ProductTemplate.objects.create(
+            shop=self.shop, name="Coaster", workflow=self.workflow
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_new_project_starts_in_current_first_stage(self):
+        get_workflow_meta(self.workflow.id)
+        # reordered without signals: the cached metadata still has Cut first
+        WorkflowStage.objects.filter(pk=self.cut.pk).update(order=3)
+
+        response = self.client.post(
+            "/api/projects/", {"template": self.template.id, "name": "Walnut coaster"}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["current_stage"], self.sanding.id)
+
+    def test_bulk_create_numbers_projects_in_order(self):
+        response = self.client.post(
+            "/api/projects/bulk_create/",
+            {"template": self.template.id, "count": 12},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["count"], 12)
+        names = list(Project.objects.filter(shop=self.shop).values_list("name", flat=True))
+        self.assertEqual(sorted(names)[:2], ["Coaster #01", "Coaster #02"])
+        self.assertEqual(sorted(names)[-1], "Coaster #12")
+        self.assertEqual(
+            ProjectStageHistory.objects.filter(project__shop=self.shop, stage=self.cut).count(),
+            12,
+        )
+
+    def test_move_stamps_stage_entry_for_stuck_filter(self):
+        project = Project.objects.create(
+            shop=self.shop, workflow=self.workflow, current_stage=self.cut, name="Walnut coaster"
+        )
+
+        response = self.client.post(
+            f"/api/projects/{project.id}/move/", {"stage_id": self.sanding.id}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        project.refresh_from_db()
+        self.assertIsNotNone(project.current_stage_entered_at)
+
+        self.assertEqual(self.client.get("/api/projects/", {"stuck_days": 7}).json(), [])
+        Project.objects.filter(pk=project.pk).update(
+            current_stage_entered_at=timezone.now() - timedelta(days=10)
+        )
+        stuck = self.client.get("/api/projects/", {"stuck_days": 7}).json()
+        self.assertEqual([row["id"] for row in stuck], [project.id])
+
+    def test_bulk_work_logs_skip_overlaps(self):
+        project = Project.objects.create(
+            shop=self.shop, workflow=self.workflow, current_stage=self.cut, name="Walnut coaster"
+        )
+        day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        existing = WorkLog.objects.create(
+            project=project, started_at=day + timedelta(hours=9), ended_at=day + timedelta(hours=11)
+        )
+
+        def entry(start, end):
+            return {
+                "project_id": project.id,
+                "started_at": (day + timedelta(hours=start)).isoformat(),
+                "ended_at": (day + timedelta(hours=end)).isoformat(),
+            }
+
+        response = self.client.post(
+            "/api/projects/bulk_work_logs/",
+            # overlaps the saved log / fine / overlaps entry 1 / touches entry 1
+            {"entries": [entry(10, 12), entry(13, 14), entry(13.5, 15), entry(14, 15)]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.json(),
+            {
+                "created": 2,
+                "skipped": [
+                    {"index": 0, "conflicts_with": {"work_log": existing.id}},
+                    {"index": 2, "conflicts_with": {"index": 1}},
+                ],
+            },
+        )
+        self.assertEqual(WorkLog.objects.filter(project=project).count(), 3)
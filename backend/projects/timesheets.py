@@ -0,0 +1,100 @@
+# backend/projects/timesheets.py
+"""
+Bulk WorkLog ingest (timer-app imports).
+
+A shop is worked by its owner, so "per person and project" means per
+project. Overlaps and duplicates are found with one sort-and-sweep over
+the batch plus the project's existing logs in the batch's time window
+(fetched in a single query), so a batch costs O(n log n) rather than a
+lookup per entry. Clean entries are inserted with chunked bulk_create and
+folded into the hours rollups (projects.hours) as one set of deltas.
+"""
+
+from django.db import transaction
+
+from .hours import apply_hours_delta, log_hours
+from .models import WorkLog
+
+
+INSERT_BATCH_SIZE = 500
+
+
+def find_conflicts(entries, existing):
+    """
+    Entries that duplicate or overlap an earlier interval of the same
+    project.
+
+    `entries`: [(project_id, started_at, ended_at)] in request order;
+    `existing`: [(project_id, started_at, ended_at, work_log_id)].
+
+    Returns {entry_index: conflict}, where conflict is {"index": i} (an
+    earlier entry of the batch) or {"work_log": id}. Touching intervals
+    (one ends as the next starts) do not overlap. Existing logs sort ahead
+    of batch entries with the same start, so re-imports are the ones
+    rejected.
+    """
+    # (project, start, source, position, end): source 0 = existing, 1 = batch
+    intervals = [
+        (project_id, started_at, 0, work_log_id, ended_at)
+        for project_id, started_at, ended_at, work_log_id in existing
+    ]
+    intervals.extend(
+        (project_id, started_at, 1, index, ended_at)
+        for index, (project_id, started_at, ended_at) in enumerate(entries)
+    )
+    intervals.sort()
+
+    conflicts = {}
+    current_project = None
+    reach = None  # (latest end so far, owner) among kept intervals
+    for project_id, started_at, source, position, ended_at in intervals:
+        if project_id != current_project:
+            current_project, reach = project_id, None
+        if reach is not None and started_at < reach[0]:
+            if source == 1:
+                conflicts[position] = reach[1]
+                continue
+            # two existing logs overlap: not this batch's problem
+        owner = {"work_log": position} if source == 0 else {"index": position}
+        if reach is None or ended_at > reach[0]:
+            reach = (ended_at, owner)
+    return conflicts
+
+
+def existing_intervals(project_ids, entries):
+    """
+    Existing logs of these projects that could touch the batch: one query
+    bounded by the batch's earliest start and latest end.
+    """
+    if not entries:
+        return []
+    window_start = min(started_at for _, started_at, _ in entries)
+    window_end = max(ended_at for _, _, ended_at in entries)
+    return list(
+        WorkLog.objects.filter(
+            project_id__in=project_ids,
+            started_at__lt=window_end,
+            ended_at__gt=window_start,
+        )
+        .order_by()
+        .values_list("project_id", "started_at", "ended_at", "id")
+    )
+
+
+def ingest_work_logs(rows):
+    """
+    Insert validated rows ({project_id, stage_id, started_at, ended_at,
+    notes}) and apply their hours. Returns the created WorkLogs.
+    """
+    deltas = {}
+    logs = []
+    for row in rows:
+        logs.append(WorkLog(**row))
+        key = (row["project_id"], row.get("stage_id"))
+        deltas[key] = deltas.get(key, 0) + log_hours(row["started_at"], row["ended_at"])
+
+    with transaction.atomic():
+        created = WorkLog.objects.bulk_create(logs, batch_size=INSERT_BATCH_SIZE)
+        # bulk_create sends no post_save: roll the hours up explicitly
+        apply_hours_delta(deltas)
+    return created
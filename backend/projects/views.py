@@ -1,13 +1,31 @@
-from django.db.models import Count, F, Max, Q
+from datetime import timedelta
+
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from core.models import Shop
-from projects.models import Project
-from projects.serializers import ProjectSerializer, LogSaleSerializer
+from core.signals import notify_bulk_updated
+from projects.models import Project, ProjectStageHours
+from projects.scheduling import (
+    POLICIES,
+    build_plan,
+    get_plan,
+    invalidate_plans,
+    remaining_hours,
+)
+from projects.serializers import (
+    BulkCreateProjectsSerializer,
+    BulkMoveSerializer,
+    BulkWorkLogSerializer,
+    LogSaleSerializer,
+    ProjectSerializer,
+)
+from projects.timesheets import existing_intervals, find_conflicts, ingest_work_logs
 from workflows.models import WorkflowStage, ProjectStageHistory
 from sales.models import Sale
 from sales.serializers import SaleSerializer
@@ -18,10 +36,16 @@ class ProjectViewSet(viewsets.ModelViewSet):
     API endpoints for projects.
 
     - GET    /api/projects/           -> list projects for current user's shop
+                                         (?customer=<id>, ?stuck_days=<n>)
     - POST   /api/projects/           -> create a project (from template)
     - GET    /api/projects/{id}/      -> retrieve a project
     - PATCH  /api/projects/{id}/      -> update certain fields (later)
     - POST   /api/projects/{id}/move/ -> move project to a new stage
+    - POST   /api/projects/bulk_create/ -> N identical projects from a template
+    - POST   /api/projects/bulk_move/ -> move many projects at once
+    - POST   /api/projects/bulk_work_logs/ -> import many time entries
+    - GET    /api/projects/schedule/  -> capacity-aware build plan
+    - GET    /api/projects/{id}/hours/ -> estimated vs logged hours, per stage
     - POST   /api/projects/{id}/cancel/
     - POST   /api/projects/{id}/log_sale/
     """
@@ -42,15 +66,6 @@ class ProjectViewSet(viewsets.ModelViewSet):
         qs = (
             Project.objects.filter(shop=shop)
             .select_related("template", "workflow", "current_stage", "customer")
-            .annotate(
-                total_stages=Count("workflow__stages", distinct=True),
-                current_stage_order=F("current_stage__order"),
-                cancel_stage_order=Max(
-                    "workflow__stages__order",
-                    filter=Q(workflow__stages__key__icontains="cancel")
-                    | Q(workflow__stages__name__icontains="cancel"),
-                ),
-            )
             .order_by("-created_at")
         )
 
@@ -59,8 +74,23 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if customer_id:
             qs = qs.filter(customer_id=customer_id)
 
+        # ?stuck_days=7 -> active projects sitting in their stage that long
+        stuck_days = self.request.query_params.get("stuck_days")
+        if stuck_days:
+            try:
+                cutoff = timezone.now() - timedelta(days=int(stuck_days))
+            except (TypeError, ValueError):
+                raise ValidationError({"stuck_days": "Must be an integer."})
+            qs = qs.filter(status="active", current_stage_entered_at__lte=cutoff)
+
         return qs
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # stage count / order / cancel order per workflow (workflows.metadata)
+        context.setdefault("workflow_meta", {})
+        return context
+
     def perform_create(self, serializer):
         serializer.save()
 
@@ -113,19 +143,335 @@ class ProjectViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(project)
             return Response(serializer.data)
 
-        # Update project stage
-        project.current_stage = target_stage
-        project.save(update_fields=["current_stage", "updated_at"])
+        # Update project stage + log history together
+        with transaction.atomic():
+            project.current_stage = target_stage
+            project.current_stage_entered_at = timezone.now()
+            project.save(
+                update_fields=["current_stage", "current_stage_entered_at", "updated_at"]
+            )
 
-        # Log history
-        ProjectStageHistory.objects.create(
-            project=project,
-            stage=target_stage,
-        )
+            ProjectStageHistory.objects.create(
+                project=project,
+                stage=target_stage,
+            )
 
         serializer = self.get_serializer(project)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["get"], url_path="schedule")
+    def schedule(self, request):
+        """
+        Day-by-day build plan of the active projects at the shop's daily
+        capacity, with the projects that will miss their due date.
+
+        Query params:
+            policy=edd|cr     # earliest due date (default) or critical ratio
+            days=30           # work days of bench allocations to return
+            capacity=6        # optional what-if hours/day (not cached)
+            late=1            # only projects that will be late
+        """
+        try:
+            shop: Shop = request.user.shop
+        except Shop.DoesNotExist:
+            return Response(
+                {"detail": "Current user has no shop configured."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = request.query_params
+        policy = params.get("policy", "edd")
+        if policy not in POLICIES:
+            raise ValidationError({"policy": f"Must be one of: {', '.join(POLICIES)}."})
+        try:
+            days = max(0, min(int(params.get("days", 30)), 365))
+            capacity = float(params["capacity"]) if params.get("capacity") else None
+        except (TypeError, ValueError):
+            raise ValidationError({"detail": "days and capacity must be numbers."})
+        if capacity is not None and not 0 < capacity <= 24:
+            raise ValidationError({"capacity": "Must be between 0 and 24 hours."})
+
+        plan = build_plan(shop, policy, capacity=capacity) if capacity else get_plan(shop, policy)
+
+        rows = plan.project_rows()
+        names = dict(
+            Project.objects.filter(shop=shop, status="active").values_list("id", "name")
+        )
+        for row in rows:
+            row["name"] = names.get(row["project_id"])
+        late_count = sum(1 for row in rows if row["late"])
+        if params.get("late") in ("1", "true"):
+            rows = [row for row in rows if row["late"]]
+
+        return Response(
+            {
+                "policy": plan.policy,
+                "start": plan.start,
+                "capacity_hours": plan.capacity,
+                "work_days": list(plan.work_days),
+                "late_count": late_count,
+                "projects": rows,
+                "days": plan.day_rows(days),
+            }
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk_create")
+    def bulk_create(self, request):
+        """
+        Create many identical projects from one template.
+
+        Expected payload:
+        {
+            "template": <id>,
+            "count": 40,
+            "name": "Market coaster",     # optional, defaults to template name
+            "customer": <id>,             # optional
+            "quantity": 1,                # optional, per project
+            "due_date": "2025-12-01",     # optional
+            "estimated_hours": 1.5,       # optional, else template x quantity
+            "expected_price": 20.00,      # optional, else template x quantity
+            "notes": "Holiday market"     # optional
+        }
+        """
+        try:
+            shop: Shop = request.user.shop
+        except Shop.DoesNotExist:
+            return Response(
+                {"detail": "Current user has no shop configured."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        input_serializer = BulkCreateProjectsSerializer(
+            data=request.data, context={"request": request, "shop": shop}
+        )
+        input_serializer.is_valid(raise_exception=True)
+        projects = input_serializer.save()
+
+        return Response(
+            {"count": len(projects), "ids": [project.id for project in projects]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk_move")
+    def bulk_move(self, request):
+        """
+        Move many projects to new stages in one transaction (all or nothing).
+
+        Expected payload:
+        {
+            "moves": [
+                {"project_id": <int>, "stage_id": <int>},
+                ...
+            ]
+        }
+
+        Returns the ids that moved and the ids already in their target
+        stage; any invalid move rejects the whole batch with per-move errors.
+        """
+        input_serializer = BulkMoveSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        moves = input_serializer.validated_data["moves"]
+
+        try:
+            shop: Shop = request.user.shop
+        except Shop.DoesNotExist:
+            return Response(
+                {"detail": "Current user has no shop configured."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            projects = {
+                p.id: p
+                for p in Project.objects.select_for_update()
+                .filter(shop=shop, id__in=[m["project_id"] for m in moves])
+                .only("id", "workflow_id", "current_stage_id", "status")
+            }
+            # every target stage validated in one query
+            stage_workflows = dict(
+                WorkflowStage.objects.filter(
+                    id__in={m["stage_id"] for m in moves},
+                    workflow__shop=shop,
+                ).values_list("id", "workflow_id")
+            )
+
+            errors = {}
+            to_move = []
+            unchanged = []
+            for index, move in enumerate(moves):
+                project = projects.get(move["project_id"])
+                stage_workflow = stage_workflows.get(move["stage_id"])
+                if project is None:
+                    errors[index] = "Project not found."
+                elif project.status != "active":
+                    errors[index] = "Only active projects can be moved."
+                elif stage_workflow != project.workflow_id:
+                    errors[index] = "Target stage does not exist for this workflow."
+                elif project.current_stage_id == move["stage_id"]:
+                    unchanged.append(project.id)
+                else:
+                    to_move.append((project, move["stage_id"]))
+
+            if errors:
+                return Response(
+                    {"detail": "No projects were moved.", "errors": errors},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            now = timezone.now()
+            for project, stage_id in to_move:
+                project.current_stage_id = stage_id
+                project.current_stage_entered_at = now
+                project.updated_at = now
+            Project.objects.bulk_update(
+                [project for project, _ in to_move],
+                ["current_stage", "current_stage_entered_at", "updated_at"],
+            )
+            ProjectStageHistory.objects.bulk_create(
+                [
+                    ProjectStageHistory(project_id=project.id, stage_id=stage_id)
+                    for project, stage_id in to_move
+                ]
+            )
+            if to_move:
+                # bulk_update / bulk_create send no post_save: refresh the
+                # search results (stage: filters) and build plans explicitly
+                notify_bulk_updated(shop.id, "project", [project.id for project, _ in to_move])
+                transaction.on_commit(lambda: invalidate_plans(shop.id))
+
+        return Response(
+            {
+                "moved": [
+                    {"id": project.id, "current_stage_id": stage_id}
+                    for project, stage_id in to_move
+                ],
+                "unchanged": unchanged,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk_work_logs")
+    def bulk_work_logs(self, request):
+        """
+        Import many time entries (e.g. a week from a phone timer app).
+
+        Expected payload:
+        {
+            "entries": [
+                {
+                    "project_id": <int>,
+                    "stage_id": <int | null>,    # optional
+                    "started_at": "2025-11-03T09:00:00Z",
+                    "ended_at": "2025-11-03T11:30:00Z",
+                    "notes": ""                  # optional
+                },
+                ...
+            ]
+        }
+
+        Entries naming an unknown project or a stage outside the project's
+        workflow reject the whole batch with per-entry errors. Entries that
+        duplicate or overlap an earlier entry / existing log of the same
+        project are skipped and reported; the rest are created.
+        """
+        input_serializer = BulkWorkLogSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        entries = input_serializer.validated_data["entries"]
+
+        try:
+            shop: Shop = request.user.shop
+        except Shop.DoesNotExist:
+            return Response(
+                {"detail": "Current user has no shop configured."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        project_ids = {entry["project_id"] for entry in entries}
+        with transaction.atomic():
+            # locked so a concurrent import of the same projects waits and
+            # then sees these logs when checking for overlaps
+            project_workflows = dict(
+                Project.objects.select_for_update()
+                .filter(shop=shop, id__in=project_ids)
+                .values_list("id", "workflow_id")
+            )
+            stage_workflows = dict(
+                WorkflowStage.objects.filter(
+                    id__in={entry["stage_id"] for entry in entries if entry.get("stage_id")},
+                    workflow__shop=shop,
+                ).values_list("id", "workflow_id")
+            )
+
+            errors = {}
+            for index, entry in enumerate(entries):
+                workflow_id = project_workflows.get(entry["project_id"])
+                if workflow_id is None:
+                    errors[index] = "Project not found."
+                elif (
+                    entry.get("stage_id")
+                    and stage_workflows.get(entry["stage_id"]) != workflow_id
+                ):
+                    errors[index] = "Stage does not exist for this project's workflow."
+            if errors:
+                return Response({"entries": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+            intervals = [(e["project_id"], e["started_at"], e["ended_at"]) for e in entries]
+            conflicts = find_conflicts(intervals, existing_intervals(project_ids, intervals))
+
+            created = ingest_work_logs(
+                [
+                    {
+                        "project_id": entry["project_id"],
+                        "stage_id": entry.get("stage_id"),
+                        "started_at": entry["started_at"],
+                        "ended_at": entry["ended_at"],
+                        "notes": entry.get("notes", ""),
+                    }
+                    for index, entry in enumerate(entries)
+                    if index not in conflicts
+                ]
+            )
+
+        return Response(
+            {
+                "created": len(created),
+                "skipped": [
+                    {"index": index, "conflicts_with": conflict}
+                    for index, conflict in sorted(conflicts.items())
+                ],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=["get"], url_path="hours")
+    def hours(self, request, pk=None):
+        """
+        Estimated vs logged hours, read from the WorkLog rollups
+        (Project.actual_hours, which includes manual_hours, and
+        ProjectStageHours).
+        """
+        project: Project = self.get_object()
+        stages = (
+            ProjectStageHours.objects.filter(project=project)
+            .order_by("stage__order", "stage_id")
+            .values_list("stage_id", "stage__name", "stage__order", "hours")
+        )
+        return Response(
+            {
+                "project_id": project.id,
+                "estimated_hours": project.estimated_hours,
+                "actual_hours": project.actual_hours,
+                "manual_hours": project.manual_hours,
+                "remaining_hours": remaining_hours(
+                    project.estimated_hours, project.actual_hours
+                ),
+                "stages": [
+                    {"stage_id": stage_id, "stage_name": name, "order": order, "hours": hours}
+                    for stage_id, name, order, hours in stages
+                ],
+            }
+        )
+
     @action(detail=True, methods=["post"])
     def cancel(self, request, pk=None):
         """
@@ -176,6 +522,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         project.status = "cancelled"
         project.cancel_stage = project.current_stage
         project.cancelled_at = timezone.now()
+        project.current_stage_entered_at = project.cancelled_at
         project.save(
             update_fields=[
                 "expected_price",
@@ -184,6 +531,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 "status",
                 "cancel_stage",
                 "cancelled_at",
+                "current_stage_entered_at",
                 "updated_at",
             ]
         )
@@ -240,23 +588,28 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         sold_at = data.get("sold_at") or timezone.now()
 
-        sale = Sale.objects.create(
-            shop=shop,
-            project=project,
-            template=project.template,
-            customer=project.customer,
-            channel=data.get("channel", "other"),
-            price=data["price"],
-            fees=data.get("fees"),
-            currency=shop.currency,
-            sold_at=sold_at,
-            notes=data.get("notes", ""),
-        )
+        # sale + completion land together
+        with transaction.atomic():
+            sale = Sale.objects.create(
+                shop=shop,
+                project=project,
+                template=project.template,
+                customer=project.customer,
+                channel=data.get("channel", "other"),
+                price=data["price"],
+                fees=data.get("fees"),
+                currency=shop.currency,
+                sold_at=sold_at,
+                notes=data.get("notes", ""),
+            )
 
-        # Mark project completed + stamp completion time
-        project.status = "completed"
-        project.completed_at = sold_at
-        project.save(update_fields=["status", "completed_at", "updated_at"])
+            # Mark project completed + stamp completion time
+            project.status = "completed"
+            project.completed_at = sold_at
+            project.current_stage_entered_at = sold_at
+            project.save(
+                update_fields=["status", "completed_at", "current_stage_entered_at", "updated_at"]
+            )
 
         project_serializer = self.get_serializer(project)
         sale_serializer = SaleSerializer(sale)
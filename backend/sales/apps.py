@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class SalesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sales'
+
+    def ready(self):
+        from .rollups import connect_rollup_signals
+
+        connect_rollup_signals()
@@ -0,0 +1,40 @@
+# sales/management/commands/rebuild_sales_daily.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.models import Shop
+from sales.rollups import rebuild_sales_daily
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the SalesDaily rollup from Sale: one grouped query per shop, "
+        "several shops in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", type=int, default=None, help="Only this shop id.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Shops rebuilt concurrently (default 4; always 1 on SQLite).",
+        )
+
+    def handle(self, *args, **options):
+        shop_ids = None
+        if options["shop"] is not None:
+            if not Shop.objects.filter(pk=options["shop"]).exists():
+                raise CommandError(f"Shop {options['shop']} does not exist.")
+            shop_ids = [options["shop"]]
+
+        workers = options["workers"]
+        if workers is None:
+            workers = 1 if connection.vendor == "sqlite" else 4
+        written = rebuild_sales_daily(shop_ids, workers=workers)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {len(written)} shop(s), {sum(written.values())} day rows."
+            )
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_list_page_indexes'),
+        ('products', '0004_list_page_indexes'),
+        ('projects', '0005_list_page_indexes'),
+        ('sales', '0002_sale_cost_of_goods_sale_gross_margin_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['shop', 'sold_at', 'id'], name='sales_sale_shop_id_7a6673_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_shop_scheduling_capacity'),
+        ('products', '0004_list_page_indexes'),
+        ('sales', '0003_list_page_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('channel', models.CharField(max_length=50)),
+                ('sale_count', models.IntegerField(default=0)),
+                ('price', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('fees', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('platform_fees', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('shipping_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('cost_of_goods', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_daily', to='core.shop')),
+                ('template', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales_daily', to='products.producttemplate')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('shop', 'date', 'channel', 'template'), name='sales_daily_unique_key')],
+            },
+        ),
+    ]
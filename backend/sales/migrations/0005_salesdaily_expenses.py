@@ -0,0 +1,68 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:38
+
+from decimal import Decimal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import migrations, models
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def fill_expenses(apps, schema_editor):
+    # sales.models.sale_expenses, spelled out for the historical models
+    Shop = apps.get_model("core", "Shop")
+    Sale = apps.get_model("sales", "Sale")
+    SalesDaily = apps.get_model("sales", "SalesDaily")
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    zero = Value(Decimal("0"))
+    expenses = Coalesce(
+        F("fees"),
+        Coalesce(F("platform_fees"), zero, output_field=money)
+        + Coalesce(F("shipping_cost"), zero, output_field=money),
+        output_field=money,
+    )
+
+    for shop in Shop.objects.filter(sales_daily__isnull=False).distinct():
+        try:
+            zone = ZoneInfo(shop.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            zone = ZoneInfo("UTC")
+        grouped = (
+            Sale.objects.filter(shop=shop)
+            .annotate(day=TruncDate("sold_at", tzinfo=zone))
+            .order_by()
+            .values("day", "channel", "template_id")
+            .annotate(total=Sum(expenses))
+        )
+        for row in grouped:
+            # one row per key, except duplicate NULL-template rows: put the
+            # total on the first so the day is not counted twice
+            row_id = (
+                SalesDaily.objects.filter(
+                    shop=shop,
+                    date=row["day"],
+                    channel=row["channel"],
+                    template_id=row["template_id"],
+                )
+                .order_by("id")
+                .values_list("id", flat=True)
+                .first()
+            )
+            if row_id is not None:
+                SalesDaily.objects.filter(pk=row_id).update(expenses=row["total"] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0004_salesdaily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesdaily',
+            name='expenses',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(fill_expenses, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,9 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Coalesce
+
 from core.models import Shop, Customer
 from products.models import ProductTemplate
 from projects.models import Project
@@ -98,5 +103,84 @@ class Sale(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # list pages by (-sold_at, -id)
+            models.Index(fields=["shop", "sold_at", "id"]),
+        ]
+
     def __str__(self) -> str:
         return f"Sale {self.id} – {self.price} {self.currency}"
+
+
+def sale_expenses():
+    """
+    A sale's fee expenses as an expression: the legacy `fees` total when
+    it is set, otherwise platform fees plus shipping (each null as 0).
+    Every expense total (rollups, dashboard, series) uses this one rule.
+    """
+    money = DecimalField(max_digits=12, decimal_places=2)
+    zero = Value(Decimal("0"))
+    return Coalesce(
+        F("fees"),
+        Coalesce(F("platform_fees"), zero, output_field=money)
+        + Coalesce(F("shipping_cost"), zero, output_field=money),
+        output_field=money,
+    )
+
+
+def expenses_of(fees, platform_fees, shipping_cost) -> Decimal:
+    """
+    `sale_expenses` for values already in memory.
+    """
+    if fees is not None:
+        return Decimal(str(fees))
+    return Decimal(str(platform_fees or 0)) + Decimal(str(shipping_cost or 0))
+
+
+class SalesDaily(models.Model):
+    """
+    Per-day sales totals by channel and template, the day taken in the
+    shop's timezone. Kept in step with Sale by sales.rollups; revenue
+    charts and summaries read these rows instead of every Sale.
+
+    Readers always Sum() over matching rows: the unique constraint cannot
+    stop two rows with a NULL template (NULLs are distinct), which is
+    harmless for sums and folded back together by `rebuild_sales_daily`.
+    """
+
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name="sales_daily")
+    date = models.DateField()
+    channel = models.CharField(max_length=50)
+    template = models.ForeignKey(
+        ProductTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="sales_daily",
+    )
+
+    sale_count = models.IntegerField(default=0)
+    price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    fees = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    platform_fees = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    shipping_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cost_of_goods = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # per sale `sale_expenses`, summed: the fee columns above cannot be
+    # combined after the fact without counting a sale's fees twice
+    expenses = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # its index also serves the (shop, date range) scans
+            models.UniqueConstraint(
+                fields=["shop", "date", "channel", "template"],
+                name="sales_daily_unique_key",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.shop_id} {self.date} {self.channel}: {self.sale_count} sales"
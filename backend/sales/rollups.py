@@ -0,0 +1,252 @@
+# backend/sales/rollups.py
+"""
+SalesDaily maintenance.
+
+Every Sale save / delete moves its own amounts between day rows: the old
+(day, channel, template) row loses them and the new one gains them, as
+F() increments in the same transaction. The day is the sale's sold_at in
+the shop's timezone. `manage.py rebuild_sales_daily` recomputes shops
+from one grouped query each, several shops in parallel.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from core.models import Shop
+
+from .models import Sale, SalesDaily, expenses_of, sale_expenses
+
+
+AMOUNT_FIELDS = (
+    "price",
+    "fees",
+    "platform_fees",
+    "shipping_cost",
+    "tax_amount",
+    "cost_of_goods",
+)
+# SalesDaily sums: the sale columns plus each sale's `sale_expenses`
+ROLLUP_FIELDS = AMOUNT_FIELDS + ("expenses",)
+KEY_FIELDS = ("shop_id", "sold_at", "channel", "template_id")
+
+
+def _state(instance):
+    """
+    (shop_id, sold_at, channel, template_id, amounts) as loaded/saved, read
+    through __dict__ so deferred fields cost no query; None if any is
+    missing.
+    """
+    values = instance.__dict__
+    if instance.pk is None or any(name not in values for name in KEY_FIELDS + AMOUNT_FIELDS):
+        return None
+    expenses = expenses_of(values["fees"], values["platform_fees"], values["shipping_cost"])
+    return (
+        values["shop_id"],
+        values["sold_at"],
+        values["channel"],
+        values["template_id"],
+        tuple(
+            Decimal("0") if values[name] is None else Decimal(str(values[name]))
+            for name in AMOUNT_FIELDS
+        )
+        + (expenses,),
+    )
+
+
+def apply_sales_delta(changes) -> None:
+    """
+    Apply [(state, sign)] (sign +1 adds the sale, -1 removes it).
+    """
+    changes = [(state, sign) for state, sign in changes if state is not None and state[1]]
+    if not changes:
+        return
+
+    with transaction.atomic():
+        # the shop row lock orders these increments against a rebuild of
+        # the same shop (rebuild_shop_sales_daily takes it first)
+        shops = {
+            shop.id: shop
+            for shop in Shop.objects.select_for_update()
+            .filter(pk__in={state[0] for state, _ in changes})
+            .order_by("pk")
+            .only("id", "timezone")
+        }
+
+        deltas = {}
+        for (shop_id, sold_at, channel, template_id, amounts), sign in changes:
+            shop = shops.get(shop_id)
+            if shop is None:
+                continue
+            day = timezone.localtime(sold_at, shop.zoneinfo).date()
+            key = (shop_id, day, channel, template_id)
+            count, totals = deltas.get(key, (0, (Decimal("0"),) * len(ROLLUP_FIELDS)))
+            deltas[key] = (
+                count + sign,
+                tuple(total + sign * amount for total, amount in zip(totals, amounts)),
+            )
+
+        for key, (count, amounts) in deltas.items():
+            if count or any(amounts):
+                _add_to_day(key, count, amounts)
+
+
+def _add_to_day(key, count, amounts):
+    shop_id, day, channel, template_id = key
+    rows = SalesDaily.objects.filter(shop_id=shop_id, date=day, channel=channel)
+    rows = rows.filter(template__isnull=True) if template_id is None else rows.filter(
+        template_id=template_id
+    )
+    increments = {
+        "sale_count": F("sale_count") + count,
+        **{name: F(name) + amount for name, amount in zip(ROLLUP_FIELDS, amounts)},
+    }
+
+    row_id = rows.order_by("id").values_list("id", flat=True).first()
+    if row_id is not None:
+        SalesDaily.objects.filter(pk=row_id).update(**increments)
+        if count < 0:
+            # the day's last sale for this key moved away: drop the empty row
+            SalesDaily.objects.filter(pk=row_id, sale_count__lte=0).delete()
+        return
+    if count < 0:
+        # nothing to take from: drifted, `rebuild_sales_daily` will fix it
+        return
+    try:
+        with transaction.atomic():
+            SalesDaily.objects.create(
+                shop_id=shop_id,
+                date=day,
+                channel=channel,
+                template_id=template_id,
+                sale_count=count,
+                **dict(zip(ROLLUP_FIELDS, amounts)),
+            )
+    except IntegrityError:
+        # created concurrently since the lookup above
+        rows.update(**increments)
+
+
+# ---------- signals ----------
+
+def _remember_sale(sender, instance, **kwargs):
+    instance._sales_daily_state = _state(instance)
+
+
+def _on_sale_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # loaddata: use `manage.py rebuild_sales_daily`
+        return
+    previous = None if created else getattr(instance, "_sales_daily_state", None)
+    if not created and previous is None:
+        # loaded with deferred fields: we cannot tell what changed
+        shop_id = instance.shop_id
+        transaction.on_commit(lambda: rebuild_sales_daily([shop_id]))
+        return
+    current = _state(instance)
+    if previous != current:
+        apply_sales_delta([(previous, -1), (current, 1)])
+    instance._sales_daily_state = current
+
+
+def _on_sale_deleted(sender, instance, **kwargs):
+    apply_sales_delta([(getattr(instance, "_sales_daily_state", None) or _state(instance), -1)])
+
+
+def _remember_shop_timezone(sender, instance, **kwargs):
+    instance._sales_daily_timezone = instance.__dict__.get("timezone")
+
+
+def _on_shop_saved(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, "_sales_daily_timezone", None)
+    instance._sales_daily_timezone = instance.timezone
+    if not created and not raw and previous is not None and previous != instance.timezone:
+        # every sale may now fall on a different local day
+        shop_id = instance.pk
+        transaction.on_commit(lambda: rebuild_sales_daily([shop_id]))
+
+
+def connect_rollup_signals():
+    post_init.connect(_remember_sale, sender=Sale, dispatch_uid="sales-daily-init")
+    post_save.connect(_on_sale_saved, sender=Sale, dispatch_uid="sales-daily-save")
+    post_delete.connect(_on_sale_deleted, sender=Sale, dispatch_uid="sales-daily-delete")
+    post_init.connect(_remember_shop_timezone, sender=Shop, dispatch_uid="sales-daily-shop-init")
+    post_save.connect(_on_shop_saved, sender=Shop, dispatch_uid="sales-daily-shop-save")
+
+
+# ---------- rebuild ----------
+
+def rebuild_shop_sales_daily(shop) -> int:
+    """
+    Replace a shop's SalesDaily rows from one grouped query over its sales.
+
+    The read and the rewrite run under the shop row lock, which Sale
+    signals take as well: a sale saved meanwhile is either counted by the
+    read or increments the rebuilt rows afterwards, never rows about to be
+    deleted.
+    """
+    money = DecimalField(max_digits=12, decimal_places=2)
+    with transaction.atomic():
+        Shop.objects.select_for_update().filter(pk=shop.pk).values_list("pk").first()
+        grouped = (
+            Sale.objects.filter(shop=shop)
+            .annotate(day=TruncDate("sold_at", tzinfo=shop.zoneinfo))
+            .order_by()
+            .values("day", "channel", "template_id")
+            .annotate(
+                total_count=Count("id"),
+                **{
+                    f"total_{name}": Coalesce(Sum(name), Value(Decimal("0")), output_field=money)
+                    for name in AMOUNT_FIELDS
+                },
+                total_expenses=Coalesce(
+                    Sum(sale_expenses()), Value(Decimal("0")), output_field=money
+                ),
+            )
+        )
+        rows = [
+            SalesDaily(
+                shop=shop,
+                date=row["day"],
+                channel=row["channel"],
+                template_id=row["template_id"],
+                sale_count=row["total_count"],
+                **{name: row[f"total_{name}"] for name in ROLLUP_FIELDS},
+            )
+            for row in grouped
+        ]
+        SalesDaily.objects.filter(shop=shop).delete()
+        SalesDaily.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _rebuild_one(shop_id):
+    try:
+        shop = Shop.objects.filter(pk=shop_id).first()
+        return shop_id, (rebuild_shop_sales_daily(shop) if shop else 0)
+    finally:
+        # worker threads own their connections
+        connections.close_all()
+
+
+def rebuild_sales_daily(shop_ids=None, workers=1) -> dict:
+    """
+    Rebuild the given shops (all by default), `workers` shops at a time.
+    Returns {shop_id: rows written}.
+    """
+    if shop_ids is None:
+        shop_ids = list(Shop.objects.order_by("id").values_list("id", flat=True))
+    # SQLite allows one writer at a time: parallel rebuilds only fail with
+    # "database is locked"
+    if workers <= 1 or len(shop_ids) <= 1 or connection.vendor == "sqlite":
+        return {
+            shop.id: rebuild_shop_sales_daily(shop)
+            for shop in Shop.objects.filter(pk__in=shop_ids).order_by("id")
+        }
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(_rebuild_one, shop_ids))
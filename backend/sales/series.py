@@ -0,0 +1,163 @@
+# sales/series.py
+"""
+Time-bucketed insight series (GET /api/insights/series/).
+
+Rows are bucketed in SQL: Trunc* of the timestamp in the shop's timezone
+(day, ISO week starting Monday, month or quarter), grouped and summed in
+one query per source table. Metrics that read the same table share that
+query, so revenue vs expenses is a single GROUP BY. Buckets without rows
+are filled in afterwards so every metric lines up on the same periods.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable
+
+from django.db.models import Count, DateField, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncQuarter, TruncWeek
+
+from projects.models import Project
+
+from .models import Sale, sale_expenses
+
+
+MONEY = Decimal("0.01")
+MAX_BUCKETS = 1000
+
+TRUNCS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+    "quarter": TruncQuarter,
+}
+# buckets shown when ?from= is omitted
+DEFAULT_BUCKETS = {"day": 30, "week": 12, "month": 12, "quarter": 8}
+
+
+def _money_sum(*fields):
+    money = DecimalField(max_digits=14, decimal_places=2)
+    total = None
+    for name in fields:
+        # nullable columns count as 0 rather than nulling the whole row
+        value = Coalesce(F(name), Value(Decimal("0")), output_field=money)
+        total = value if total is None else total + value
+    return Sum(total, output_field=money)
+
+
+@dataclass(frozen=True)
+class Metric:
+    model: type
+    timestamp: str
+    aggregate: Callable
+    money: bool = True
+
+
+METRICS = {
+    "revenue": Metric(Sale, "sold_at", lambda: _money_sum("price")),
+    "expenses": Metric(
+        Sale,
+        "sold_at",
+        lambda: Sum(sale_expenses(), output_field=DecimalField(max_digits=14, decimal_places=2)),
+    ),
+    "cost_of_goods": Metric(Sale, "sold_at", lambda: _money_sum("cost_of_goods")),
+    "orders": Metric(Sale, "sold_at", lambda: Count("id"), money=False),
+    "projects": Metric(Project, "created_at", lambda: Count("id"), money=False),
+    "project_value": Metric(Project, "created_at", lambda: _money_sum("expected_price")),
+}
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "quarter":
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day
+
+
+def step(start: date, bucket: str, count: int = 1) -> date:
+    """
+    The bucket `count` buckets after (or before, if negative) `start`.
+    """
+    if bucket == "day":
+        return start + timedelta(days=count)
+    if bucket == "week":
+        return start + timedelta(weeks=count)
+    months = count * (3 if bucket == "quarter" else 1)
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def bucket_range(first: date, last: date, bucket: str) -> list:
+    """
+    Every bucket start from the one holding `first` to the one holding `last`.
+    """
+    starts = []
+    current = bucket_start(first, bucket)
+    while current <= last:
+        starts.append(current)
+        current = step(current, bucket)
+    return starts
+
+
+def bucket_count(first: date, last: date, bucket: str) -> int:
+    first, last = bucket_start(first, bucket), bucket_start(last, bucket)
+    if bucket == "day":
+        return (last - first).days + 1
+    if bucket == "week":
+        return (last - first).days // 7 + 1
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return months // (3 if bucket == "quarter" else 1) + 1
+
+
+def default_from(to: date, bucket: str) -> date:
+    return step(bucket_start(to, bucket), bucket, 1 - DEFAULT_BUCKETS[bucket])
+
+
+def series(shop, metrics, bucket, first, last) -> list:
+    """
+    [{"period": date, <metric>: value, ...}] for every bucket between
+    `first` and `last` (local dates), empty buckets included.
+    """
+    zone = shop.zoneinfo
+    periods = bucket_range(first, last, bucket)
+    start_at = datetime.combine(periods[0], time.min, tzinfo=zone)
+    end_at = datetime.combine(step(periods[-1], bucket), time.min, tzinfo=zone)
+
+    sources = {}
+    for name in metrics:
+        metric = METRICS[name]
+        sources.setdefault((metric.model, metric.timestamp), []).append(name)
+
+    values = {}
+    for (model, timestamp), names in sources.items():
+        period = TRUNCS[bucket](timestamp, tzinfo=zone, output_field=DateField())
+        rows = (
+            model.objects.filter(
+                shop=shop,
+                **{f"{timestamp}__gte": start_at, f"{timestamp}__lt": end_at},
+            )
+            .annotate(period=period)
+            .order_by()
+            .values("period")
+            .annotate(**{name: METRICS[name].aggregate() for name in names})
+        )
+        for row in rows:
+            bucket_values = values.setdefault(row["period"], {})
+            for name in names:
+                bucket_values[name] = row[name]
+
+    results = []
+    for period in periods:
+        row = {"period": period}
+        found = values.get(period, {})
+        for name in metrics:
+            value = found.get(name)
+            if METRICS[name].money:
+                row[name] = str(Decimal(value or 0).quantize(MONEY))
+            else:
+                row[name] = value or 0
+        results.append(row)
+    return results
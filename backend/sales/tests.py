@@ -1,3 +1,133 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Shop
+from projects.models import Project
+from sales.models import Sale
+from workflows.models import WorkflowDefinition, WorkflowStage
+
+
+class InsightsSummaryViewTests(APITestCase):
+    url = "/api/sales/insights/summary/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="maker", password="pw")
+        cls.shop = Shop.objects.create(owner=cls.user, name="Maker Shop")
+        workflow = WorkflowDefinition.objects.create(shop=cls.shop, name="Build")
+        stage = WorkflowStage.objects.create(workflow=workflow, name="Cut", order=1, key="cut")
+
+        def project(status, expected_price):
+            return Project.objects.create(
+                shop=cls.shop,
+                workflow=workflow,
+                current_stage=stage,
+                name=f"{status} project",
+                status=status,
+                expected_price=expected_price,
+            )
+
+        project("active", Decimal("50.00"))
+        project("active", Decimal("10.00"))
+        sold = project("completed", Decimal("80.00"))
+        project("cancelled", Decimal("120.00"))
+        project("cancelled", Decimal("30.00"))
+
+        now = timezone.now()
+        Sale.objects.create(
+            shop=cls.shop,
+            project=sold,
+            price=Decimal("100.00"),
+            fees=Decimal("6.50"),
+            cost_of_goods=Decimal("40.00"),
+            platform_fees=Decimal("4.00"),
+            shipping_cost=Decimal("8.00"),
+            tax_amount=Decimal("7.25"),
+            sold_at=now,
+        )
+        # older row without the cost breakdown
+        Sale.objects.create(shop=cls.shop, price=Decimal("60.00"), sold_at=now - timedelta(days=400))
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_summary_totals(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        # amounts are decimal strings; compare by value, not formatting
+        self.assertEqual(Decimal(data["total_revenue"]), Decimal("160.00"))
+        self.assertEqual(Decimal(data["total_fees"]), Decimal("6.50"))
+        self.assertEqual(Decimal(data["net_revenue"]), Decimal("153.50"))
+        self.assertEqual(Decimal(data["lost_revenue"]), Decimal("150.00"))
+        self.assertEqual(data["project_counts"], {"active": 2, "completed": 1, "cancelled": 2})
+        self.assertEqual(
+            {key: Decimal(value) for key, value in data["costs_and_margins"].items()},
+            {
+                "total_cost_of_goods": Decimal("40.00"),
+                # no stored margins: price - cost_of_goods
+                "total_gross_margin": Decimal("120.00"),
+                "total_platform_fees": Decimal("4.00"),
+                "total_shipping_cost": Decimal("8.00"),
+                "total_tax_amount": Decimal("7.25"),
+            },
+        )
+
+    def test_summary_query_count(self):
+        # fresh user, as per request: shop lookup + one aggregate over
+        # sales + one over projects
+        self.client.force_authenticate(get_user_model().objects.get(pk=self.user.pk))
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_empty_shop(self):
+        user = get_user_model().objects.create_user(username="new", password="pw")
+        Shop.objects.create(owner=user, name="Empty")
+        self.client.force_authenticate(user)
+
+        data = self.client.get(self.url).json()
+
+        self.assertEqual(Decimal(data["total_revenue"]), 0)
+        self.assertEqual(Decimal(data["lost_revenue"]), 0)
+        self.assertEqual(data["project_counts"], {"active": 0, "completed": 0, "cancelled": 0})
+
+
+class InsightsSeriesViewTests(APITestCase):
+    url = "/api/insights/series/"
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop", timezone="UTC")
+        self.client.force_authenticate(self.user)
+
+    def test_expenses_count_each_sale_once(self):
+        sold_at = timezone.now()
+        # legacy total plus the breakdown: the total wins
+        Sale.objects.create(
+            shop=self.shop,
+            price=Decimal("100.00"),
+            fees=Decimal("10.00"),
+            platform_fees=Decimal("4.00"),
+            shipping_cost=Decimal("2.00"),
+            sold_at=sold_at,
+        )
+        # breakdown only, shipping unknown
+        Sale.objects.create(
+            shop=self.shop, price=Decimal("50.00"), platform_fees=Decimal("3.00"), sold_at=sold_at
+        )
+
+        response = self.client.get(
+            self.url, {"metric": "revenue,expenses", "bucket": "day", "from": sold_at.date()}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [{"period": sold_at.date().isoformat(), "revenue": "150.00", "expenses": "13.00"}],
+        )
@@ -1,6 +1,9 @@
 from django.db import models
+from datetime import date, timedelta
 from decimal import Decimal
 
+from django.utils import timezone
+
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
@@ -8,6 +11,7 @@ from rest_framework.response import Response
 
 from core.models import Shop
 from sales.models import Sale
+from sales import series
 from sales.serializers import SaleSerializer
 from projects.models import Project
 
@@ -22,6 +26,7 @@ class SaleViewSet(viewsets.ReadOnlyModelViewSet):
 
     permission_classes = [IsAuthenticated]
     serializer_class = SaleSerializer
+    cursor_ordering = ("-sold_at", "-id")
 
     def get_queryset(self):
         user = self.request.user
@@ -66,54 +71,40 @@ class InsightsSummaryView(APIView):
                 status=400,
             )
 
-        sales_qs = Sale.objects.filter(shop=shop)
-
-        # Revenue & fee aggregates
-        total_revenue = (
-            sales_qs.aggregate(total=models.Sum("price"))["total"]
-            or Decimal("0.00")
-        )
-        total_fees = (
-            sales_qs.aggregate(total=models.Sum("fees"))["total"]
-            or Decimal("0.00")
+        zero = Decimal("0.00")
+
+        # One pass over the shop's sales for every revenue / cost total
+        sales = Sale.objects.filter(shop=shop).aggregate(
+            total_revenue=models.Sum("price"),
+            total_fees=models.Sum("fees"),
+            # cost & margin aggregates (can be null for older rows)
+            total_cost_of_goods=models.Sum("cost_of_goods"),
+            total_gross_margin=models.Sum("gross_margin"),
+            total_platform_fees=models.Sum("platform_fees"),
+            total_shipping_cost=models.Sum("shipping_cost"),
+            total_tax_amount=models.Sum("tax_amount"),
         )
+        total_revenue = sales["total_revenue"] or zero
+        total_fees = sales["total_fees"] or zero
         net_revenue = total_revenue - total_fees
-
-        # NEW: cost & margin aggregates (can be null for older rows)
-        total_cost_of_goods = (
-            sales_qs.aggregate(total=models.Sum("cost_of_goods"))["total"]
-            or Decimal("0.00")
-        )
-        total_gross_margin = (
-            sales_qs.aggregate(total=models.Sum("gross_margin"))["total"]
-            or (total_revenue - total_cost_of_goods)
-        )
-
-        total_platform_fees = (
-            sales_qs.aggregate(total=models.Sum("platform_fees"))["total"]
-            or Decimal("0.00")
-        )
-        total_shipping_cost = (
-            sales_qs.aggregate(total=models.Sum("shipping_cost"))["total"]
-            or Decimal("0.00")
-        )
-        total_tax_amount = (
-            sales_qs.aggregate(total=models.Sum("tax_amount"))["total"]
-            or Decimal("0.00")
-        )
-
-        # Projects stats
-        projects_qs = Project.objects.filter(shop=shop)
-        completed_projects = projects_qs.filter(status="completed").count()
-        cancelled_projects = projects_qs.filter(status="cancelled").count()
-        active_projects = projects_qs.filter(status="active").count()
-
-        # Lost revenue = expected_price sum for cancelled projects
-        lost_revenue = (
-            projects_qs.filter(status="cancelled")
-            .aggregate(total=models.Sum("expected_price"))["total"]
-            or Decimal("0.00")
+        total_cost_of_goods = sales["total_cost_of_goods"] or zero
+        total_gross_margin = sales["total_gross_margin"] or (total_revenue - total_cost_of_goods)
+        total_platform_fees = sales["total_platform_fees"] or zero
+        total_shipping_cost = sales["total_shipping_cost"] or zero
+        total_tax_amount = sales["total_tax_amount"] or zero
+
+        # ... and one over its projects for the status counts
+        projects = Project.objects.filter(shop=shop).aggregate(
+            active=models.Count("id", filter=models.Q(status="active")),
+            completed=models.Count("id", filter=models.Q(status="completed")),
+            cancelled=models.Count("id", filter=models.Q(status="cancelled")),
+            # Lost revenue = expected_price sum for cancelled projects
+            lost_revenue=models.Sum("expected_price", filter=models.Q(status="cancelled")),
         )
+        active_projects = projects["active"]
+        completed_projects = projects["completed"]
+        cancelled_projects = projects["cancelled"]
+        lost_revenue = projects["lost_revenue"] or zero
 
         data = {
             "currency": shop.currency,
@@ -136,3 +127,86 @@ class InsightsSummaryView(APIView):
             },
         }
         return Response(data)
+
+
+class InsightsSeriesView(APIView):
+    """
+    Time-bucketed metrics for the current user's shop, bucketed in the
+    shop's timezone, one row per period (empty periods included).
+
+    GET /api/insights/series/?metric=revenue,expenses&bucket=month&from=2025-01-01&to=2025-12-31
+
+    - metric: one or more of revenue, expenses, cost_of_goods, orders,
+      projects, project_value (comma separated or repeated)
+    - bucket: day | week | month | quarter (default month)
+    - from / to: local dates, widened to whole buckets; `to` defaults to
+      today and `from` to a bucket-dependent span before it
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        try:
+            shop: Shop = user.shop
+        except Shop.DoesNotExist:
+            return Response(
+                {"detail": "Current user has no shop configured."},
+                status=400,
+            )
+
+        params = request.query_params
+        metrics = [
+            name.strip()
+            for value in params.getlist("metric") or ["revenue"]
+            for name in value.split(",")
+            if name.strip()
+        ]
+        unknown = [name for name in metrics if name not in series.METRICS]
+        if unknown or not metrics:
+            return Response(
+                {"metric": f"Choose from: {', '.join(series.METRICS)}."},
+                status=400,
+            )
+        metrics = list(dict.fromkeys(metrics))
+
+        bucket = params.get("bucket", "month")
+        if bucket not in series.TRUNCS:
+            return Response(
+                {"bucket": f"Choose from: {', '.join(series.TRUNCS)}."},
+                status=400,
+            )
+
+        try:
+            last = (
+                date.fromisoformat(params["to"])
+                if params.get("to")
+                else timezone.localtime(timezone.now(), shop.zoneinfo).date()
+            )
+            first = (
+                date.fromisoformat(params["from"])
+                if params.get("from")
+                else series.default_from(last, bucket)
+            )
+        except ValueError:
+            return Response({"detail": "from / to must be YYYY-MM-DD dates."}, status=400)
+        if first > last:
+            return Response({"detail": "from must not be after to."}, status=400)
+
+        if series.bucket_count(first, last, bucket) > series.MAX_BUCKETS:
+            return Response(
+                {"detail": f"At most {series.MAX_BUCKETS} buckets per request."},
+                status=400,
+            )
+
+        results = series.series(shop, metrics, bucket, first, last)
+        return Response(
+            {
+                "bucket": bucket,
+                "timezone": shop.timezone,
+                "metrics": metrics,
+                "from": results[0]["period"],
+                "to": series.step(results[-1]["period"], bucket) - timedelta(days=1),
+                "results": results,
+            }
+        )
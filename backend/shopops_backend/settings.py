@@ -76,6 +76,8 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # keyset pages when the client asks for them (?page_size= / ?cursor=)
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.OptInCursorPagination",
 }
 
 from datetime import timedelta
@@ -171,4 +173,42 @@ STATICFILES_DIRS = []
 
 # Media files
 MEDIA_URL = "/media/"
-MEDIA_ROOT = BASE_DIR / "media"
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / "media"
+# Global search (/api/search/)
+# "auto" picks SQLite FTS5 or Postgres tsvector based on the DB vendor;
+# can be forced to "fts5", "postgres" or "basic" (plain ORM icontains).
+SHOPOPS_SEARCH_ENGINE = os.environ.get("SHOPOPS_SEARCH_ENGINE", "auto")
+
+# Caches
+# Search results, workflow metadata, build plans and the dashboard are
+# cached and invalidated by deleting keys / bumping versions on writes.
+# That only reaches every worker when the backend is shared: locmem is
+# per process, so it is correct for runserver or a single worker only.
+# With several workers (gunicorn etc.) set SHOPOPS_REDIS_URL (needs the
+# `redis` package) or SHOPOPS_CACHE=db (run `manage.py createcachetable`).
+if os.environ.get("SHOPOPS_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["SHOPOPS_REDIS_URL"],
+        },
+    }
+elif os.environ.get("SHOPOPS_CACHE") == "db":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "shopops_cache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "shopops-default",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        },
+    }
+
+SHOPOPS_SEARCH_CACHE = "default"
+SHOPOPS_SEARCH_CACHE_TIMEOUT = 300  # seconds
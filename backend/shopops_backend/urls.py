@@ -5,7 +5,9 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
-from core.views import MeView, ShopView, GlobalSearchView
+from core.views import DashboardSummaryView, MeView, ShopView, GlobalSearchView, SearchSuggestView
+from sales.views import InsightsSeriesView
+from workflows.views import ForecastView, StageFlowView, StageInsightsView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -15,6 +17,12 @@ urlpatterns = [
     path("api/auth/me/", MeView.as_view(), name="auth-me"),
     path("api/shop/", ShopView.as_view(), name="shop-detail"),
     path("api/search/", GlobalSearchView.as_view(), name="global-search"),
+    path("api/search/suggest/", SearchSuggestView.as_view(), name="search-suggest"),
+    path("api/insights/stages/", StageInsightsView.as_view(), name="insights-stages"),
+    path("api/insights/flow/", StageFlowView.as_view(), name="insights-flow"),
+    path("api/dashboard/summary/", DashboardSummaryView.as_view(), name="dashboard-summary"),
+    path("api/insights/forecast/", ForecastView.as_view(), name="insights-forecast"),
+    path("api/insights/series/", InsightsSeriesView.as_view(), name="insights-series"),
 
     path("api/core/", include("core.urls")),
     path("api/workflows/", include("workflows.urls")),
@@ -0,0 +1,142 @@
+# backend/workflows/analytics.py
+"""
+Stage-duration analytics over ProjectStageHistory.
+
+A stage visit lasts from its history row's entered_at until the project's
+next history row. The next row is found with a LEAD() window in SQL, so
+the whole shop is one ordered scan streamed as plain tuples (no model
+instances); each visit's dwell time is folded into compact per-stage and
+per-(template, stage) float arrays and summarized at the end.
+
+A project's latest visit has no exit yet and is left out of dwell times.
+"""
+
+from array import array
+from datetime import timedelta
+
+from django.db.models import F, Window
+from django.db.models.functions import Lead
+from django.utils import timezone
+
+from products.models import ProductTemplate
+
+from .models import ProjectStageHistory, WorkflowStage
+
+
+STREAM_CHUNK_SIZE = 5000
+
+
+def percentile(sorted_values, pct):
+    """
+    Linear-interpolated percentile (0..100) of an already sorted sequence.
+    """
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def summarize(hours, days):
+    """
+    Dwell summary for one group of completed visits (hours per visit).
+    """
+    values = sorted(hours)
+    exits = len(values)
+    return {
+        "exits": exits,
+        "median_hours": _round(percentile(values, 50)),
+        "p90_hours": _round(percentile(values, 90)),
+        "mean_hours": _round(sum(values) / exits) if exits else None,
+        "throughput_per_week": round(exits / (days / 7.0), 2) if days else None,
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def stage_visits(shop, since=None):
+    """
+    Stream (stage_id, template_id, entered_at, exited_at) for every stage
+    visit of the shop's projects, ordered per project; exited_at is None
+    for the visit a project is currently in.
+    """
+    qs = ProjectStageHistory.objects.filter(project__shop=shop)
+    if since is not None:
+        qs = qs.filter(entered_at__gte=since)
+
+    return (
+        qs.annotate(
+            exited_at=Window(
+                Lead("entered_at"),
+                partition_by=F("project_id"),
+                order_by=[F("entered_at").asc(), F("id").asc()],
+            )
+        )
+        .order_by()
+        .values_list("stage_id", "project__template_id", "entered_at", "exited_at")
+        .iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+
+
+def stage_durations(shop, days=90):
+    """
+    Median / p90 / mean dwell and throughput (exits per week) per stage and
+    per template + stage, over visits that started in the last `days` days.
+    """
+    since = timezone.now() - timedelta(days=days)
+
+    by_stage = {}
+    by_template = {}
+    for stage_id, template_id, entered_at, exited_at in stage_visits(shop, since):
+        if exited_at is None:
+            continue
+        hours = (exited_at - entered_at).total_seconds() / 3600.0
+        by_stage.setdefault(stage_id, array("d")).append(hours)
+        by_template.setdefault((template_id, stage_id), array("d")).append(hours)
+
+    stages = {
+        s.id: s
+        for s in WorkflowStage.objects.filter(workflow__shop=shop).select_related("workflow")
+    }
+    template_names = dict(
+        ProductTemplate.objects.filter(
+            id__in={template_id for template_id, _ in by_template if template_id}
+        ).values_list("id", "name")
+    )
+
+    def stage_row(stage_id, hours):
+        stage = stages.get(stage_id)
+        return {
+            "stage_id": stage_id,
+            "stage_name": stage.name if stage else None,
+            "workflow_id": stage.workflow_id if stage else None,
+            "order": stage.order if stage else None,
+            **summarize(hours, days),
+        }
+
+    def sort_key(row):
+        return (row["workflow_id"] or 0, row["order"] or 0, row["stage_id"])
+
+    templates = {}
+    for (template_id, stage_id), hours in by_template.items():
+        templates.setdefault(template_id, []).append(stage_row(stage_id, hours))
+
+    return {
+        "days": days,
+        "since": since,
+        "stages": sorted(
+            (stage_row(stage_id, hours) for stage_id, hours in by_stage.items()),
+            key=sort_key,
+        ),
+        "templates": [
+            {
+                "template_id": template_id,
+                "template_name": template_names.get(template_id),
+                "stages": sorted(rows, key=sort_key),
+            }
+            for template_id, rows in sorted(templates.items(), key=lambda kv: kv[0] or 0)
+        ],
+    }
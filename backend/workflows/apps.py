@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class WorkflowsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'workflows'
+
+    def ready(self):
+        from .flow import connect_flow_signals
+        from .metadata import connect_metadata_signals
+
+        connect_metadata_signals()
+        connect_flow_signals()
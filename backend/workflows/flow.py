@@ -0,0 +1,290 @@
+# backend/workflows/flow.py
+"""
+Daily cumulative-flow snapshots (workflows.StageFlowSnapshot).
+
+Each closed day (shop timezone) gets one row per stage:
+
+    wip_count(day) = wip_count(day - 1) + entered(day) - exited(day)
+
+so a run only reads that day range's events and continues from the last
+stored day instead of replaying all history. Events:
+
+- entered: a ProjectStageHistory row for the stage
+- exited:  the project's next history row (it moved on), or the project
+           being completed / cancelled while in the stage
+
+An event saved, moved or deleted after its day was snapshotted (a sale
+recorded with a past sold_at, an edited history row) drops the shop's
+snapshots from that day on and recomputes them once the write commits
+(connected in WorkflowsConfig.ready()). Queryset updates bypass the
+signals: run `manage.py snapshot_stage_flow --rebuild` after those.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef, Q, Subquery
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from core.models import Shop
+from projects.models import Project
+
+from .models import ProjectStageHistory, StageFlowSnapshot, WorkflowStage
+
+
+def _day_start(day, zone):
+    return datetime.combine(day, time.min, tzinfo=zone)
+
+
+def _daterange(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def day_events(shop, start, end, zone):
+    """
+    {(stage_id, date): [entered, exited]} for days start..end (inclusive).
+    """
+    start_dt, end_dt = _day_start(start, zone), _day_start(end + timedelta(days=1), zone)
+    events = {}
+
+    def bump(stage_id, when, column):
+        key = (stage_id, timezone.localtime(when, zone).date())
+        events.setdefault(key, [0, 0])[column] += 1
+
+    previous_stage = (
+        ProjectStageHistory.objects.filter(
+            project=OuterRef("project"), entered_at__lt=OuterRef("entered_at")
+        )
+        .order_by("-entered_at", "-id")
+        .values("stage_id")[:1]
+    )
+    moves = (
+        ProjectStageHistory.objects.filter(
+            project__shop=shop, entered_at__gte=start_dt, entered_at__lt=end_dt
+        )
+        .annotate(previous_stage_id=Subquery(previous_stage))
+        .order_by()
+        .values_list("stage_id", "previous_stage_id", "entered_at")
+        .iterator(chunk_size=5000)
+    )
+    for stage_id, previous_stage_id, entered_at in moves:
+        bump(stage_id, entered_at, 0)
+        if previous_stage_id is not None:
+            bump(previous_stage_id, entered_at, 1)
+
+    # closing a project takes it out of its stage; only projects that ever
+    # entered one (have history) can leave it
+    closures = (
+        Project.objects.filter(shop=shop)
+        .filter(
+            Q(status="completed", completed_at__gte=start_dt, completed_at__lt=end_dt)
+            | Q(status="cancelled", cancelled_at__gte=start_dt, cancelled_at__lt=end_dt)
+        )
+        .filter(Exists(ProjectStageHistory.objects.filter(project=OuterRef("pk"))))
+        .values_list("current_stage_id", "status", "completed_at", "cancelled_at")
+    )
+    for stage_id, status, completed_at, cancelled_at in closures:
+        bump(stage_id, completed_at if status == "completed" else cancelled_at, 1)
+
+    return events
+
+
+def snapshot_shop(shop, through=None, rebuild=False):
+    """
+    Write snapshots for every closed day not yet recorded (all of them with
+    `rebuild`). Returns the number of days written.
+    """
+    zone = shop.zoneinfo
+    through = through or (timezone.localtime(timezone.now(), zone).date() - timedelta(days=1))
+    snapshots = StageFlowSnapshot.objects.filter(shop=shop)
+
+    with transaction.atomic():
+        if rebuild:
+            snapshots.delete()
+
+        last_day = snapshots.aggregate(last=Max("date"))["last"]
+        if last_day is None:
+            first_entry = ProjectStageHistory.objects.filter(project__shop=shop).aggregate(
+                first=Min("entered_at")
+            )["first"]
+            if first_entry is None:
+                return 0
+            start = timezone.localtime(first_entry, zone).date()
+            wip = {}
+        else:
+            start = last_day + timedelta(days=1)
+            wip = dict(snapshots.filter(date=last_day).values_list("stage_id", "wip_count"))
+
+        if start > through:
+            return 0
+
+        stages = list(
+            WorkflowStage.objects.filter(workflow__shop=shop).values_list("id", "workflow_id")
+        )
+        events = day_events(shop, start, through, zone)
+
+        rows = []
+        days = 0
+        for day in _daterange(start, through):
+            for stage_id, workflow_id in stages:
+                entered, exited = events.get((stage_id, day), (0, 0))
+                wip[stage_id] = max(wip.get(stage_id, 0) + entered - exited, 0)
+                rows.append(
+                    StageFlowSnapshot(
+                        shop=shop,
+                        workflow_id=workflow_id,
+                        stage_id=stage_id,
+                        date=day,
+                        wip_count=wip[stage_id],
+                        entered=entered,
+                        exited=exited,
+                    )
+                )
+            days += 1
+            if len(rows) >= 5000:
+                _write(rows)
+                rows = []
+        _write(rows)
+
+    return days
+
+
+def _write(rows):
+    StageFlowSnapshot.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["stage", "date"],
+        update_fields=["wip_count", "entered", "exited"],
+    )
+
+
+def cumulative_flow(shop, workflow_id, since):
+    """
+    Cumulative-flow series for one workflow from the snapshot table:
+    one indexed (shop, workflow, date) range query.
+    """
+    rows = (
+        StageFlowSnapshot.objects.filter(shop=shop, workflow_id=workflow_id, date__gte=since)
+        .order_by("date", "stage__order")
+        .values_list(
+            "date", "stage_id", "stage__name", "stage__order", "wip_count", "entered", "exited"
+        )
+    )
+
+    stages = {}
+    days = {}
+    arrivals = {}
+    for day, stage_id, name, order, wip_count, entered, exited in rows:
+        stages.setdefault(stage_id, {"id": stage_id, "name": name, "order": order})
+        arrivals[stage_id] = arrivals.get(stage_id, 0) + entered
+        point = days.setdefault(
+            day, {"date": day, "wip": {}, "entered": {}, "exited": {}, "cumulative_entered": {}}
+        )
+        point["wip"][stage_id] = wip_count
+        point["entered"][stage_id] = entered
+        point["exited"][stage_id] = exited
+        point["cumulative_entered"][stage_id] = arrivals[stage_id]
+
+    return {
+        "workflow_id": workflow_id,
+        "since": since,
+        "stages": sorted(stages.values(), key=lambda s: (s["order"], s["id"])),
+        "days": list(days.values()),
+    }
+
+
+def invalidate_snapshots(shop, when):
+    """
+    Drop `shop`'s snapshots from the day of `when` on if that day is
+    already closed, and recompute them once the transaction commits.
+    Returns the first dropped day, or None.
+    """
+    zone = shop.zoneinfo
+    day = timezone.localtime(when, zone).date()
+    if day >= timezone.localtime(timezone.now(), zone).date():
+        # today is never snapshotted: the nightly run will see it
+        return None
+    deleted, _ = StageFlowSnapshot.objects.filter(shop=shop, date__gte=day).delete()
+    if not deleted:
+        return None
+    transaction.on_commit(lambda: snapshot_shop(shop))
+    return day
+
+
+def _closure(instance):
+    # (stage_id, when) of the closing event day_events counts; read
+    # through __dict__: a deferred field would cost a query
+    values = instance.__dict__
+    status = values.get("status")
+    if status not in ("completed", "cancelled"):
+        return None
+    when = values.get("completed_at" if status == "completed" else "cancelled_at")
+    if when is None:
+        return None
+    return values.get("current_stage_id"), when
+
+
+def _remember_closure(sender, instance, **kwargs):
+    instance._flow_closure = _closure(instance) if instance.pk is not None else None
+
+
+def _on_project_saved(sender, instance, created, raw=False, **kwargs):
+    current = _closure(instance)
+    previous = None if created else getattr(instance, "_flow_closure", None)
+    instance._flow_closure = current
+    if raw or current == previous:
+        return
+    whens = [closure[1] for closure in (previous, current) if closure is not None]
+    invalidate_snapshots(instance.shop, min(whens))
+
+
+def _entered(instance):
+    return instance.__dict__.get("entered_at")
+
+
+def _remember_entry(sender, instance, **kwargs):
+    instance._flow_entered_at = _entered(instance) if instance.pk is not None else None
+
+
+def _invalidate_for_entry(project_id, when):
+    shop = Shop.objects.filter(projects=project_id).first()
+    if shop is not None:
+        invalidate_snapshots(shop, when)
+
+
+def _on_history_saved(sender, instance, created, raw=False, **kwargs):
+    # new rows are stamped now (auto_now_add): only edits can backdate
+    previous = getattr(instance, "_flow_entered_at", None)
+    current = _entered(instance)
+    instance._flow_entered_at = current
+    if raw or created or previous is None or current is None or current == previous:
+        return
+    _invalidate_for_entry(instance.project_id, min(previous, current))
+
+
+def _on_history_deleted(sender, instance, **kwargs):
+    whens = [
+        when
+        for when in (getattr(instance, "_flow_entered_at", None), _entered(instance))
+        if when is not None
+    ]
+    if whens:
+        _invalidate_for_entry(instance.project_id, min(whens))
+
+
+def connect_flow_signals():
+    post_init.connect(_remember_closure, sender=Project, dispatch_uid="stage-flow-project-init")
+    post_save.connect(_on_project_saved, sender=Project, dispatch_uid="stage-flow-project-save")
+    post_init.connect(
+        _remember_entry, sender=ProjectStageHistory, dispatch_uid="stage-flow-history-init"
+    )
+    post_save.connect(
+        _on_history_saved, sender=ProjectStageHistory, dispatch_uid="stage-flow-history-save"
+    )
+    post_delete.connect(
+        _on_history_deleted, sender=ProjectStageHistory, dispatch_uid="stage-flow-history-delete"
+    )
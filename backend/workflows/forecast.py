@@ -0,0 +1,314 @@
+# backend/workflows/forecast.py
+"""
+Monte Carlo completion-date forecasts for a shop's active projects.
+
+Each project's remaining time is simulated SIMULATIONS times by drawing
+historical dwell times (ProjectStageHistory visits, see analytics) for
+every stage still ahead of it, up to the workflow's final stage:
+
+- stages ahead: per template + stage samples when there are enough of
+  them, else the stage's samples across templates
+- current stage: only samples longer than the time already spent there,
+  minus that time (a project 3 days into a stage is not done yesterday);
+  past every recorded visit, another typical (median) visit
+- no samples at all: the project's estimated hours spread over the
+  workflow's working stages. Those are bench hours, so they are turned
+  into calendar time at the shop's capacity (daily_capacity_hours on each
+  of its work_days) to match the dwell samples. Without an estimate the
+  forecast is unknown (None) instead of treating the stage as instant
+
+All draws for one sample pool are made as a single (projects x runs)
+NumPy array, so a shop is a handful of vectorized draws rather than a
+Python loop per run. p50 / p85 of each project's total give the forecast
+dates; a project is `likely_late` when its p85 lands after the end of its
+due date (shop timezone). Projects already in the final stage report the
+time they reached it.
+
+Results are cached per shop under a fingerprint of its projects and stage
+history, so any move, edit or new history row (bulk paths included)
+yields a fresh forecast. Each run is also kept as the shop's latest
+forecasts, which cheap request paths (the Kanban board) read without
+touching the database; `manage.py refresh_forecasts` keeps them current.
+"""
+
+import hashlib
+from array import array
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from projects.models import Project
+
+from .analytics import stage_visits
+from .metadata import get_workflow_meta_many
+
+
+CACHE_VERSION = 3
+# forecasts move with the clock too, so even an unchanged shop is re-run
+CACHE_TIMEOUT = 60 * 15
+# latest forecasts outlive a few refresh intervals, then the board goes without
+LATEST_TIMEOUT = 60 * 60
+
+SIMULATIONS = 2000
+HISTORY_DAYS = 365
+# fewer template-specific visits than this falls back to the whole stage
+MIN_TEMPLATE_SAMPLES = 5
+
+
+def _cache():
+    return caches[getattr(settings, "SHOPOPS_WORKFLOW_CACHE", "default")]
+
+
+def _fingerprint(shop) -> str:
+    state = Project.objects.filter(shop=shop).aggregate(
+        projects=Count("id", distinct=True),
+        updated=Max("updated_at"),
+        history=Count("stage_history__id"),
+        last_history=Max("stage_history__id"),
+    )
+    raw = "|".join(str(state[k]) for k in ("projects", "updated", "history", "last_history"))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def duration_pools(shop, since):
+    """
+    Sorted dwell-hour samples: ({stage_id: ndarray}, {(template_id, stage_id): ndarray}).
+    """
+    by_stage = {}
+    by_template = {}
+    for stage_id, template_id, entered_at, exited_at in stage_visits(shop, since):
+        if exited_at is None:
+            continue
+        hours = (exited_at - entered_at).total_seconds() / 3600.0
+        by_stage.setdefault(stage_id, array("d")).append(hours)
+        by_template.setdefault((template_id, stage_id), array("d")).append(hours)
+
+    def to_numpy(pools):
+        return {key: np.sort(np.frombuffer(values)) for key, values in pools.items()}
+
+    return to_numpy(by_stage), to_numpy(by_template)
+
+
+def remaining_stage_ids(meta, current_stage_id):
+    """
+    Stages after the current one that still take time: working stages up
+    to (not including) the final stage. Empty once the project is there.
+    """
+    if meta is None or meta.is_terminal(current_stage_id):
+        return []
+    try:
+        position = meta.stage_ids.index(current_stage_id)
+    except ValueError:
+        return []
+    ahead = []
+    for stage_id in meta.stage_ids[position + 1:]:
+        if stage_id == meta.final_stage_id:
+            break
+        if not meta.is_cancel(stage_id):
+            ahead.append(stage_id)
+    return ahead
+
+
+def calendar_factor(shop) -> float:
+    """
+    Calendar hours one bench hour takes at the shop's capacity (the same
+    defaults as the build plan): 8 h/day on 5 days a week gives 4.2.
+    """
+    capacity = float(shop.daily_capacity_hours or 8)
+    work_days = len(set(shop.work_days or range(5)))
+    return 24.0 * 7 / (capacity * work_days)
+
+
+def stage_estimate(meta, estimated_hours):
+    """
+    The project's estimated (bench) hours spread evenly over the workflow's
+    working stages (everything before the final stage but cancel stages),
+    or None.
+    """
+    if not estimated_hours or meta.final_stage_id is None:
+        return None
+    working = [
+        stage_id
+        for stage_id in meta.stage_ids[: meta.stage_ids.index(meta.final_stage_id)]
+        if not meta.is_cancel(stage_id)
+    ]
+    return float(estimated_hours) / len(working) if working else None
+
+
+def simulate(
+    projects, metas, by_stage, by_template, now, zone, runs=SIMULATIONS, seed=None, factor=1.0
+):
+    """
+    Forecasts for `projects`, rows of (id, workflow_id, template_id,
+    current_stage_id, current_stage_entered_at, created_at, due_date,
+    estimated_hours).
+
+    A stage without samples takes the project's share of estimated hours
+    (stage_estimate), times `factor` calendar hours per bench hour (see
+    calendar_factor); with no estimate either, the dates, on-time
+    probability and likely_late are None rather than counting the stage
+    as taking no time.
+    """
+    rng = np.random.default_rng(seed)
+    totals = np.zeros((len(projects), runs))
+    unsampled = np.zeros(len(projects), dtype=int)
+    remaining = np.zeros(len(projects), dtype=int)
+    unknown = np.zeros(len(projects), dtype=bool)
+    # row -> when the project reached its final stage
+    reached = {}
+    rows_by_pool = {}
+
+    def pool_for(template_id, stage_id):
+        pool = by_template.get((template_id, stage_id))
+        if pool is not None and len(pool) >= MIN_TEMPLATE_SAMPLES:
+            return (template_id, stage_id), pool
+        pool = by_stage.get(stage_id)
+        if pool is not None and not len(pool):
+            pool = None
+        return (None, stage_id), pool
+
+    for row, (_, workflow_id, template_id, stage_id, entered_at, created_at, _, estimated) in (
+        enumerate(projects)
+    ):
+        meta = metas.get(workflow_id)
+        if meta is None or stage_id not in meta.stage_ids or meta.is_cancel(stage_id):
+            unknown[row] = True
+            continue
+        if stage_id == meta.final_stage_id:
+            reached[row] = entered_at or created_at
+            continue
+        estimate = stage_estimate(meta, estimated)
+        if estimate is not None:
+            estimate *= factor
+
+        # the current stage, conditioned on the time already spent in it
+        elapsed = (now - (entered_at or created_at)).total_seconds() / 3600.0
+        _, pool = pool_for(template_id, stage_id)
+        remaining[row] += 1
+        if pool is not None:
+            longer = int(np.searchsorted(pool, elapsed, side="right"))
+            if longer < len(pool):
+                totals[row] += pool[rng.integers(longer, len(pool), runs)] - elapsed
+            else:
+                # past every recorded visit: allow another typical one
+                totals[row] += float(np.median(pool))
+        else:
+            unsampled[row] += 1
+            if estimate is None:
+                unknown[row] = True
+            else:
+                # past the estimate: allow another full one
+                totals[row] += estimate - elapsed if estimate > elapsed else estimate
+
+        for ahead in remaining_stage_ids(meta, stage_id):
+            remaining[row] += 1
+            key, pool = pool_for(template_id, ahead)
+            if pool is None:
+                unsampled[row] += 1
+                if estimate is None:
+                    unknown[row] = True
+                else:
+                    totals[row] += estimate
+                continue
+            rows_by_pool.setdefault(key, (pool, []))[1].append(row)
+
+    for pool, rows in rows_by_pool.values():
+        rows = np.asarray(rows)
+        totals[rows] += pool[rng.integers(0, len(pool), (len(rows), runs))]
+
+    p50, p85 = np.percentile(totals, [50, 85], axis=1) if len(projects) else ([], [])
+
+    forecasts = {}
+    for row, (project_id, _, _, _, _, _, due_date, _) in enumerate(projects):
+        deadline = (
+            datetime.combine(due_date + timedelta(days=1), time.min, tzinfo=zone)
+            if due_date is not None
+            else None
+        )
+        forecast = {
+            "p50": None,
+            "p85": None,
+            "remaining_stages": int(remaining[row]),
+            "unsampled_stages": int(unsampled[row]),
+            "on_time_probability": None,
+            "likely_late": None,
+        }
+        if row in reached:
+            forecast["p50"] = forecast["p85"] = reached[row]
+            if deadline is not None:
+                on_time = reached[row] <= deadline
+                forecast["on_time_probability"] = 1.0 if on_time else 0.0
+                forecast["likely_late"] = not on_time
+            else:
+                forecast["likely_late"] = False
+        elif not unknown[row]:
+            forecast["p50"] = now + timedelta(hours=float(p50[row]))
+            forecast["p85"] = now + timedelta(hours=float(p85[row]))
+            forecast["likely_late"] = False
+            if deadline is not None:
+                hours_left = (deadline - now).total_seconds() / 3600.0
+                forecast["on_time_probability"] = round(
+                    float((totals[row] <= hours_left).mean()), 3
+                )
+                forecast["likely_late"] = forecast["p85"] > deadline
+        forecasts[project_id] = forecast
+    return forecasts
+
+
+def shop_forecasts(shop, use_cache=True) -> dict:
+    """
+    {project_id: forecast} for every active project of the shop.
+    """
+    cache = _cache()
+    factor = calendar_factor(shop)
+    key = f"workflows:forecast:v{CACHE_VERSION}:{shop.id}:{factor:.6f}:{_fingerprint(shop)}"
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    now = timezone.now()
+    projects = list(
+        Project.objects.filter(shop=shop, status="active")
+        .order_by("id")
+        .values_list(
+            "id",
+            "workflow_id",
+            "template_id",
+            "current_stage_id",
+            "current_stage_entered_at",
+            "created_at",
+            "due_date",
+            "estimated_hours",
+        )
+    )
+    metas = get_workflow_meta_many({row[1] for row in projects})
+    by_stage, by_template = duration_pools(shop, now - timedelta(days=HISTORY_DAYS))
+
+    forecasts = simulate(
+        projects, metas, by_stage, by_template, now, shop.zoneinfo, seed=shop.id, factor=factor
+    )
+    cache.set(key, forecasts, timeout=CACHE_TIMEOUT)
+    cache.set(
+        _latest_key(shop.id),
+        {"computed_at": now, "forecasts": forecasts},
+        timeout=LATEST_TIMEOUT,
+    )
+    return forecasts
+
+
+def _latest_key(shop_id) -> str:
+    return f"workflows:forecast:v{CACHE_VERSION}:{shop_id}:latest"
+
+
+def latest_forecasts(shop):
+    """
+    {"computed_at", "forecasts"} from the shop's last forecast run, or
+    None: one cache read and no queries. May lag the latest moves until
+    the next run (a forecast request or `manage.py refresh_forecasts`).
+    """
+    return _cache().get(_latest_key(shop.id))
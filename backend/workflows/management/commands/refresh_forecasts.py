@@ -0,0 +1,31 @@
+# workflows/management/commands/refresh_forecasts.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Shop
+from workflows.forecast import shop_forecasts
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run the Monte Carlo completion forecasts of every shop with active "
+        "projects, so the Kanban board can show them without computing them. "
+        "Meant to run every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", type=int, default=None, help="Only this shop id.")
+
+    def handle(self, *args, **options):
+        shops = Shop.objects.filter(projects__status="active").distinct().order_by("id")
+        if options["shop"] is not None:
+            if not Shop.objects.filter(pk=options["shop"]).exists():
+                raise CommandError(f"Shop {options['shop']} does not exist.")
+            shops = Shop.objects.filter(pk=options["shop"])
+
+        total = 0
+        for shop in shops.iterator():
+            # always re-run: forecasts move with the clock
+            total += len(shop_forecasts(shop, use_cache=False))
+
+        self.stdout.write(self.style.SUCCESS(f"Forecast {total} active project(s)."))
@@ -0,0 +1,37 @@
+# workflows/management/commands/snapshot_stage_flow.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Shop
+from workflows.flow import snapshot_shop
+
+
+class Command(BaseCommand):
+    help = (
+        "Record daily cumulative-flow snapshots (WIP, entered, exited per stage) "
+        "for every closed day since the last run. Meant to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", type=int, default=None, help="Only this shop id.")
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop the shop's snapshots and rebuild them from the full history.",
+        )
+
+    def handle(self, *args, **options):
+        shops = Shop.objects.order_by("id")
+        if options["shop"] is not None:
+            shops = shops.filter(pk=options["shop"])
+            if not shops.exists():
+                raise CommandError(f"Shop {options['shop']} does not exist.")
+
+        total = 0
+        for shop in shops.iterator():
+            days = snapshot_shop(shop, rebuild=options["rebuild"])
+            total += days
+            if days:
+                self.stdout.write(f"Shop {shop.pk}: {days} day(s) recorded.")
+
+        self.stdout.write(self.style.SUCCESS(f"Recorded {total} shop-day(s) of snapshots."))
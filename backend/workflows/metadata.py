@@ -0,0 +1,137 @@
+# backend/workflows/metadata.py
+"""
+Per-workflow stage metadata, computed once per workflow and cached.
+
+Stage count, ordered stage ids, the cancel stage's order and terminal
+flags are constants of a workflow, so project lists read them from here
+instead of joining every stage onto every project row. Entries are
+dropped whenever one of the workflow's stages is saved or deleted
+(connected in WorkflowsConfig.ready()).
+
+The drop only reaches other processes through a shared cache (see CACHES
+in settings); with per-process locmem the short timeout bounds how long
+another worker can show old stages. Writes that must be exact (the first
+stage of a new project) read the stages from the database instead.
+"""
+
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import WorkflowStage
+
+
+# bump when WorkflowMeta changes shape so old pickles are never read
+CACHE_VERSION = 1
+CACHE_TIMEOUT = 60 * 5
+
+
+def _cache():
+    return caches[getattr(settings, "SHOPOPS_WORKFLOW_CACHE", "default")]
+
+
+def _key(workflow_id) -> str:
+    return f"workflows:meta:v{CACHE_VERSION}:{workflow_id}"
+
+
+def is_cancel_stage(key: str, name: str) -> bool:
+    return "cancel" in (key or "").lower() or "cancel" in (name or "").lower()
+
+
+@dataclass(frozen=True)
+class WorkflowMeta:
+    workflow_id: int
+    stage_ids: tuple = ()             # in board order
+    stage_orders: tuple = ()          # parallel to stage_ids
+    cancel_stage_ids: frozenset = frozenset()
+    cancel_stage_order: int | None = None
+    # last non-cancel stage: reaching it means the work is done
+    final_stage_id: int | None = None
+
+    @property
+    def stage_count(self) -> int:
+        return len(self.stage_ids)
+
+    def stage_order(self, stage_id) -> int | None:
+        try:
+            return self.stage_orders[self.stage_ids.index(stage_id)]
+        except ValueError:
+            return None
+
+    def is_cancel(self, stage_id) -> bool:
+        return stage_id in self.cancel_stage_ids
+
+    def is_terminal(self, stage_id) -> bool:
+        return stage_id == self.final_stage_id or stage_id in self.cancel_stage_ids
+
+
+def _build(workflow_ids):
+    stages = {}
+    for workflow_id, stage_id, order, key, name in (
+        WorkflowStage.objects.filter(workflow_id__in=workflow_ids)
+        .order_by("workflow_id", "order", "id")
+        .values_list("workflow_id", "id", "order", "key", "name")
+    ):
+        stages.setdefault(workflow_id, []).append((stage_id, order, is_cancel_stage(key, name)))
+
+    metas = {}
+    for workflow_id in workflow_ids:
+        rows = stages.get(workflow_id, [])
+        cancel = [(stage_id, order) for stage_id, order, flag in rows if flag]
+        working = [stage_id for stage_id, _, flag in rows if not flag]
+        metas[workflow_id] = WorkflowMeta(
+            workflow_id=workflow_id,
+            stage_ids=tuple(stage_id for stage_id, _, _ in rows),
+            stage_orders=tuple(order for _, order, _ in rows),
+            cancel_stage_ids=frozenset(stage_id for stage_id, _ in cancel),
+            cancel_stage_order=max((order for _, order in cancel), default=None),
+            final_stage_id=working[-1] if working else None,
+        )
+    return metas
+
+
+def get_workflow_meta_many(workflow_ids) -> dict:
+    """
+    {workflow_id: WorkflowMeta}; cache misses are built in one query.
+    """
+    workflow_ids = {wid for wid in workflow_ids if wid is not None}
+    if not workflow_ids:
+        return {}
+
+    cache = _cache()
+    keys = {_key(wid): wid for wid in workflow_ids}
+    metas = {keys[key]: meta for key, meta in cache.get_many(list(keys)).items()}
+
+    missing = workflow_ids - metas.keys()
+    if missing:
+        built = _build(missing)
+        cache.set_many({_key(wid): meta for wid, meta in built.items()}, timeout=CACHE_TIMEOUT)
+        metas.update(built)
+    return metas
+
+
+def get_workflow_meta(workflow_id) -> WorkflowMeta:
+    return get_workflow_meta_many([workflow_id])[workflow_id]
+
+
+def invalidate_workflow_meta(workflow_id) -> None:
+    _cache().delete(_key(workflow_id))
+
+
+def _on_stage_changed(sender, instance, **kwargs):
+    workflow_id = instance.workflow_id
+    invalidate_workflow_meta(workflow_id)
+    # again after commit, in case a reader re-cached the old stages meanwhile
+    transaction.on_commit(lambda: invalidate_workflow_meta(workflow_id))
+
+
+def connect_metadata_signals():
+    post_save.connect(
+        _on_stage_changed, sender=WorkflowStage, dispatch_uid="workflow-meta-stage-save"
+    )
+    post_delete.connect(
+        _on_stage_changed, sender=WorkflowStage, dispatch_uid="workflow-meta-stage-delete"
+    )
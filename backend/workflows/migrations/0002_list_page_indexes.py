@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_list_page_indexes'),
+        ('workflows', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workflowdefinition',
+            index=models.Index(fields=['shop', 'is_active', 'created_at', 'id'], name='workflows_w_shop_id_b1dffc_idx'),
+        ),
+    ]
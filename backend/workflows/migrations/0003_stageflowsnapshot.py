@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_list_page_indexes'),
+        ('projects', '0006_project_current_stage_entered_at'),
+        ('workflows', '0002_list_page_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StageFlowSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('wip_count', models.PositiveIntegerField(default=0)),
+                ('entered', models.PositiveIntegerField(default=0)),
+                ('exited', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='projectstagehistory',
+            index=models.Index(fields=['project', 'entered_at'], name='workflows_p_project_eff96d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectstagehistory',
+            index=models.Index(fields=['entered_at'], name='workflows_p_entered_9e60c7_idx'),
+        ),
+        migrations.AddField(
+            model_name='stageflowsnapshot',
+            name='shop',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_flow_snapshots', to='core.shop'),
+        ),
+        migrations.AddField(
+            model_name='stageflowsnapshot',
+            name='stage',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flow_snapshots', to='workflows.workflowstage'),
+        ),
+        migrations.AddField(
+            model_name='stageflowsnapshot',
+            name='workflow',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flow_snapshots', to='workflows.workflowdefinition'),
+        ),
+        migrations.AddIndex(
+            model_name='stageflowsnapshot',
+            index=models.Index(fields=['shop', 'workflow', 'date'], name='workflows_s_shop_id_f1f60c_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='stageflowsnapshot',
+            unique_together={('stage', 'date')},
+        ),
+    ]
@@ -74,6 +74,9 @@ class WorkflowDefinition(models.Model):
 
     class Meta:
         unique_together = [("shop", "name")]
+        indexes = [
+            models.Index(fields=["shop", "is_active", "created_at", "id"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.shop.name} – {self.name}"
@@ -107,6 +110,45 @@ class ProjectStageHistory(models.Model):
 
     class Meta:
         ordering = ["entered_at"]
+        indexes = [
+            # a project's previous visit / day-range scans for flow snapshots
+            models.Index(fields=["project", "entered_at"]),
+            models.Index(fields=["entered_at"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.project} → {self.stage.name} @ {self.entered_at}"
+
+
+class StageFlowSnapshot(models.Model):
+    """
+    One stage's end-of-day work in progress plus that day's arrivals and
+    departures (days in the shop's timezone). Written by
+    `manage.py snapshot_stage_flow`; read by /api/insights/flow/.
+    """
+
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name="stage_flow_snapshots")
+    workflow = models.ForeignKey(
+        WorkflowDefinition,
+        on_delete=models.CASCADE,
+        related_name="flow_snapshots",
+    )
+    stage = models.ForeignKey(
+        WorkflowStage,
+        on_delete=models.CASCADE,
+        related_name="flow_snapshots",
+    )
+    date = models.DateField()
+
+    wip_count = models.PositiveIntegerField(default=0)
+    entered = models.PositiveIntegerField(default=0)
+    exited = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [("stage", "date")]
+        indexes = [
+            models.Index(fields=["shop", "workflow", "date"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.stage_id} @ {self.date}: {self.wip_count}"
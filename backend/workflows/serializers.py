@@ -33,9 +33,9 @@ class ProjectCardSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(
         source="customer.name", read_only=True
     )
-    current_stage_id = serializers.IntegerField(
-        source="current_stage.id", read_only=True
-    )
+    current_stage_id = serializers.IntegerField(read_only=True)
+    # Monte Carlo p50 / p85 and likely_late, passed in as context["forecasts"]
+    forecast = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
@@ -51,8 +51,12 @@ class ProjectCardSerializer(serializers.ModelSerializer):
             "expected_price",
             "image",
             "current_stage_id",
+            "forecast",
         ]
 
+    def get_forecast(self, obj):
+        return self.context.get("forecasts", {}).get(obj.id)
+
 
 class BoardStageSerializer(serializers.Serializer):
     id = serializers.IntegerField()
@@ -60,3 +64,6 @@ class BoardStageSerializer(serializers.Serializer):
     order = serializers.IntegerField()
     role = serializers.CharField(allow_blank=True)
     projects = ProjectCardSerializer(many=True)
+    # active projects in the stage, and how many of them were left out
+    project_count = serializers.IntegerField()
+    more_count = serializers.IntegerField()
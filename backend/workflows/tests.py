@@ -1,3 +1,166 @@
-from django.test import TestCase
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Shop
+from projects.models import Project
+from workflows.flow import snapshot_shop
+from workflows.forecast import shop_forecasts
+from workflows.models import (
+    ProjectStageHistory,
+    StageFlowSnapshot,
+    WorkflowDefinition,
+    WorkflowStage,
+)
+
+
+class WorkflowBoardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=self.user, name="Maker Shop")
+        self.workflow = WorkflowDefinition.objects.create(shop=self.shop, name="Build")
+        cut = WorkflowStage.objects.create(workflow=self.workflow, name="Cut", order=1, key="cut")
+        WorkflowStage.objects.create(workflow=self.workflow, name="Done", order=2, key="done")
+        self.project = Project.objects.create(
+            shop=self.shop,
+            workflow=self.workflow,
+            current_stage=cut,
+            name="Walnut table",
+            estimated_hours=6,
+        )
+        self.url = f"/api/workflows/{self.workflow.id}/board/"
+
+    def board(self):
+        # fresh user: the shop lookup is part of the budget
+        self.client.force_authenticate(get_user_model().objects.get(pk=self.user.pk))
+        # shop, stages, ranked cards; forecasts come from the cache only
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_board_never_computes_forecasts(self):
+        data = self.board()
+
+        self.assertIsNone(data["forecasts_computed_at"])
+        self.assertIsNone(data["stages"][0]["projects"][0]["forecast"])
+
+    def test_board_shows_latest_forecasts(self):
+        self.assertIn(self.project.id, shop_forecasts(self.shop))
+
+        data = self.board()
+
+        self.assertIsNotNone(data["forecasts_computed_at"])
+        self.assertIsNotNone(data["stages"][0]["projects"][0]["forecast"]["p50"])
+
+
+class ForecastTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(username="maker", password="pw")
+        # a 40-hour bench week
+        self.shop = Shop.objects.create(
+            owner=user, name="Maker Shop", daily_capacity_hours=8, work_days=[0, 1, 2, 3, 4]
+        )
+        workflow = WorkflowDefinition.objects.create(shop=self.shop, name="Build")
+        cut = WorkflowStage.objects.create(workflow=workflow, name="Cut", order=1, key="cut")
+        WorkflowStage.objects.create(workflow=workflow, name="Done", order=2, key="done")
+        self.project = Project.objects.create(
+            shop=self.shop, workflow=workflow, current_stage=cut, name="Walnut table", estimated_hours=6
+        )
+
+    def test_unsampled_stage_estimate_is_calendar_time(self):
+        before = timezone.now()
+        forecast = shop_forecasts(self.shop)[self.project.id]
+
+        # 6 bench hours at 8 h/day, 5 days/week: 6 * 24 * 7 / 40 = 25.2 h
+        expected = before + timedelta(hours=25.2)
+        self.assertLess(abs(forecast["p50"] - expected), timedelta(minutes=1))
+        self.assertEqual(forecast["unsampled_stages"], 1)
+
+
+class StageFlowSnapshotTests(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=user, name="Maker Shop", timezone="UTC")
+        workflow = WorkflowDefinition.objects.create(shop=self.shop, name="Build")
+        self.cut = WorkflowStage.objects.create(workflow=workflow, name="Cut", order=1, key="cut")
+        self.project = Project.objects.create(
+            shop=self.shop, workflow=workflow, current_stage=self.cut, name="Walnut table"
+        )
+        self.now = timezone.now()
+        self.entry = ProjectStageHistory.objects.create(project=self.project, stage=self.cut)
+        ProjectStageHistory.objects.filter(pk=self.entry.pk).update(
+            entered_at=self.now - timedelta(days=10)
+        )
+        self.entry.refresh_from_db()
+        snapshot_shop(self.shop)
+
+    def wip(self, days_ago):
+        day = (self.now - timedelta(days=days_ago)).date()
+        return StageFlowSnapshot.objects.get(stage=self.cut, date=day).wip_count
+
+    def test_backdated_completion_recomputes_past_days(self):
+        self.assertEqual(self.wip(5), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.status = "completed"
+            self.project.completed_at = self.now - timedelta(days=5)
+            self.project.save()
+
+        self.assertEqual(self.wip(6), 1)
+        self.assertEqual(self.wip(5), 0)
+        self.assertEqual(self.wip(1), 0)
+
+    def test_backdated_entry_recomputes_from_its_day(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entry.entered_at = self.now - timedelta(days=12)
+            self.entry.save()
+
+        self.assertEqual(self.wip(12), 1)
+        self.assertEqual(self.wip(1), 1)
+
+    def test_deleted_entry_recomputes_from_its_day(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entry.delete()
+
+        self.assertFalse(StageFlowSnapshot.objects.filter(shop=self.shop).exists())
+
+
+class StageInsightsTests(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="maker", password="pw")
+        self.shop = Shop.objects.create(owner=user, name="Maker Shop")
+        workflow = WorkflowDefinition.objects.create(shop=self.shop, name="Build")
+        self.cut = WorkflowStage.objects.create(workflow=workflow, name="Cut", order=1, key="cut")
+        self.done = WorkflowStage.objects.create(workflow=workflow, name="Done", order=2, key="done")
+        self.workflow = workflow
+        self.client.force_authenticate(user)
+
+    def visit(self, project, stage, days_ago):
+        entry = ProjectStageHistory.objects.create(project=project, stage=stage)
+        ProjectStageHistory.objects.filter(pk=entry.pk).update(
+            entered_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_dwell_counts_finished_visits_only(self):
+        for name, cut_days in (("Walnut table", 2), ("Oak stool", 4)):
+            project = Project.objects.create(
+                shop=self.shop, workflow=self.workflow, current_stage=self.done, name=name
+            )
+            self.visit(project, self.cut, days_ago=10)
+            self.visit(project, self.done, days_ago=10 - cut_days)
+
+        response = self.client.get("/api/insights/stages/", {"days": 30})
+
+        self.assertEqual(response.status_code, 200)
+        stages = response.json()["stages"]
+        # the Done visits are still open
+        self.assertEqual([row["stage_id"] for row in stages], [self.cut.id])
+        self.assertEqual(stages[0]["exits"], 2)
+        self.assertEqual(stages[0]["median_hours"], 72.0)
 
-# Create your tests here.
@@ -5,12 +5,14 @@ from .views import (
     WorkflowDetailView,
     WorkflowStageListCreateView,
     WorkflowStageDetailView,
+    WorkflowBoardView,
 )
 
 urlpatterns = [
     # Workflows
     path("", WorkflowListCreateView.as_view(), name="workflow-list-create"),
     path("<int:pk>/", WorkflowDetailView.as_view(), name="workflow-detail"),
+    path("<int:pk>/board/", WorkflowBoardView.as_view(), name="workflow-board"),
 
     # Stages
     path(
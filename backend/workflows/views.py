@@ -1,9 +1,25 @@
 # backend/workflows/views.py
+from datetime import timedelta
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
 from rest_framework import generics, permissions
 from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from projects.models import Project
 
+from .analytics import stage_durations
+from .flow import cumulative_flow
+from .forecast import latest_forecasts, shop_forecasts
 from .models import WorkflowDefinition, WorkflowStage
-from .serializers import WorkflowDefinitionSerializer, WorkflowStageSerializer
+from .serializers import (
+    BoardStageSerializer,
+    WorkflowDefinitionSerializer,
+    WorkflowStageSerializer,
+)
 from .utils import get_current_shop
 
 
@@ -41,6 +57,7 @@ class WorkflowDetailView(generics.RetrieveUpdateDestroyAPIView):
 class WorkflowStageListCreateView(generics.ListCreateAPIView):
     serializer_class = WorkflowStageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ("order", "id")
 
     def _get_workflow(self):
         shop = get_current_shop(self.request)
@@ -76,4 +93,198 @@ class WorkflowStageDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         workflow = self._get_workflow()
-        return workflow.stages.all()
\ No newline at end of file
+        return workflow.stages.all()
+
+
+# -----------------------------
+# Kanban board: stages + active project cards
+# -----------------------------
+class WorkflowBoardView(APIView):
+    """
+    Active projects of one workflow grouped by stage, as slim cards.
+
+    GET /api/workflows/{id}/board/?limit=25
+
+    Two queries: the stages, then the active projects ranked within their
+    stage (soonest due first) and cut to `limit` cards per stage in SQL.
+    Each stage reports its full `project_count` and the `more_count` not
+    returned. Cards carry the shop's latest completion forecast, read from
+    the cache only (see workflows.forecast.latest_forecasts):
+    `forecasts_computed_at` says when it ran; null until a first run.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    DEFAULT_LIMIT = 25
+    MAX_LIMIT = 200
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get("limit", self.DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            limit = self.DEFAULT_LIMIT
+        return max(1, min(limit, self.MAX_LIMIT))
+
+    def get(self, request, pk):
+        shop = get_current_shop(request)
+        limit = self.get_limit(request)
+
+        stages = list(
+            WorkflowStage.objects.filter(workflow_id=pk, workflow__shop=shop).order_by("order")
+        )
+        if not stages and not WorkflowDefinition.objects.filter(id=pk, shop=shop).exists():
+            raise NotFound("Workflow not found.")
+
+        cards = (
+            Project.objects.filter(shop=shop, workflow_id=pk, status="active")
+            .select_related("template", "customer")
+            .annotate(
+                stage_rank=Window(
+                    RowNumber(),
+                    partition_by=F("current_stage_id"),
+                    order_by=[F("due_date").asc(nulls_last=True), F("id").asc()],
+                ),
+                stage_total=Window(Count("id"), partition_by=F("current_stage_id")),
+            )
+            .filter(stage_rank__lte=limit)
+            .order_by("current_stage_id", "stage_rank")
+        )
+
+        by_stage = {}
+        totals = {}
+        for project in cards:
+            by_stage.setdefault(project.current_stage_id, []).append(project)
+            totals[project.current_stage_id] = project.stage_total
+
+        board = [
+            {
+                "id": stage.id,
+                "name": stage.name,
+                "order": stage.order,
+                "role": stage.role or "",
+                "projects": by_stage.get(stage.id, []),
+                "project_count": totals.get(stage.id, 0),
+                "more_count": totals.get(stage.id, 0) - len(by_stage.get(stage.id, [])),
+            }
+            for stage in stages
+        ]
+
+        latest = latest_forecasts(shop) or {}
+        return Response(
+            {
+                "workflow_id": pk,
+                "limit": limit,
+                "forecasts_computed_at": latest.get("computed_at"),
+                "stages": BoardStageSerializer(
+                    board,
+                    many=True,
+                    context={"request": request, "forecasts": latest.get("forecasts", {})},
+                ).data,
+            }
+        )
+
+
+# -----------------------------
+# Insights: stage dwell times
+# -----------------------------
+class StageInsightsView(APIView):
+    """
+    Per-stage (and per template + stage) dwell-time median / p90 / mean and
+    throughput for the current shop, from ProjectStageHistory.
+
+    GET /api/insights/stages/?days=90
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    DEFAULT_DAYS = 90
+    MAX_DAYS = 730
+
+    def get(self, request):
+        shop = get_current_shop(request)
+        try:
+            days = int(request.query_params.get("days", self.DEFAULT_DAYS))
+        except (TypeError, ValueError):
+            days = self.DEFAULT_DAYS
+        days = max(1, min(days, self.MAX_DAYS))
+
+        return Response(stage_durations(shop, days=days))
+
+
+class ForecastView(APIView):
+    """
+    Monte Carlo completion forecasts (p50 / p85, on-time probability,
+    likely_late) for the current shop's active projects.
+
+    GET /api/insights/forecast/?workflow=<id>&late=1
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        shop = get_current_shop(request)
+        forecasts = shop_forecasts(shop)
+
+        projects = Project.objects.filter(shop=shop, status="active")
+        workflow_id = request.query_params.get("workflow")
+        if workflow_id and workflow_id.isdigit():
+            projects = projects.filter(workflow_id=workflow_id)
+
+        results = []
+        for project_id, name, due_date, stage_id in projects.order_by("id").values_list(
+            "id", "name", "due_date", "current_stage_id"
+        ):
+            forecast = forecasts.get(project_id)
+            if forecast is None:
+                continue
+            if request.query_params.get("late") in ("1", "true") and not forecast["likely_late"]:
+                continue
+            results.append(
+                {
+                    "project_id": project_id,
+                    "name": name,
+                    "due_date": due_date,
+                    "current_stage_id": stage_id,
+                    **forecast,
+                }
+            )
+        return Response({"results": results})
+
+
+class StageFlowView(APIView):
+    """
+    Cumulative-flow series (daily WIP and arrivals per stage) for one of the
+    current shop's workflows, read from the nightly StageFlowSnapshot rows.
+
+    GET /api/insights/flow/?workflow=<id>&days=90
+
+    Without `workflow` the shop's default (else oldest active) workflow is
+    used.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    DEFAULT_DAYS = 90
+    MAX_DAYS = 730
+
+    def get(self, request):
+        shop = get_current_shop(request)
+        try:
+            days = int(request.query_params.get("days", self.DEFAULT_DAYS))
+        except (TypeError, ValueError):
+            days = self.DEFAULT_DAYS
+        days = max(1, min(days, self.MAX_DAYS))
+
+        workflows = WorkflowDefinition.objects.filter(shop=shop)
+        workflow_id = request.query_params.get("workflow")
+        if workflow_id:
+            workflow = workflows.filter(pk=workflow_id).first() if workflow_id.isdigit() else None
+        else:
+            workflow = (
+                workflows.filter(is_active=True).order_by("-is_default", "created_at", "id").first()
+            )
+        if workflow is None:
+            raise NotFound("Workflow not found.")
+
+        today = timezone.localtime(timezone.now(), shop.zoneinfo).date()
+        return Response(cumulative_flow(shop, workflow.id, today - timedelta(days=days)))